@@ -23,4 +23,7 @@ log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
 
-from .doc.document import Document
+from .utils import lazy_import
+
+
+lazy_import(globals(), {'.doc.document': ['Document']})
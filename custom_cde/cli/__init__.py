@@ -20,7 +20,6 @@ import click
 import six
 
 from .. import __version__
-from ..doc import Document
 
 
 log = logging.getLogger(__name__)
@@ -41,14 +40,36 @@ def cli(ctx, verbose):
 
 @cli.command()
 @click.option('--output', '-o', type=click.File('w', encoding='utf8'), help='Output file.', default=click.get_text_stream('stdout'))
+@click.option('--properties', '-p', help='Comma-separated properties to extract, e.g. mp,tg,uvvis. Defaults to all.')
+@click.option('--text/--no-text', default=True, help='Extract records from titles, headings, paragraphs and footnotes.')
+@click.option('--captions/--no-captions', default=True, help='Extract records from figure and table captions.')
+@click.option('--tables/--no-tables', default=True, help='Extract records from table cells.')
 @click.argument('input', type=click.File('rb'), default=click.get_binary_stream('stdin'))
 @click.pass_obj
-def extract(ctx, input, output):
-    """Run ChemDataExtractor on a document."""
+def extract(ctx, input, output, properties, text, captions, tables):
+    """Run ChemDataExtractor on a document.
+
+    If the input is a zip, tar or gzip archive, each document in it is processed in turn, and a JSON object with the
+    document name and its records is written for each one, one per line.
+    """
+    from ..doc import Document, ExtractionProfile
+    from ..reader.archive import is_archive, read_archive
     log.info('chemdataextractor.extract')
+    properties = [p.strip() for p in properties.split(',') if p.strip()] if properties else None
+    try:
+        profile = ExtractionProfile(properties=properties, text=text, captions=captions, tables=tables)
+    except ValueError as e:
+        raise click.BadParameter(six.text_type(e), param_hint='--properties')
     log.info('Reading %s' % input.name)
+    if is_archive(input.name):
+        for name, doc in read_archive(input, fname=input.name):
+            log.info('Extracting %s' % name)
+            records = [record.serialize(primitive=True) for record in doc.extract_records(profile=profile, release=True)]
+            output.write(json.dumps({'name': name, 'records': records}, ensure_ascii=False))
+            output.write(u'\n')
+        return
     doc = Document.from_file(input, fname=input.name)
-    records = [record.serialize(primitive=True) for record in doc.records]
+    records = [record.serialize(primitive=True) for record in doc.extract_records(profile=profile, release=True)]
     jsonstring = json.dumps(records, indent=2, ensure_ascii=False)
     output.write(jsonstring)
 
@@ -59,6 +80,7 @@ def extract(ctx, input, output):
 @click.pass_obj
 def read(ctx, input, output):
     """Output processed document elements."""
+    from ..doc import Document
     log.info('chemdataextractor.read')
     log.info('Reading %s' % input.name)
     doc = Document.from_file(input)
@@ -66,6 +88,57 @@ def read(ctx, input, output):
         output.write(u'%s : %s\n=====\n' % (element.__class__.__name__, six.text_type(element)))
 
 
+@cli.command()
+@click.option('--parsers/--no-parsers', default=True, help='Also build parser grammars.')
+@click.pass_obj
+def warmup(ctx, parsers):
+    """Load all models and report the time and memory each takes."""
+    from ..errors import ModelNotFoundError
+    from ..preload import warmup
+    log.info('chemdataextractor.warmup')
+    try:
+        results = warmup(parsers=parsers)
+    except ModelNotFoundError as e:
+        raise click.ClickException(six.text_type(e))
+    for name, seconds, memory in results:
+        click.echo('%-60s %8.2fs %10s' % (name, seconds, '%.1f MB' % (memory / 1e6) if memory is not None else '-'))
+    click.echo('%-60s %8.2fs' % ('Total', sum(r.seconds for r in results)))
+
+
+@cli.command()
+@click.option('--port', '-p', type=int, help='Accept requests over HTTP on this port, instead of from stdin.')
+@click.option('--host', default='127.0.0.1', help='Interface to listen on for HTTP requests.', show_default=True)
+@click.option('--workers', '-w', type=int, help='Number of worker processes. Defaults to the number of CPUs.')
+@click.option('--max-pending', type=int, help='Maximum requests processed at once. Defaults to twice the workers.')
+@click.option('--timeout', '-t', type=float, help='Default timeout for each request, in seconds.')
+@click.option('--warmup/--no-warmup', default=True, help='Load models before starting the workers.')
+@click.pass_obj
+def serve(ctx, port, host, workers, max_pending, timeout, warmup):
+    """Process JSON line requests, keeping models loaded between documents.
+
+    Each request is a JSON object on a single line, containing the document "content" or a local file "path", and an
+    optional "id", "fname", "properties" and "timeout". A JSON object with the "id" and "records" or "error" is written
+    for each request as it completes. Requests are read from stdin, or posted to http://HOST:PORT/ if --port is given.
+    """
+    from ..errors import ModelNotFoundError
+    from ..server import ExtractionServer, serve_http, serve_stdin
+    log.info('chemdataextractor.serve')
+    server = ExtractionServer(workers=workers, max_pending=max_pending, timeout=timeout, warmup=warmup)
+    try:
+        server.start()
+    except ModelNotFoundError as e:
+        raise click.ClickException(six.text_type(e))
+    try:
+        if port is not None:
+            serve_http(server, host=host, port=port)
+        else:
+            serve_stdin(server, click.get_binary_stream('stdin'), click.get_text_stream('stdout'))
+    except KeyboardInterrupt:
+        server.terminate()
+    else:
+        server.close()
+
+
 from . import cluster, config, data, tokenize, pos, chemdner, cem, dict, evaluate
 
 
@@ -27,8 +27,10 @@ def cem(ctx):
 @click.argument('input', type=click.File('r', encoding='utf8'), required=True)
 @click.option('--output', '-o', help='Output model file.', required=True)
 @click.option('--clusters/--no-clusters', help='Whether to use cluster features', default=True)
+@click.option('--workers', '-w', type=int, default=1, help='Processes to extract features in. 0 for the number of CPUs.')
+@click.option('--feature-cache', type=click.Path(file_okay=False), help='Directory to cache extracted features in.')
 @click.pass_obj
-def train_crf(ctx, input, output, clusters):
+def train_crf(ctx, input, output, clusters, workers, feature_cache):
     """Train CRF CEM recognizer."""
     click.echo('chemdataextractor.crf.train')
     sentences = []
@@ -41,4 +43,4 @@ def train_crf(ctx, input, output, clusters):
             sentences.append(sentence)
 
     tagger = CrfCemTagger(clusters=clusters)
-    tagger.train(sentences, output)
+    tagger.train(sentences, output, workers=workers, cache_dir=feature_cache)
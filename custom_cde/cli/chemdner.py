@@ -15,9 +15,6 @@ from collections import defaultdict
 import click
 import six
 
-from ..doc.document import Document
-from ..doc.text import Title, Paragraph
-
 
 @click.group(name='chemdner')
 @click.pass_context
@@ -46,6 +43,7 @@ def prepare_gold(ctx, annotations, gout):
 @click.pass_obj
 def prepare_tokens(ctx, input, annotations, tout, lout):
     """Prepare tokenized and tagged corpus file from those supplied by CHEMDNER."""
+    from ..doc.text import Title, Paragraph
     click.echo('chemdataextractor.chemdner.prepare_tokens')
     # Collect the annotations into a dict
     anndict = defaultdict(list)
@@ -88,6 +86,8 @@ def _prep_tags(t, annotations):
 @click.pass_obj
 def tag(ctx, corpus, output):
     """Tag chemical entities and write CHEMDNER annotations predictions file."""
+    from ..doc.document import Document
+    from ..doc.text import Title, Paragraph
     click.echo('chemdataextractor.chemdner.tag')
     for line in corpus:
         pmid, title, abstract = line.strip().split(u'\t')
@@ -46,16 +46,42 @@ def list(ctx):
 
 
 @data_cli.command()
+@click.option('--force', '-f', is_flag=True, help='Download packages even if they are up to date.')
+@click.option('--workers', '-w', type=int, default=4, help='Number of packages to download at once.', show_default=True)
+@click.option('--root', help='URL of a mirror to download from, instead of the ChemDataExtractor server.')
 @click.pass_obj
-def download(ctx):
-    """Download data."""
+def download(ctx, force, workers, root):
+    """Download data.
+
+    Packages are checked against the server's manifest checksums, and interrupted downloads are resumed.
+    """
     log.debug('chemdataextractor.data.download')
-    count = 0
-    for package in PACKAGES:
-        success = package.download()
-        if success:
-            count += 1
-    click.echo('Successfully downloaded %s new data packages (%s existing)' % (count, len(PACKAGES) - count))
+    import requests
+    from ..data import Package, download_packages
+    packages = [Package(p.path, root=root) for p in PACKAGES] if root else PACKAGES
+    try:
+        results = download_packages(packages, force=force, workers=workers)
+    except requests.RequestException as e:
+        raise click.ClickException('Could not get manifest: %s' % e)
+    count = sum(1 for r in results if r.downloaded)
+    failed = [r for r in results if r.error is not None]
+    for result in failed:
+        click.echo('Failed to download %s: %s' % (result.package.path, result.error), err=True)
+    click.echo('Successfully downloaded %s new data packages (%s existing)' % (count, len(results) - count - len(failed)))
+    if failed:
+        raise click.ClickException('%s data packages could not be downloaded' % len(failed))
+
+
+@data_cli.command()
+@click.option('--output', '-o', type=click.File('w', encoding='utf8'), help='Output file.', default=click.get_text_stream('stdout'))
+@click.pass_obj
+def manifest(ctx, output):
+    """Write a manifest of the downloaded packages, for serving from a mirror."""
+    log.debug('chemdataextractor.data.manifest')
+    import json
+    from ..data import make_manifest
+    output.write(json.dumps(make_manifest(), indent=2, sort_keys=True))
+    output.write('\n')
 
 
 @data_cli.command()
@@ -64,3 +90,30 @@ def clean(ctx):
     """Prune data that is no longer required."""
     log.debug('chemdataextractor.data.clean')
     # TODO
+
+
+@data_cli.command()
+@click.argument('paths', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.pass_obj
+def mmap(ctx, paths):
+    """Convert models to a format that is shared between processes.
+
+    Converts the given pickled models, or all downloaded models that support it. Models are then memory-mapped instead
+    of unpickled, so that processes on the same machine share one copy of them.
+    """
+    log.debug('chemdataextractor.data.mmap')
+    from ..mmapmodel import convert_model
+    if not paths:
+        paths = [package.local_path for package in PACKAGES if package.local_exists()]
+    count = 0
+    for path in paths:
+        try:
+            output = convert_model(path)
+        except (IOError, TypeError, ValueError) as e:
+            # Not all models are pickles (e.g. CRF models), and not all pickled models can be converted
+            log.debug('Could not convert %s: %s', path, e)
+            click.echo('Skipped %s' % path)
+            continue
+        count += 1
+        click.echo('Converted %s' % output)
+    click.echo('Successfully converted %s models (%s skipped)' % (count, len(paths) - count))
@@ -17,8 +17,6 @@ import os
 
 import click
 
-from ..reader import RscHtmlReader, AcsHtmlReader, NlmXmlReader
-
 
 log = logging.getLogger(__name__)
 
@@ -34,6 +32,7 @@ def evaluate(ctx):
 @click.argument('input', type=click.File('r'))
 def run(input):
     """"""
+    from ..reader import RscHtmlReader, AcsHtmlReader, NlmXmlReader
     pub = os.path.basename(input.name).split('.', 1)[0]
     if pub == 'rsc':
         reader = RscHtmlReader()
@@ -14,8 +14,6 @@ import logging
 
 import click
 
-from ..doc import Document, Text
-from ..nlp.corpus import genia_training, wsj_training, wsj_evaluation, genia_evaluation
 from ..nlp.pos import TAGS, ChemApPosTagger, ChemCrfPosTagger
 
 
@@ -31,17 +29,25 @@ def pos_cli(ctx):
 
 @pos_cli.command()
 @click.option('--output', '-o', help='Output model file.', required=True)
+@click.option('--workers', '-w', type=int, default=1, help='Processes to extract features in. 0 for the number of CPUs.')
+@click.option('--feature-cache', type=click.Path(file_okay=False), help='Directory to cache extracted features in.')
 @click.pass_context
-def train_all(ctx, output):
+def train_all(ctx, output, workers, feature_cache):
     """Train POS tagger on WSJ, GENIA, and both. With and without cluster features."""
     click.echo('chemdataextractor.pos.train_all')
     click.echo('Output: %s' % output)
-    ctx.invoke(train, output='%s_wsj_nocluster.pickle' % output, corpus='wsj', clusters=False)
-    ctx.invoke(train, output='%s_wsj.pickle' % output, corpus='wsj', clusters=True)
-    ctx.invoke(train, output='%s_genia_nocluster.pickle' % output, corpus='genia', clusters=False)
-    ctx.invoke(train, output='%s_genia.pickle' % output, corpus='genia', clusters=True)
-    ctx.invoke(train, output='%s_wsj_genia_nocluster.pickle' % output, corpus='wsj+genia', clusters=False)
-    ctx.invoke(train, output='%s_wsj_genia.pickle' % output, corpus='wsj+genia', clusters=True)
+    ctx.invoke(train, output='%s_wsj_nocluster.pickle' % output, corpus='wsj', clusters=False, workers=workers,
+               feature_cache=feature_cache)
+    ctx.invoke(train, output='%s_wsj.pickle' % output, corpus='wsj', clusters=True, workers=workers,
+               feature_cache=feature_cache)
+    ctx.invoke(train, output='%s_genia_nocluster.pickle' % output, corpus='genia', clusters=False, workers=workers,
+               feature_cache=feature_cache)
+    ctx.invoke(train, output='%s_genia.pickle' % output, corpus='genia', clusters=True, workers=workers,
+               feature_cache=feature_cache)
+    ctx.invoke(train, output='%s_wsj_genia_nocluster.pickle' % output, corpus='wsj+genia', clusters=False, workers=workers,
+               feature_cache=feature_cache)
+    ctx.invoke(train, output='%s_wsj_genia.pickle' % output, corpus='wsj+genia', clusters=True, workers=workers,
+               feature_cache=feature_cache)
 
 
 @pos_cli.command()
@@ -69,9 +75,12 @@ def evaluate_all(ctx, model):
 @click.option('--output', '-o', help='Output model file.', required=True)
 @click.option('--corpus', type=click.Choice(['wsj', 'genia', 'wsj+genia']), help='Training corpus')
 @click.option('--clusters/--no-clusters', help='Whether to use cluster features', default=True)
+@click.option('--workers', '-w', type=int, default=1, help='Processes to extract features in. 0 for the number of CPUs.')
+@click.option('--feature-cache', type=click.Path(file_okay=False), help='Directory to cache extracted features in.')
 @click.pass_context
-def train(ctx, output, corpus, clusters):
+def train(ctx, output, corpus, clusters, workers, feature_cache):
     """Train POS Tagger."""
+    from ..nlp.corpus import genia_training, wsj_training
     click.echo('chemdataextractor.pos.train')
     click.echo('Output: %s' % output)
     click.echo('Corpus: %s' % corpus)
@@ -124,7 +133,7 @@ def train(ctx, output, corpus, clusters):
         raise click.ClickException('Invalid corpus')
 
     tagger = ChemCrfPosTagger(clusters=clusters)
-    tagger.train(training_corpus, output)
+    tagger.train(training_corpus, output, workers=workers, cache_dir=feature_cache)
 
 
 @pos_cli.command()
@@ -134,6 +143,7 @@ def train(ctx, output, corpus, clusters):
 @click.pass_context
 def evaluate(ctx, model, corpus, clusters):
     """Evaluate performance of POS Tagger."""
+    from ..nlp.corpus import genia_evaluation, wsj_evaluation
     click.echo('chemdataextractor.pos.evaluate')
     if corpus == 'wsj':
         evaluation = wsj_evaluation
@@ -164,6 +174,7 @@ def evaluate(ctx, model, corpus, clusters):
 @click.pass_obj
 def train_perceptron(ctx, output, corpus, clusters):
     """Train Averaged Perceptron POS Tagger."""
+    from ..nlp.corpus import genia_training, wsj_training
     click.echo('chemdataextractor.pos.train')
     click.echo('Output: %s' % output)
     click.echo('Corpus: %s' % corpus)
@@ -226,6 +237,7 @@ def train_perceptron(ctx, output, corpus, clusters):
 @click.pass_obj
 def evaluate_perceptron(ctx, model, corpus):
     """Evaluate performance of Averaged Perceptron POS Tagger."""
+    from ..nlp.corpus import genia_evaluation, wsj_evaluation
     click.echo('chemdataextractor.pos.evaluate')
     if corpus == 'wsj':
         evaluation = wsj_evaluation
@@ -255,6 +267,7 @@ def evaluate_perceptron(ctx, model, corpus):
 @click.pass_obj
 def tag(ctx, input, output):
     """Output POS-tagged tokens."""
+    from ..doc import Document, Text
     log.info('chemdataextractor.pos.tag')
     log.info('Reading %s' % input.name)
     doc = Document.from_file(input)
@@ -14,8 +14,6 @@ import logging
 
 import click
 
-from ..doc import Document, Text
-
 
 log = logging.getLogger(__name__)
 
@@ -67,6 +65,7 @@ def train_punkt(ctx, input, output, abbr, colloc):
 @click.pass_obj
 def sentences(ctx, input, output):
     """Read input document, and output sentences."""
+    from ..doc import Document, Text
     log.info('chemdataextractor.read.elements')
     log.info('Reading %s' % input.name)
     doc = Document.from_file(input)
@@ -83,6 +82,7 @@ def sentences(ctx, input, output):
 @click.pass_obj
 def words(ctx, input, output):
     """Read input document, and output words."""
+    from ..doc import Document, Text
     log.info('chemdataextractor.read.elements')
     log.info('Reading %s' % input.name)
     doc = Document.from_file(input)
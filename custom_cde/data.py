@@ -11,43 +11,72 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
+from collections import namedtuple
+import hashlib
 import io
+import json
 import logging
 import os
+import re
 
 import appdirs
-import requests
 import six
 
 from .config import config
-from .errors import ModelNotFoundError
-from .utils import python_2_unicode_compatible, ensure_dir
+from .errors import DownloadError, ModelNotFoundError
+from .utils import python_2_unicode_compatible, ensure_dir, replace_file
 
 log = logging.getLogger(__name__)
 
 
 SERVER_ROOT = 'http://data.chemdataextractor.org/'
 
+#: Path on the server of the manifest, a JSON object with the sha256 checksum and size of each package.
+MANIFEST_PATH = 'manifest.json'
+
+#: Extension of partially downloaded files.
+PART_EXT = '.part'
+
+#: Extension of the file that records the ETag or Last-Modified date of a partially downloaded file.
+VALIDATOR_EXT = '.validator'
+
+#: Size of the chunks downloaded files are read and written in.
+CHUNK_SIZE = 1024 * 1024
+
+#: Seconds to wait for the server to respond.
+TIMEOUT = 60
+
 
 @python_2_unicode_compatible
 class Package(object):
     """Data package."""
 
-    def __init__(self, path):
+    def __init__(self, path, root=None, data_dir=None):
+        """
+
+        :param string path: The path of the package, relative to the server root and the data directory.
+        :param string root: (Optional) The server root URL. Defaults to :data:`SERVER_ROOT`.
+        :param string data_dir: (Optional) The directory to download to. Defaults to the configured data directory.
+        """
         self.path = path
+        self.root = root
+        self.data_dir = data_dir
 
     @property
     def remote_path(self):
         """"""
-        return SERVER_ROOT + self.path
+        return (self.root or SERVER_ROOT) + self.path
 
     @property
     def local_path(self):
         """"""
+        if self.data_dir is not None:
+            return os.path.join(self.data_dir, self.path)
         return find_data(self.path, warn=False)
 
     def remote_exists(self):
         """"""
+        import requests
         r = requests.get(self.remote_path)
         if r.status_code in {400, 401, 403, 404}:
             return False
@@ -59,25 +88,76 @@ class Package(object):
             return True
         return False
 
-    def download(self, force=False):
-        """"""
+    def download(self, force=False, sha256=None):
+        """Download the package. Return True if it was downloaded, or False if the existing file is up to date.
+
+        The file is downloaded to a ``.part`` file, which is moved into place once complete, so an interrupted download
+        never leaves a truncated package. If a ``.part`` file exists, the download is resumed from where it stopped, as
+        long as the remote file hasn't changed since. This is checked with the ``ETag`` or ``Last-Modified`` date the
+        server sent when the download started, so servers that send neither can't resume downloads.
+
+        :param bool force: (Optional) Download the package even if the existing file is up to date.
+        :param string sha256: (Optional) The expected checksum, from the manifest. If not given, an existing file is
+                              only checked by comparing its size with the remote file, and downloads aren't verified.
+        :raises DownloadError: If the downloaded file doesn't match the checksum.
+        """
+        import requests
         log.debug('Considering %s', self.remote_path)
         ensure_dir(os.path.dirname(self.local_path))
-        r = requests.get(self.remote_path, stream=True)
-        r.raise_for_status()
+        part_path = self.local_path + PART_EXT
         # Check if already downloaded
-        if self.local_exists():
-            # Skip if existing, unless the file has changed
-            if not force and os.path.getsize(self.local_path) == int(r.headers['content-length']):
-                log.debug('Skipping existing: %s', self.local_path)
-                return False
+        if self.local_exists() and not force:
+            if sha256 is not None:
+                if file_sha256(self.local_path) == sha256:
+                    log.debug('Skipping existing: %s', self.local_path)
+                    return False
+                log.debug('Checksum mismatch for %s', self.local_path)
             else:
+                r = requests.head(self.remote_path, timeout=TIMEOUT)
+                r.raise_for_status()
+                if os.path.getsize(self.local_path) == int(r.headers['content-length']):
+                    log.debug('Skipping existing: %s', self.local_path)
+                    return False
                 log.debug('File size mismatch for %s', self.local_path)
-        log.info('Downloading %s to %s', self.remote_path, self.local_path)
-        with io.open(self.local_path, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=1024*1024):  # Large 10MB chunks
+        validator_path = part_path + VALIDATOR_EXT
+        if force:
+            _remove_part(part_path)
+        offset = 0
+        headers = {}
+        validator = _read_validator(validator_path) if os.path.isfile(part_path) else None
+        if validator:
+            offset = os.path.getsize(part_path)
+            # If the remote file has changed, the server ignores the range and sends the whole file
+            headers = {'Range': 'bytes=%s-' % offset, 'If-Range': validator}
+        r = requests.get(self.remote_path, headers=headers, stream=True, timeout=TIMEOUT)
+        if r.status_code == 416 or (r.status_code == 206 and _range_start(r) != offset):
+            # The partial file is no smaller than the remote file, or the server sent a different range
+            r.close()
+            _remove_part(part_path)
+            return self.download(force=force, sha256=sha256)
+        r.raise_for_status()
+        checksum = hashlib.sha256()
+        if r.status_code == 206:
+            log.info('Resuming download of %s from %s bytes', self.remote_path, offset)
+            with io.open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    checksum.update(chunk)
+            mode = 'ab'
+        else:
+            log.info('Downloading %s to %s', self.remote_path, self.local_path)
+            mode = 'wb'
+            _write_validator(validator_path, r)
+        with io.open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
                 if chunk:
+                    checksum.update(chunk)
                     f.write(chunk)
+        if sha256 is not None and checksum.hexdigest() != sha256:
+            _remove_part(part_path)
+            raise DownloadError('Checksum mismatch for %s: expected %s, got %s' % (self.path, sha256, checksum.hexdigest()))
+        replace_file(part_path, self.local_path)
+        if os.path.isfile(validator_path):
+            os.remove(validator_path)
         return True
 
     def __repr__(self):
@@ -87,6 +167,41 @@ class Package(object):
         return '<Package: %s>' % self.path
 
 
+def _read_validator(path):
+    """Return the validator recorded for a partial download, or None."""
+    if os.path.isfile(path):
+        with io.open(path, 'r', encoding='utf8') as f:
+            return f.read().strip() or None
+    return None
+
+
+def _write_validator(path, response):
+    """Record the validator of a response, to check the remote file is unchanged if the download is resumed.
+
+    Weak ETags can't be used with If-Range, so the Last-Modified date is used instead.
+    """
+    etag = response.headers.get('ETag')
+    validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+    if validator:
+        with io.open(path, 'w', encoding='utf8') as f:
+            f.write(six.text_type(validator))
+    elif os.path.isfile(path):
+        os.remove(path)
+
+
+def _range_start(response):
+    """Return the first byte position of a partial response, from its Content-Range header."""
+    m = re.match(r'bytes\s+(\d+)-', response.headers.get('Content-Range', ''))
+    return int(m.group(1)) if m else None
+
+
+def _remove_part(part_path):
+    """Remove a partial download and its validator."""
+    for path in (part_path, part_path + VALIDATOR_EXT):
+        if os.path.isfile(path):
+            os.remove(path)
+
+
 #: Current active data packages
 PACKAGES = [
     Package('models/cem_crf-1.0.pickle'),
@@ -110,6 +225,91 @@ PACKAGES = [
 ]
 
 
+#: The outcome of downloading a package. Downloaded is False if the package was up to date, and error is the exception
+#: raised if it couldn't be downloaded.
+DownloadResult = namedtuple('DownloadResult', ['package', 'downloaded', 'error'])
+
+
+def file_sha256(path):
+    """Return the hex sha256 checksum of a file."""
+    checksum = hashlib.sha256()
+    with io.open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def get_manifest(root=None):
+    """Return the manifest from a data server, or None if it doesn't have one.
+
+    Any response other than a JSON object, such as an error or a mirror's HTML error page, means there is no manifest.
+
+    :param string root: (Optional) The server root URL. Defaults to :data:`SERVER_ROOT`.
+    :returns: A dict with the ``sha256`` checksum and ``size`` of each package, keyed by package path.
+    :raises requests.RequestException: If the server can't be reached.
+    """
+    import requests
+    r = requests.get((root or SERVER_ROOT) + MANIFEST_PATH, timeout=TIMEOUT)
+    if r.status_code != 200:
+        log.debug('No manifest on %s: status %s', root or SERVER_ROOT, r.status_code)
+        return None
+    try:
+        manifest = r.json()
+    except ValueError as e:
+        log.debug('No manifest on %s: %s', root or SERVER_ROOT, e)
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def make_manifest(packages=None):
+    """Return a manifest for the downloaded packages, to be served at :data:`MANIFEST_PATH`.
+
+    :param list[Package] packages: (Optional) The packages to include. Defaults to :data:`PACKAGES`.
+    """
+    packages = packages if packages is not None else PACKAGES
+    return {
+        p.path: {'sha256': file_sha256(p.local_path), 'size': os.path.getsize(p.local_path)}
+        for p in packages if p.local_exists()
+    }
+
+
+def download_packages(packages=None, force=False, workers=4):
+    """Download packages concurrently, checking them against the server's manifest.
+
+    Packages that fail to download don't stop the others, but are returned with the error.
+
+    :param list[Package] packages: (Optional) The packages to download. Defaults to :data:`PACKAGES`.
+    :param bool force: (Optional) Download packages even if the existing files are up to date.
+    :param int workers: (Optional) The number of packages to download at once.
+    :rtype: list[DownloadResult]
+    """
+    from multiprocessing.pool import ThreadPool
+    packages = packages if packages is not None else PACKAGES
+    manifests = {}
+    for root in set(p.root for p in packages):
+        manifests[root] = get_manifest(root)
+        if manifests[root] is None:
+            log.warning('No manifest on %s, so packages can\'t be verified', root or SERVER_ROOT)
+
+    def download(package):
+        try:
+            entry = (manifests[package.root] or {}).get(package.path)
+            if manifests[package.root] is not None and entry is None:
+                raise DownloadError('%s is not in the manifest' % package.path)
+            sha256 = entry['sha256'] if entry else None
+            return DownloadResult(package, package.download(force=force, sha256=sha256), None)
+        except Exception as e:
+            log.debug('Failed to download %s', package.path, exc_info=True)
+            return DownloadResult(package, False, e)
+
+    pool = ThreadPool(max(1, min(workers, len(packages))))
+    try:
+        return pool.map(download, packages)
+    finally:
+        pool.close()
+        pool.join()
+
+
 def get_data_dir():
     """Return path to the data directory."""
     # Use data_dir config value if set, otherwise use OS-dependent data directory given by appdirs
@@ -131,17 +331,39 @@ def find_data(path, warn=True):
 _model_cache = {}
 
 
+def _find_mmap(abspath):
+    """Return the path of an up-to-date memory-mapped version of a model, or None if there isn't one."""
+    from .mmapmodel import MMAP_EXT, mmap_path
+    if abspath.endswith(MMAP_EXT):
+        return abspath
+    mmap_abspath = mmap_path(abspath)
+    if os.path.isfile(mmap_abspath):
+        if not os.path.isfile(abspath) or os.path.getmtime(mmap_abspath) >= os.path.getmtime(abspath):
+            return mmap_abspath
+        log.warning('Ignoring %s as it is older than %s. Run `cde data mmap` to update it.' % (mmap_abspath, abspath))
+    return None
+
+
 def load_model(path):
-    """Load a model from a pickle file in the data directory. Cached so model is only loaded once."""
+    """Load a model from a pickle file in the data directory. Cached so model is only loaded once.
+
+    If the model has been converted to the memory-mapped format with ``cde data mmap``, that is loaded instead, so
+    that its memory is shared with other processes.
+    """
     abspath = find_data(path)
     cached = _model_cache.get(abspath)
     if cached is not None:
         log.debug('Using cached copy of %s' % path)
         return cached
     log.debug('Loading model %s' % path)
+    mmap_abspath = _find_mmap(abspath)
     try:
-        with io.open(abspath, 'rb') as f:
-            model = six.moves.cPickle.load(f)
+        if mmap_abspath is not None:
+            from .mmapmodel import load_model as load_mmap_model
+            model = load_mmap_model(mmap_abspath)
+        else:
+            with io.open(abspath, 'rb') as f:
+                model = six.moves.cPickle.load(f)
     except IOError:
         raise ModelNotFoundError('Could not load %s. Have you run `cde data download`?' % path)
     _model_cache[abspath] = model
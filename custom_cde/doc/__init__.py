@@ -16,3 +16,5 @@ from .document import Document
 from .text import Text, Title, Heading, Paragraph, Footnote, Citation, Caption, Sentence, Span, Token
 from .figure import Figure
 from .table import Table
+from .cache import AnalysisCache, MemoryAnalysisCache
+from .profile import ExtractionProfile
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.doc.cache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Caches for sentence-level analysis.
+
+Tokenization, part-of-speech tagging and chemical entity tagging for a sentence only depend on the sentence text and
+the configured tokenizer, lexicon and taggers. These caches store that analysis so it isn't recomputed when the same
+text is processed again, e.g. boilerplate that repeats within a batch, or when re-running extraction over a corpus after
+changing a parser.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import six
+
+from .. import __version__
+from ..data import get_data_dir
+from ..nlp.tokenize import BaseTokenizer
+from ..utils import sqlite_connection
+
+
+log = logging.getLogger(__name__)
+
+
+def component_id(component):
+    """Return a string that identifies the configuration of a tokenizer, lexicon or tagger.
+
+    This includes the class and any model files, along with those of any sub-taggers. For tokenizers, it also includes
+    options set on the instance, such as ``split_last_stop``.
+    """
+    if not component:
+        return repr(component)
+    cls = component.__class__
+    parts = ['%s.%s' % (cls.__module__, cls.__name__)]
+    for attr in ('model', 'clusters_path'):
+        value = getattr(component, attr, None)
+        if value:
+            parts.append('%s=%s' % (attr, value))
+    if isinstance(component, BaseTokenizer):
+        options = vars(component)
+        for attr in sorted(options):
+            value = options[attr]
+            if attr not in ('model', 'clusters_path') and not attr.startswith('_') and \
+                    isinstance(value, (bool, float, type(None)) + six.integer_types + six.string_types):
+                parts.append('%s=%r' % (attr, value))
+    for tagger in getattr(component, 'taggers', []):
+        parts.append(component_id(tagger))
+    return '(%s)' % ' '.join(parts)
+
+
+def spans_key(text):
+    """Return a hash that identifies the sentence split of a text passage, given its text and sentence tokenizer."""
+    key = '%s %s\n%s' % (__version__, component_id(text.sentence_tokenizer), text.text)
+    return hashlib.sha1(key.encode('utf8')).hexdigest()
+
+
+def analysis_key(sentence):
+    """Return a hash that identifies the analysis of a sentence, given its text and tokenizer/tagger configuration."""
+    config = ' '.join(component_id(c) for c in (sentence.word_tokenizer, sentence.lexicon, sentence.pos_tagger,
+                                                sentence.ner_tagger))
+    key = '%s %s\n%s' % (__version__, config, sentence.text)
+    return hashlib.sha1(key.encode('utf8')).hexdigest()
+
+
+class AnalysisCache(object):
+    """Persistent on-disk cache of sentence analysis, stored in an SQLite database.
+
+    Usage::
+
+        Sentence.analysis_cache = AnalysisCache()
+
+    Entries are keyed by a hash of the sentence text and the tokenizer, lexicon and tagger configuration (including
+    model file versions), so changing any of those automatically misses the cache. The database can be shared by
+    multiple processes.
+
+    Writes made within a :meth:`batch` block are held in memory and written together in one transaction at the end of
+    the block, rather than committed one sentence at a time. Documents use a batch while they are analyzed and while
+    records are extracted.
+    """
+
+    def __init__(self, path=None):
+        """
+
+        :param string path: (Optional) Path to the database file. Defaults to ``cache/analysis.sqlite`` within the
+                            data directory.
+        """
+        self.path = path if path is not None else os.path.join(get_data_dir(), 'cache', 'analysis.sqlite')
+        self._conn = None
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        # Writes waiting for the end of a batch, by table
+        self._pending = {'analysis': OrderedDict(), 'spans': OrderedDict()}
+        self._batch_depth = 0
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.path)
+
+    @property
+    def conn(self):
+        """The database connection. Connections are not shared with forked child processes.
+
+        The connection is shared by all threads in a process, so it must only be used while holding the lock.
+        """
+        self._check_process()
+        if self._conn is None:
+            self._conn = sqlite_connection(self.path, [
+                'CREATE TABLE IF NOT EXISTS analysis (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+                'CREATE TABLE IF NOT EXISTS spans (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+            ])
+        return self._conn
+
+    def _check_process(self):
+        """Discard the connection and any batch inherited from a parent process."""
+        if self._pid != os.getpid():
+            self._conn = None
+            self._pending = {'analysis': OrderedDict(), 'spans': OrderedDict()}
+            self._batch_depth = 0
+            self._pid = os.getpid()
+
+    def _get(self, table, key):
+        with self._lock:
+            self._check_process()
+            value = self._pending[table].get(key)
+            if value is None:
+                row = self.conn.execute('SELECT value FROM %s WHERE key = ?' % table, (key,)).fetchone()
+                value = row[0] if row is not None else None
+        return json.loads(value) if value is not None else None
+
+    def _put(self, table, key, value):
+        with self._lock:
+            self._check_process()
+            self._pending[table][key] = value
+            if not self._batch_depth:
+                self.flush()
+
+    def get(self, sentence):
+        """Return the cached analysis for a sentence, or None if it isn't cached."""
+        value = self._get('analysis', analysis_key(sentence))
+        if value is None:
+            return None
+        spans, pos_tags, ner_tags = value
+        return [tuple(span) for span in spans], pos_tags, ner_tags
+
+    def put(self, sentence, analysis):
+        """Store the analysis for a sentence."""
+        self._put('analysis', analysis_key(sentence), json.dumps(analysis, ensure_ascii=False, separators=(',', ':')))
+
+    def get_spans(self, text):
+        """Return the cached sentence spans for a text passage, or None if they aren't cached."""
+        value = self._get('spans', spans_key(text))
+        if value is None:
+            return None
+        return [tuple(span) for span in value]
+
+    def put_spans(self, text, spans):
+        """Store the sentence spans for a text passage."""
+        self._put('spans', spans_key(text), json.dumps(list(spans), separators=(',', ':')))
+
+    @contextmanager
+    def batch(self):
+        """Hold writes in memory until the end of the block, then write them in one transaction.
+
+        Usage::
+
+            with cache.batch():
+                records = doc.records
+
+        Batches can be nested, in which case writes are held until the outermost block ends.
+        """
+        with self._lock:
+            self._check_process()
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+
+    def flush(self):
+        """Write any writes held by a batch to the database."""
+        with self._lock:
+            self._check_process()
+            pending = [(table, list(values.items())) for table, values in self._pending.items() if values]
+            if not pending:
+                return
+            for values in self._pending.values():
+                values.clear()
+            conn = self.conn
+            conn.execute('BEGIN')
+            try:
+                for table, rows in pending:
+                    conn.executemany('INSERT OR REPLACE INTO %s (key, value) VALUES (?, ?)' % table, rows)
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            for values in self._pending.values():
+                values.clear()
+            self.conn.execute('DELETE FROM analysis')
+            self.conn.execute('DELETE FROM spans')
+
+    def close(self):
+        """Write any held writes and close the database connection."""
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM analysis').fetchone()[0]
+
+
+class MemoryAnalysisCache(object):
+    """In-memory cache of sentence analysis, bounded by a least-recently-used eviction policy.
+
+    Usage::
+
+        Sentence.analysis_cache = MemoryAnalysisCache(maxsize=50000)
+
+    Identical sentence texts with identical tokenizer and tagger configuration share one computed analysis within a
+    process, and identical paragraphs with identical sentence tokenizers share one sentence split. Optionally, another
+    cache (e.g. an :class:`AnalysisCache`) can be used as a backend, which is consulted on a miss and written through
+    on every store.
+
+    Only the sentence-level analysis is shared. Final NER tags and chemical entity mentions also depend on abbreviations
+    defined elsewhere in the document, so they are still computed per sentence.
+    """
+
+    def __init__(self, maxsize=10000, backend=None):
+        """
+
+        :param int maxsize: (Optional) Maximum number of sentences and paragraph sentence splits to hold in memory.
+        :param backend: (Optional) Another cache to consult on a miss and write through to.
+        """
+        self.maxsize = maxsize
+        self.backend = backend
+        #: Number of lookups that were found in memory.
+        self.hits = 0
+        #: Number of lookups that were not found in memory.
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<%s: %s/%s entries, hit rate %.3f>' % (self.__class__.__name__, len(self), self.maxsize, self.hit_rate)
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def hit_rate(self):
+        """The fraction of lookups that were found in memory."""
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def _store(self, key, analysis):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = analysis
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _get(self, key, load):
+        """Return the value for a key from memory, or from the backend using load if it isn't in memory."""
+        with self._lock:
+            value = self._data.pop(key, None)
+            if value is not None:
+                # Re-insert to mark as most recently used
+                self._data[key] = value
+                self.hits += 1
+                return value
+            self.misses += 1
+        if self.backend is not None:
+            value = load()
+            if value is not None:
+                self._store(key, value)
+        return value
+
+    def get(self, sentence):
+        """Return the cached analysis for a sentence, or None if it isn't cached."""
+        return self._get(analysis_key(sentence), lambda: self.backend.get(sentence))
+
+    def put(self, sentence, analysis):
+        """Store the analysis for a sentence."""
+        self._store(analysis_key(sentence), analysis)
+        if self.backend is not None:
+            self.backend.put(sentence, analysis)
+
+    def get_spans(self, text):
+        """Return the cached sentence spans for a text passage, or None if they aren't cached."""
+        return self._get(spans_key(text), lambda: self.backend.get_spans(text))
+
+    def put_spans(self, text, spans):
+        """Store the sentence spans for a text passage."""
+        self._store(spans_key(text), spans)
+        if self.backend is not None:
+            self.backend.put_spans(text, spans)
+
+    @contextmanager
+    def batch(self):
+        """Hold writes to the backend until the end of the block, if the backend supports it."""
+        batch = getattr(self.backend, 'batch', None)
+        if batch is None:
+            yield self
+        else:
+            with batch():
+                yield self
+
+    def clear(self):
+        """Remove all entries from memory and reset the hit statistics. The backend is not cleared."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
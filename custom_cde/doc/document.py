@@ -14,14 +14,19 @@ from __future__ import unicode_literals
 
 from abc import ABCMeta, abstractproperty
 import collections
+from contextlib import contextmanager
 import io
 import json
 import logging
+import multiprocessing
+import operator
+from multiprocessing.pool import ThreadPool
 
 import six
 
 from ..utils import python_2_unicode_compatible
-from .text import Paragraph, Citation, Footnote, Heading, Title
+from .element import CaptionedElement
+from .text import Paragraph, Citation, Footnote, Heading, Title, Text, Sentence
 from .table import Table
 from .figure import Figure
 from ..errors import ReaderError
@@ -32,7 +37,32 @@ from ..text import get_encoding
 log = logging.getLogger(__name__)
 
 
+#: Attributes that determine the sentence-level analysis. Worker processes rebuild these from the owning class.
+ANALYSIS_ATTRS = ('word_tokenizer', 'lexicon', 'pos_tagger', 'ner_tagger')
+
+
+def _analyze_sentence(args):
+    """Return the analysis for a sentence text, using the tokenizer and taggers configured on the owner class.
+
+    This is a module-level function so it can be pickled and sent to worker processes.
+    """
+    owner_cls, text = args
+    sentence = Sentence(text, **{attr: getattr(owner_cls, attr) for attr in ANALYSIS_ATTRS})
+    return sentence.analysis
+
+
 @python_2_unicode_compatible
+@contextmanager
+def _cache_batch():
+    """Hold writes to the sentence analysis cache until the end of the block, if the cache supports it."""
+    batch = getattr(Sentence.analysis_cache, 'batch', None)
+    if batch is None:
+        yield
+    else:
+        with batch():
+            yield
+
+
 class BaseDocument(six.with_metaclass(ABCMeta, collections.Sequence)):
     """Abstract base class for a Document."""
 
@@ -123,6 +153,7 @@ class Document(BaseDocument):
         :param string fname: (Optional) The filename. Used to help determine file format.
         :param list[chemdataextractor.reader.base.BaseReader] readers: (Optional) List of readers to use.
         """
+        from ..reader.markup import LxmlReader
         if readers is None:
             from ..reader import DEFAULT_READERS
             readers = DEFAULT_READERS
@@ -130,12 +161,17 @@ class Document(BaseDocument):
         if isinstance(fstring, six.text_type):
             raise ReaderError('from_string expects a byte string, not a unicode string')
 
+        # lxml trees built by readers that have been tried, so failed attempts don't cause the input to be parsed again
+        trees = {}
         for reader in readers:
             # Skip reader if we don't think it can read file
             if not reader.detect(fstring, fname=fname):
                 continue
             try:
-                d = reader.readstring(fstring)
+                if isinstance(reader, LxmlReader):
+                    d = reader.parse(fstring, trees=trees)
+                else:
+                    d = reader.readstring(fstring)
                 log.debug('Parsed document with %s' % reader.__class__.__name__)
                 return d
             except ReaderError:
@@ -147,12 +183,143 @@ class Document(BaseDocument):
         """Return a list of document elements."""
         return self._elements
 
+    def _iter_sentences(self):
+        """Yield an (owner, sentence) tuple for every sentence in the document, including captions and table cells."""
+        for el in self.elements:
+            texts = []
+            if isinstance(el, Text):
+                texts.append(el)
+            elif isinstance(el, CaptionedElement):
+                texts.append(el.caption)
+            if isinstance(el, Table):
+                for row in el.headings + el.rows:
+                    for cell in row:
+                        yield cell, cell
+                texts.extend(el.footnotes)
+            for text in texts:
+                for sentence in text.sentences:
+                    yield text, sentence
+
+    def analyze(self, workers=None, threads=False, chunksize=None, pool=None):
+        """Run the sentence-level analysis (tokens, POS tags and unprocessed NER tags) for every element in parallel.
+
+        The results are attached to each Sentence, so subsequent document-level processing (abbreviation detection,
+        record extraction and merging) runs serially without calling the tokenizer or taggers again.
+
+        Worker processes rebuild each sentence's tokenizer and taggers from the class of the element that owns it, so
+        sentences configured with custom tokenizer or tagger instances are analyzed in this process instead.
+
+        A pool is created and closed for each call, unless one is passed in. To analyze many documents, create a pool
+        once and pass it to each call::
+
+            pool = multiprocessing.Pool()
+            for doc in docs:
+                doc.analyze(pool=pool)
+
+        :param int workers: (Optional) Number of workers. Defaults to the number of CPUs.
+        :param bool threads: (Optional) Use a pool of threads instead of processes.
+        :param int chunksize: (Optional) Number of sentences sent to a worker at a time.
+        :param pool: (Optional) A :class:`multiprocessing.Pool` or :class:`multiprocessing.pool.ThreadPool` to use. It
+                     is left open. A ThreadPool analyzes sentences in threads, as with ``threads``.
+        :returns: This Document, to allow chaining.
+        """
+        workers = workers or multiprocessing.cpu_count()
+        if pool is None:
+            pool = ThreadPool(workers) if threads else multiprocessing.Pool(workers)
+            try:
+                return self.analyze(workers=workers, chunksize=chunksize, pool=pool)
+            finally:
+                pool.close()
+                pool.join()
+        with _cache_batch():
+            pairs = list(self._iter_sentences())
+            if chunksize is None:
+                chunksize = max(1, len(pairs) // (4 * workers))
+            log.debug('%s: Analyzing %s sentences with %s workers' % (self.__class__.__name__, len(pairs), workers))
+            if isinstance(pool, ThreadPool):
+                # Each sentence memoizes its own results, so there is nothing to attach afterwards
+                pool.map(operator.attrgetter('analysis'), [sentence for owner, sentence in pairs], chunksize)
+                return self
+            remote = []
+            local = []
+            for owner, sentence in pairs:
+                if all(getattr(sentence, attr) is getattr(type(owner), attr) for attr in ANALYSIS_ATTRS):
+                    remote.append((owner, sentence))
+                else:
+                    local.append(sentence)
+            result = pool.map_async(_analyze_sentence, [(type(owner), sentence.text) for owner, sentence in remote], chunksize)
+            # Analyze sentences that can't be sent to a worker while the pool is busy
+            for sentence in local:
+                sentence.analysis
+            analyses = result.get()
+        for (owner, sentence), analysis in zip(remote, analyses):
+            sentence.analysis = analysis
+        return self
+
     # TODO: memoized_property?
     @property
     def records(self):
         """Return chemical records extracted from this document."""
-        records = ModelList()
+        return self._extract_records(release=False)
+
+    def extract_records(self, profile=None, release=False):
+        """Return chemical records extracted from this document, optionally using only some of the parsers.
+
+        Usage::
+
+            records = doc.extract_records(profile=ExtractionProfile(properties=['mp', 'tg']))
+
+        With ``release``, elements are processed in order and each element's tokens, tags and entity mentions are
+        discarded as soon as the next element has been processed, keeping memory use low for very long documents.
+        Abbreviations found anywhere in the document affect named entity tags everywhere, so first every element is
+        tagged to find them, keeping only a compact form of each sentence's tokens and tags. Records are merged with
+        contextual records and each other across the whole document, so none are final until the last element has been
+        processed: only the analysis is released as extraction goes, and records are still returned together at the end.
+        The records are the same either way.
+
+        :param chemdataextractor.doc.profile.ExtractionProfile profile: (Optional) The parsers to use. Defaults to the
+                                                                        parsers configured on each element.
+        :param bool release: (Optional) Whether to discard analysis of each element once it has been processed.
+        """
+        return self._extract_records(release=release, profile=profile)
+
+    def _extract_records(self, release, profile=None):
+        """Return chemical records extracted from this document, optionally discarding analysis of processed elements."""
+        with _cache_batch():
+            if profile is not None:
+                with profile.configure(self):
+                    return self._extract_configured_records(release, profile)
+            return self._extract_configured_records(release, profile)
+
+    def _extract_configured_records(self, release, profile):
+        """Return chemical records extracted from this document, once any profile has been applied to its elements."""
+        abbreviation_definitions = self._find_abbreviation_definitions(release)
         contextual_records = []
+        records = ModelList(*self._iter_element_records(contextual_records, release))
+        return self._merge_records(records, contextual_records, abbreviation_definitions)
+
+    def _find_abbreviation_definitions(self, release=False):
+        """Return abbreviation definitions from every element, finding them on first use.
+
+        They are needed by every sentence, so they are kept once found. The list is only stored once complete, so
+        extractions running at the same time on this document at worst both find it.
+        """
+        abbreviation_definitions = self.__dict__.get('_abbreviation_definitions')
+        if abbreviation_definitions is None:
+            abbreviation_definitions = []
+            for el in self.elements:
+                # Elements a profile skips can still define abbreviations used elsewhere, so results don't change with it
+                abbreviation_definitions.extend(el.abbreviation_definitions)
+                if release:
+                    el.release(keep_analysis=True)
+            self._abbreviation_definitions = abbreviation_definitions
+        return abbreviation_definitions
+
+    def _iter_element_records(self, contextual_records, release):
+        """Yield records from each element in turn, resolving unidentified records from preceding elements.
+
+        Contextual records are added to contextual_records instead of being yielded.
+        """
         head_def_record = None
         head_def_record_i = None
         last_product_record = None
@@ -255,14 +422,22 @@ class Document(BaseDocument):
                         else:
                             # Consider continue here to filter records missing name/label...
                             pass
-                records.append(record)
+                yield record
+
+            # The previous element is no longer needed
+            if release and i > 0:
+                self.elements[i - 1].release()
+        if release and self.elements:
+            self.elements[-1].release()
 
+    def _merge_records(self, records, contextual_records, abbreviation_definitions):
+        """Merge in contextual records and abbreviations, and merge records with shared names/labels."""
         for record in records:
             for contextual_record in contextual_records:
                 record.merge_contextual(contextual_record)
 
         for record in records:
-            for short, long, entity in self.abbreviation_definitions:
+            for short, long, entity in abbreviation_definitions:
                 if entity == 'CM':
                     name = ' '.join(long)
                     abbrev = ' '.join(short)
@@ -342,7 +517,7 @@ class Document(BaseDocument):
     @property
     def abbreviation_definitions(self):
         """"""
-        return [ab for el in self.elements for ab in el.abbreviation_definitions]
+        return self._find_abbreviation_definitions()
 
     @property
     def ner_tags(self):
@@ -64,6 +64,10 @@ class BaseElement(six.with_metaclass(ABCMeta)):
         """Convert Element to JSON string."""
         return json.dumps(self.serialize(), *args, **kwargs)
 
+    def release(self, keep_analysis=False):
+        """Discard memoized analysis to free memory. Subclasses that memoize analysis should override this."""
+        pass
+
 
 @python_2_unicode_compatible
 class CaptionedElement(BaseElement):
@@ -101,6 +105,10 @@ class CaptionedElement(BaseElement):
         """"""
         return self.caption.abbreviation_definitions
 
+    def release(self, keep_analysis=False):
+        """Discard memoized analysis of the caption to free memory."""
+        self.caption.release(keep_analysis=keep_analysis)
+
     @property
     def ner_tags(self):
         """Return a list of part of speech tags for each sentence in this text passage."""
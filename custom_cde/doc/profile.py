@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.doc.profile
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Extraction profiles, which select the parsers used to extract records from a document.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from contextlib import contextmanager
+import logging
+
+from .element import CaptionedElement
+from .table import Table
+from .text import Caption, Text
+
+
+log = logging.getLogger(__name__)
+
+
+#: Parsers that identify compounds and the conditions of measurements. These are always used.
+BASE_PARSERS = (
+    'CompoundParser', 'ChemicalLabelParser', 'CompoundHeadingParser', 'ContextParser', 'CaptionContextParser',
+    'SolventHeadingParser', 'SolventInHeadingParser', 'TempInHeadingParser'
+)
+
+#: The parsers for each property, keyed by property name. Parsers are identified by class name, so their grammars are
+#: only built when they are used, and table parsers are identified by their heading parser.
+PROPERTY_PARSERS = {
+    'nmr': ('NmrParser',),
+    'ir': ('IrParser', 'IrHeadingParser'),
+    'uvvis': ('UvvisParser', 'UvvisAbsEmiQuantumYieldHeadingParser', 'UvvisEmiQuantumYieldHeadingParser',
+              'UvvisEmiHeadingParser', 'UvvisAbsHeadingParser', 'ExtinctionHeadingParser'),
+    'quantum_yield': ('UvvisAbsEmiQuantumYieldHeadingParser', 'UvvisEmiQuantumYieldHeadingParser',
+                      'QuantumYieldHeadingParser'),
+    'fluorescence_lifetime': ('FluorescenceLifetimeHeadingParser',),
+    'electrochemical_potential': ('ElectrochemicalPotentialHeadingParser',),
+    'mp': ('MpParser', 'MeltingPointHeadingParser'),
+    'tg': ('TgParser', 'GlassTransitionHeadingParser'),
+    'boiling_point': ('BoilingPointParser', 'BoilingPointHeadingParser'),
+    'homo': ('HOMOParser', 'HOMOLevelHeadingParser'),
+    'lumo': ('LUMOParser', 'LUMOLevelHeadingParser'),
+    'band_gap': ('BandGapParser', 'BandGapHeadingParser'),
+    'fermi_energy': ('FermiEnergyParser', 'FermiEnergyHeadingParser'),
+    'corrosion_inhibition': ('CorrosionInhibitionParser', 'CorrosionInhibitionHeadingParser'),
+    'enthalpy_of_fusion': ('FusionEnthalpyParser', 'FusionEnthalpyHeadingParser'),
+    'enthalpy_of_sublimation': ('SublimationEnthalpyParser', 'SublimationEnthalpyHeadingParser'),
+    'enthalpy_of_vaporization': ('VaporizationEnthalpyParser', 'VaporizationEnthalpyHeadingParser'),
+    'M_n': ('NumAvgMolecularWeightParser', 'MnHeadingParser'),
+    'M_w': ('WeightAvgMolecularWeightParser', 'MwHeadingParser'),
+    'dispersity': ('DispersityParser', 'DispersityHeadingParser'),
+    'modulus': ('ModulusParser', 'ModulusHeadingParser'),
+    'crystallinity': ('CrystallinityParser', 'CrystallinityHeadingParser'),
+    'pce': ('PCEParser', 'PCEHeadingParser'),
+    'ff': ('FFParser', 'FFHeadingParser'),
+    'jsc': ('JscParser', 'JscHeadingParser'),
+    'voc': ('VocParser', 'VocHeadingParser'),
+}
+
+
+class ExtractionProfile(object):
+    """A selection of the parsers used to extract records from a document.
+
+    Usage::
+
+        profile = ExtractionProfile(properties=['mp', 'tg'], text=False)
+        records = doc.extract_records(profile=profile)
+
+    The parsers are chosen from those configured on each element, so the element classes don't need to be modified and
+    documents can be processed with different profiles at the same time. Compound and context parsers are always kept,
+    as records need to be identified and their conditions merged in.
+
+    Stages that aren't needed are skipped. Sentences with no parsers are not tagged, and table cells aren't tagged if the
+    table has no parsers. Every element is still searched for abbreviation definitions, as they affect the tags of
+    the elements that are extracted, but only sentences that define an abbreviation are run through the chemical
+    entity recognizer to do so.
+    """
+
+    def __init__(self, properties=None, text=True, captions=True, tables=True, base_parsers=BASE_PARSERS):
+        """
+
+        :param list[string] properties: (Optional) Names of the properties to extract, from :data:`PROPERTY_PARSERS`.
+                                        Defaults to all properties.
+        :param bool text: (Optional) Whether to extract records from titles, headings, paragraphs and footnotes.
+        :param bool captions: (Optional) Whether to extract records from figure and table captions.
+        :param bool tables: (Optional) Whether to extract records from table cells and table footnotes.
+        :param list[string] base_parsers: (Optional) Class names of the parsers kept along with those of the selected
+                                          properties. Defaults to :data:`BASE_PARSERS`. Ignored if no properties are
+                                          selected, as every parser is then used.
+        """
+        if properties is not None:
+            unknown = [p for p in properties if p not in PROPERTY_PARSERS]
+            if unknown:
+                raise ValueError('Unknown properties: %s. Choose from: %s' % (', '.join(unknown), ', '.join(sorted(PROPERTY_PARSERS))))
+            self.properties = tuple(properties)
+            allowed = set(base_parsers)
+            for name in self.properties:
+                allowed.update(PROPERTY_PARSERS[name])
+            self.allowed_parsers = frozenset(allowed)
+        else:
+            self.properties = None
+            self.allowed_parsers = None
+        self.text = text
+        self.captions = captions
+        self.tables = tables
+
+    def __repr__(self):
+        return '%s(properties=%r, text=%r, captions=%r, tables=%r)' % (
+            self.__class__.__name__, self.properties, self.text, self.captions, self.tables)
+
+    def select(self, parsers, enabled=True):
+        """Return the parsers in a list that this profile uses.
+
+        :param list parsers: Sentence parsers, or table parser tuples.
+        :param bool enabled: (Optional) False if the element type is excluded, in which case no parsers are returned.
+        """
+        if not enabled:
+            return []
+        if self.allowed_parsers is None:
+            return parsers
+        return [p for p in parsers if type(p[0] if isinstance(p, tuple) else p).__name__ in self.allowed_parsers]
+
+    def _iter_settings(self, element):
+        """Yield an (object, parsers) tuple for the element and every text it contains that has parsers."""
+        if isinstance(element, Text):
+            yield element, self.select(element.parsers, self.captions if isinstance(element, Caption) else self.text)
+        if isinstance(element, CaptionedElement):
+            yield element.caption, self.select(element.caption.parsers, self.captions)
+        if isinstance(element, Table):
+            yield element, self.select(element.parsers, self.tables)
+            for footnote in element.footnotes:
+                yield footnote, self.select(footnote.parsers, self.tables)
+
+    @contextmanager
+    def configure(self, document):
+        """Context manager that sets the parsers of every element in a document, restoring them afterwards.
+
+        :param chemdataextractor.doc.document.Document document: The document to configure.
+        """
+        saved = []
+        for element in document.elements:
+            for obj, parsers in self._iter_settings(element):
+                saved.append((obj, obj.__dict__.get('parsers')))
+                _set_parsers(obj, parsers)
+        try:
+            yield document
+        finally:
+            for obj, parsers in reversed(saved):
+                _set_parsers(obj, parsers)
+
+
+def _set_parsers(obj, parsers):
+    """Set the parsers of a text or table, including any sentences that have already been created."""
+    if parsers is None:
+        obj.__dict__.pop('parsers', None)
+    else:
+        obj.parsers = parsers
+    if isinstance(obj, Text):
+        for sentence in obj.__dict__.get('_sentences', []):
+            sentence.parsers = obj.parsers
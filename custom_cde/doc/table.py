@@ -15,26 +15,9 @@ import logging
 from collections import defaultdict
 
 from ..model import Compound, ModelList
-from ..parse.table import CompoundHeadingParser, CompoundCellParser, UvvisAbsHeadingParser, UvvisAbsCellParser, \
-    QuantumYieldHeadingParser, QuantumYieldCellParser, UvvisEmiHeadingParser, UvvisEmiCellParser, ExtinctionCellParser, \
-    ExtinctionHeadingParser, FluorescenceLifetimeHeadingParser, FluorescenceLifetimeCellParser, \
-    ElectrochemicalPotentialHeadingParser, ElectrochemicalPotentialCellParser, IrHeadingParser, IrCellParser, \
-    SolventCellParser, SolventHeadingParser, SolventInHeadingParser, UvvisAbsEmiQuantumYieldHeadingParser, \
-    UvvisAbsEmiQuantumYieldCellParser, MeltingPointHeadingParser, MeltingPointCellParser, GlassTransitionHeadingParser, GlassTransitionCellParser, TempInHeadingParser, \
-    UvvisAbsDisallowedHeadingParser, UvvisEmiQuantumYieldHeadingParser, UvvisEmiQuantumYieldCellParser, \
-    BandGapHeadingParser, BandGapCellParser, FermiEnergyHeadingParser, FermiEnergyCellParser, \
-    HOMOLevelHeadingParser, HOMOLevelCellParser, LUMOLevelHeadingParser, LUMOLevelCellParser, \
-    PCEHeadingParser, PCECellParser, FFHeadingParser, FFCellParser, VocHeadingParser, VocCellParser, JscHeadingParser, JscCellParser, \
-    MnHeadingParser, MnCellParser, MwHeadingParser, MwCellParser, DispersityHeadingParser, DispersityCellParser, \
-    CrystallinityHeadingParser, CrystallinityCellParser, FusionEnthalpyHeadingParser, FusionEnthalpyCellParser, \
-    SublimationEnthalpyHeadingParser, SublimationEnthalpyCellParser, VaporizationEnthalpyHeadingParser, VaporizationEnthalpyCellParser, \
-    CorrosionInhibitionHeadingParser, CorrosionInhibitionCellParser, ModulusHeadingParser, ModulusCellParser, \
-    BoilingPointHeadingParser, BoilingPointCellParser
-
-# TODO: Sort out the above import... import module instead
 from ..nlp.tag import NoneTagger
 from ..nlp.tokenize import FineWordTokenizer
-from ..utils import memoized_property
+from ..utils import lazy_class_attribute, memoized_property
 from .element import CaptionedElement
 from .text import Sentence
 
@@ -44,42 +27,59 @@ log = logging.getLogger(__name__)
 
 class Table(CaptionedElement):
 
-    #: Table cell parsers
-    parsers = [
-        (CompoundHeadingParser(), CompoundCellParser()),
-        (UvvisAbsEmiQuantumYieldHeadingParser(), UvvisAbsEmiQuantumYieldCellParser()),
-        (UvvisEmiQuantumYieldHeadingParser(), UvvisEmiQuantumYieldCellParser()),
-        (UvvisEmiHeadingParser(), UvvisEmiCellParser()),
-        (UvvisAbsHeadingParser(), UvvisAbsCellParser(), UvvisAbsDisallowedHeadingParser()),
-        (IrHeadingParser(), IrCellParser()),
-        (ExtinctionHeadingParser(), ExtinctionCellParser()),
-        (QuantumYieldHeadingParser(), QuantumYieldCellParser()),
-        (FluorescenceLifetimeHeadingParser(), FluorescenceLifetimeCellParser()),
-        (ElectrochemicalPotentialHeadingParser(), ElectrochemicalPotentialCellParser()),
-        (MeltingPointHeadingParser(), MeltingPointCellParser()),
-        (GlassTransitionHeadingParser(), GlassTransitionCellParser()),
-        (SolventHeadingParser(), SolventCellParser()),
-        (SolventInHeadingParser(),),
-        (TempInHeadingParser(),),
-        (BandGapHeadingParser(), BandGapCellParser()),
-        (FermiEnergyHeadingParser(), FermiEnergyCellParser()),
-        (HOMOLevelHeadingParser(), HOMOLevelCellParser()),
-        (LUMOLevelHeadingParser(), LUMOLevelCellParser()),
-        (PCEHeadingParser(), PCECellParser()),
-        (FFHeadingParser(), FFCellParser()),
-        (VocHeadingParser(), VocCellParser()),
-        (JscHeadingParser(), JscCellParser()),
-        (MnHeadingParser(), MnCellParser()),
-        (MwHeadingParser(), MwCellParser()),
-        (DispersityHeadingParser(), DispersityCellParser()),
-        (CrystallinityHeadingParser(), CrystallinityCellParser()), 
-        (FusionEnthalpyHeadingParser(), FusionEnthalpyCellParser()),
-        (SublimationEnthalpyHeadingParser(), SublimationEnthalpyCellParser()), 
-        (VaporizationEnthalpyHeadingParser(), VaporizationEnthalpyCellParser()),
-        (CorrosionInhibitionHeadingParser(), CorrosionInhibitionCellParser()),
-        (ModulusHeadingParser(), ModulusCellParser()),
-        (BoilingPointHeadingParser(), BoilingPointCellParser())
-    ]
+    @lazy_class_attribute
+    def parsers(cls):
+        """Table cell parsers."""
+        from ..parse.table import CompoundHeadingParser, CompoundCellParser, UvvisAbsHeadingParser, UvvisAbsCellParser, \
+            QuantumYieldHeadingParser, QuantumYieldCellParser, UvvisEmiHeadingParser, UvvisEmiCellParser, ExtinctionCellParser, \
+            ExtinctionHeadingParser, FluorescenceLifetimeHeadingParser, FluorescenceLifetimeCellParser, \
+            ElectrochemicalPotentialHeadingParser, ElectrochemicalPotentialCellParser, IrHeadingParser, IrCellParser, \
+            SolventCellParser, SolventHeadingParser, SolventInHeadingParser, UvvisAbsEmiQuantumYieldHeadingParser, \
+            UvvisAbsEmiQuantumYieldCellParser, MeltingPointHeadingParser, MeltingPointCellParser, GlassTransitionHeadingParser, GlassTransitionCellParser, TempInHeadingParser, \
+            UvvisAbsDisallowedHeadingParser, UvvisEmiQuantumYieldHeadingParser, UvvisEmiQuantumYieldCellParser, \
+            BandGapHeadingParser, BandGapCellParser, FermiEnergyHeadingParser, FermiEnergyCellParser, \
+            HOMOLevelHeadingParser, HOMOLevelCellParser, LUMOLevelHeadingParser, LUMOLevelCellParser, \
+            PCEHeadingParser, PCECellParser, FFHeadingParser, FFCellParser, VocHeadingParser, VocCellParser, JscHeadingParser, JscCellParser, \
+            MnHeadingParser, MnCellParser, MwHeadingParser, MwCellParser, DispersityHeadingParser, DispersityCellParser, \
+            CrystallinityHeadingParser, CrystallinityCellParser, FusionEnthalpyHeadingParser, FusionEnthalpyCellParser, \
+            SublimationEnthalpyHeadingParser, SublimationEnthalpyCellParser, VaporizationEnthalpyHeadingParser, VaporizationEnthalpyCellParser, \
+            CorrosionInhibitionHeadingParser, CorrosionInhibitionCellParser, ModulusHeadingParser, ModulusCellParser, \
+            BoilingPointHeadingParser, BoilingPointCellParser
+        return [
+            (CompoundHeadingParser(), CompoundCellParser()),
+            (UvvisAbsEmiQuantumYieldHeadingParser(), UvvisAbsEmiQuantumYieldCellParser()),
+            (UvvisEmiQuantumYieldHeadingParser(), UvvisEmiQuantumYieldCellParser()),
+            (UvvisEmiHeadingParser(), UvvisEmiCellParser()),
+            (UvvisAbsHeadingParser(), UvvisAbsCellParser(), UvvisAbsDisallowedHeadingParser()),
+            (IrHeadingParser(), IrCellParser()),
+            (ExtinctionHeadingParser(), ExtinctionCellParser()),
+            (QuantumYieldHeadingParser(), QuantumYieldCellParser()),
+            (FluorescenceLifetimeHeadingParser(), FluorescenceLifetimeCellParser()),
+            (ElectrochemicalPotentialHeadingParser(), ElectrochemicalPotentialCellParser()),
+            (MeltingPointHeadingParser(), MeltingPointCellParser()),
+            (GlassTransitionHeadingParser(), GlassTransitionCellParser()),
+            (SolventHeadingParser(), SolventCellParser()),
+            (SolventInHeadingParser(),),
+            (TempInHeadingParser(),),
+            (BandGapHeadingParser(), BandGapCellParser()),
+            (FermiEnergyHeadingParser(), FermiEnergyCellParser()),
+            (HOMOLevelHeadingParser(), HOMOLevelCellParser()),
+            (LUMOLevelHeadingParser(), LUMOLevelCellParser()),
+            (PCEHeadingParser(), PCECellParser()),
+            (FFHeadingParser(), FFCellParser()),
+            (VocHeadingParser(), VocCellParser()),
+            (JscHeadingParser(), JscCellParser()),
+            (MnHeadingParser(), MnCellParser()),
+            (MwHeadingParser(), MwCellParser()),
+            (DispersityHeadingParser(), DispersityCellParser()),
+            (CrystallinityHeadingParser(), CrystallinityCellParser()), 
+            (FusionEnthalpyHeadingParser(), FusionEnthalpyCellParser()),
+            (SublimationEnthalpyHeadingParser(), SublimationEnthalpyCellParser()), 
+            (VaporizationEnthalpyHeadingParser(), VaporizationEnthalpyCellParser()),
+            (CorrosionInhibitionHeadingParser(), CorrosionInhibitionCellParser()),
+            (ModulusHeadingParser(), ModulusCellParser()),
+            (BoilingPointHeadingParser(), BoilingPointCellParser())
+        ]
 
     def __init__(self, caption, label=None, headings=None, rows=None, footnotes=None, **kwargs):
         super(Table, self).__init__(caption=caption, label=label, **kwargs)
@@ -133,7 +133,10 @@ class Table(CaptionedElement):
     @property
     def records(self):
         """Chemical records that have been parsed from the table."""
+        from ..parse.table import CompoundCellParser
         caption_records = self.caption.records
+        # Parse each footnote once, then look up records for the footnotes that a cell or the caption references
+        footnote_records = [(footnote.id, footnote.records) for footnote in self.footnotes]
         # Parse headers to extract contextual data and determine value parser for the column
         value_parsers = {}
         header_compounds = defaultdict(list)
@@ -141,32 +144,31 @@ class Table(CaptionedElement):
         seen_compound_col = False
         log.debug('Parsing table headers')
 
-        for i, col_headings in enumerate(zip(*self.headings)):
+        # Without any parsers, the headings don't need to be tagged
+        headings = self.headings if self.parsers else []
+        for i, col_headings in enumerate(zip(*headings)):
             # log.info('Considering column %s' % i)
-            for parsers in self.parsers:
+            col_tokens = [cell.tagged_tokens for cell in col_headings]
+            for j, parsers in enumerate(self.parsers):
                 log.debug(parsers)
                 heading_parser = parsers[0]
                 value_parser = parsers[1] if len(parsers) > 1 else None
                 disallowed_parser = parsers[2] if len(parsers) > 2 else None
                 allowed = False
                 disallowed = False
-                for cell in col_headings:
-                    log.debug(cell.tagged_tokens)
-                    results = list(heading_parser.parse(cell.tagged_tokens))
+                for cell, tokens in zip(col_headings, col_tokens):
+                    # Only try a full parse if the heading parser is triggered by a token in this cell
+                    results = list(heading_parser.parse(tokens)) if heading_parser.could_parse(tokens) else []
                     if results:
                         allowed = True
                         log.debug('Heading column %s: Match %s: %s' % (i, heading_parser.__class__.__name__, [c.serialize() for c in results]))
                     # Results from every parser are stored as header compounds
                     header_compounds[i].extend(results)
-                    # Referenced footnote records are also stored
-                    for footnote in self.footnotes:
-                        # print('%s - %s - %s' % (footnote.id, cell.references, footnote.id in cell.references))
-                        if footnote.id in cell.references:
-                            log.debug('Adding footnote %s to column %s: %s' % (footnote.id, i, [c.serialize() for c in footnote.records]))
-                            # print('Footnote records: %s' % [c.to_primitive() for c in footnote.records])
-                            header_compounds[i].extend(footnote.records)
+                    # Referenced footnote records are also stored (once, as merging them again has no effect)
+                    if j == 0:
+                        header_compounds[i].extend(self._referenced_records(footnote_records, cell.references))
                     # Check if the disallowed parser matches this cell
-                    if disallowed_parser and list(disallowed_parser.parse(cell.tagged_tokens)):
+                    if disallowed_parser and disallowed_parser.could_parse(tokens) and list(disallowed_parser.parse(tokens)):
                         log.debug('Column %s: Disallowed %s' % (i, heading_parser.__class__.__name__))
                         disallowed = True
                 # If heading parser matches and disallowed parser doesn't, store the value parser
@@ -180,31 +182,6 @@ class Table(CaptionedElement):
                     value_parsers[i] = value_parser
                     # Stop after value parser is assigned?
 
-        # for hrow in self.headings:
-        #     for i, cell in enumerate(hrow):
-        #         log.debug(cell.tagged_tokens)
-        #         for heading_parser, value_parser in self.parsers:
-        #             results = list(heading_parser.parse(cell.tagged_tokens))
-        #             if results:
-        #                 log.debug('Heading column %s: Match %s: %s' % (i, heading_parser.__class__.__name__, [c.to_primitive() for c in results]))
-        #             # Results from every parser are stored as header compounds
-        #             header_compounds[i].extend(results)
-        #             if results and value_parser and i not in value_parsers:
-        #                 if isinstance(value_parser, CompoundCellParser):
-        #                     # Only take the first compound col
-        #                     if seen_compound_col:
-        #                         continue
-        #                     seen_compound_col = True
-        #                 value_parsers[i] = value_parser
-        #                 break  # Stop after first heading parser matches
-        #         # Referenced footnote records are also stored
-        #         for footnote in self.footnotes:
-        #             # print('%s - %s - %s' % (footnote.id, cell.references, footnote.id in cell.references))
-        #             if footnote.id in cell.references:
-        #                 log.debug('Adding footnote %s to column %s: %s' % (footnote.id, i, [c.to_primitive() for c in footnote.records]))
-        #                 # print('Footnote records: %s' % [c.to_primitive() for c in footnote.records])
-        #                 header_compounds[i].extend(footnote.records)
-
         # If no parsers, skip processing table
         if value_parsers:
 
@@ -213,16 +190,22 @@ class Table(CaptionedElement):
                 log.debug('No compound column found in table, assuming first column')
                 value_parsers[0] = CompoundCellParser()
 
+            # Contextual information from the caption and any footnotes it references is the same for every row
+            row_context = [c for c in caption_records if c.is_contextual]
+            row_context.extend(self._referenced_records(footnote_records, self.caption.references))
+
             for row in self.rows:
                 row_compound = Compound()
                 # Keep cell records that are contextual to merge at the end
                 contextual_cell_compounds = []
                 for i, cell in enumerate(row):
-                    log.debug(cell.tagged_tokens)
                     if i in value_parsers:
-                        results = list(value_parsers[i].parse(cell.tagged_tokens))
+                        tokens = cell.tagged_tokens
+                        log.debug(tokens)
+                        results = list(value_parsers[i].parse(tokens))
                         if results:
                             log.debug('Cell column %s: Match %s: %s' % (i, value_parsers[i].__class__.__name__, [c.serialize() for c in results]))
+                            cell_footnote_records = self._referenced_records(footnote_records, cell.references)
                         # For each result, merge in values from elsewhere
                         for result in results:
                             # Merge each header_compounds[i]
@@ -230,10 +213,8 @@ class Table(CaptionedElement):
                                 if header_compound.is_contextual:
                                     result.merge_contextual(header_compound)
                             # Merge footnote compounds
-                            for footnote in self.footnotes:
-                                if footnote.id in cell.references:
-                                    for footnote_compound in footnote.records:
-                                        result.merge_contextual(footnote_compound)
+                            for footnote_compound in cell_footnote_records:
+                                result.merge_contextual(footnote_compound)
                             if result.is_contextual:
                                 # Don't merge cell as a value compound if there are no values
                                 contextual_cell_compounds.append(result)
@@ -247,19 +228,13 @@ class Table(CaptionedElement):
                     prev = table_records[-1]
                     row_compound.names = prev.names
                     row_compound.labels = prev.labels
-                # Merge contextual information from caption into the full row
-                for caption_compound in caption_records:
-                    if caption_compound.is_contextual:
-                        row_compound.merge_contextual(caption_compound)
-                # And also merge from any footnotes that are referenced from the caption
-                for footnote in self.footnotes:
-                    if footnote.id in self.caption.references:
-                        # print('Footnote records: %s' % [c.to_primitive() for c in footnote.records])
-                        for fn_compound in footnote.records:
-                            row_compound.merge_contextual(fn_compound)
+                # Merge contextual information from the caption and footnotes it references into the full row
+                for context_compound in row_context:
+                    row_compound.merge_contextual(context_compound)
 
-                log.debug(row_compound.serialize())
-                if row_compound.serialize():
+                serialized = row_compound.serialize()
+                log.debug(serialized)
+                if serialized:
                     table_records.append(row_compound)
 
         # TODO: If no rows have name or label, see if one is in the caption
@@ -269,6 +244,19 @@ class Table(CaptionedElement):
         table_records += caption_records
         return table_records
 
+    def release(self, keep_analysis=False):
+        """Discard memoized analysis of the caption, cells and footnotes to free memory."""
+        super(Table, self).release(keep_analysis=keep_analysis)
+        for row in self.headings + self.rows:
+            for cell in row:
+                cell.release(keep_analysis=keep_analysis)
+        for footnote in self.footnotes:
+            footnote.release(keep_analysis=keep_analysis)
+
+    def _referenced_records(self, footnote_records, references):
+        """Return the records from footnotes with an ID in references, given a list of (id, records) tuples."""
+        return [record for footnote_id, records in footnote_records if footnote_id in references for record in records]
+
     # TODO: extend abbreviations property to include footnotes
     # TODO: Resolve footnote records into headers
 
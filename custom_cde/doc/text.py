@@ -12,6 +12,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from abc import abstractproperty
+from array import array
 import collections
 import logging
 import re
@@ -19,34 +20,6 @@ import re
 import six
 
 from ..model import ModelList
-from ..parse.context import ContextParser
-from ..parse.cem import ChemicalLabelParser, CompoundHeadingParser, CompoundParser, chemical_name
-from ..parse.table import CaptionContextParser
-
-from ..parse.ir import IrParser
-from ..parse.mp import MpParser
-from ..parse.tg import TgParser
-from ..parse.nmr import NmrParser
-from ..parse.uvvis import UvvisParser
-from ..parse.homo import HOMOParser
-from ..parse.lumo import LUMOParser
-from ..parse.band_gap import BandGapParser
-from ..parse.fermi_energy import FermiEnergyParser
-from ..parse.boiling_point import BoilingPointParser
-from ..parse.corrosion_inhibition import CorrosionInhibitionParser
-from ..parse.enthalpy_of_fusion import FusionEnthalpyParser
-from ..parse.enthalpy_of_vaporization import VaporizationEnthalpyParser
-from ..parse.enthalpy_of_sublimation import SublimationEnthalpyParser
-from ..parse.M_n import NumAvgMolecularWeightParser
-from ..parse.M_w import WeightAvgMolecularWeightParser
-from ..parse.dispersity import DispersityParser
-from ..parse.modulus import ModulusParser
-from ..parse.crystallinity import CrystallinityParser
-from ..parse.pce import PCEParser
-from ..parse.ff import FFParser
-from ..parse.jsc import JscParser
-from ..parse.voc import VocParser
-
 from ..nlp.lexicon import ChemLexicon
 from ..nlp.cem import CemTagger, IGNORE_PREFIX, IGNORE_SUFFIX, SPECIALS, SPLITS
 from ..nlp.abbrev import ChemAbbreviationDetector
@@ -54,7 +27,7 @@ from ..nlp.tag import NoneTagger
 from ..nlp.pos import ChemCrfPosTagger
 from ..nlp.tokenize import ChemSentenceTokenizer, ChemWordTokenizer, regex_span_tokenize
 from ..text import CONTROL_RE
-from ..utils import memoized_property, python_2_unicode_compatible
+from ..utils import lazy_class_attribute, memoized_property, python_2_unicode_compatible
 from .element import BaseElement
 
 
@@ -159,7 +132,13 @@ class Text(collections.Sequence, BaseText):
     def sentences(self):
         """Return a list of Sentences that make up this text passage."""
         sents = []
-        spans = self.sentence_tokenizer.span_tokenize(self.text)
+        # Sentence splits are cached along with sentence analysis, so repeated paragraphs are only split once
+        cache = Sentence.analysis_cache
+        spans = cache.get_spans(self) if cache is not None else None
+        if spans is None:
+            spans = list(self.sentence_tokenizer.span_tokenize(self.text))
+            if cache is not None:
+                cache.put_spans(self, spans)
         for span in spans:
             sent = Sentence(
                 text=self.text[span[0]:span[1]],
@@ -252,6 +231,20 @@ class Text(collections.Sequence, BaseText):
         """Return a list of records for this text passage."""
         return ModelList(*[r for sent in self.sentences for r in sent.records])
 
+    def release(self, keep_analysis=False):
+        """Discard memoized sentences, tokens and tags to free memory. They are recomputed if needed.
+
+        :param bool keep_analysis: (Optional) Keep each sentence's token offsets and tags in a compact form, so the
+                                   tokenizers and taggers don't need to be run again.
+        """
+        for attr in ('_unprocessed_ner_tagged_tokens', '_unprocessed_ner_tags'):
+            self.__dict__.pop(attr, None)
+        if keep_analysis:
+            for sentence in self.__dict__.get('_sentences', []):
+                sentence.release(keep_analysis=True)
+        else:
+            self.__dict__.pop('_sentences', None)
+
     def __add__(self, other):
         if type(self) == type(other):
             merged = self.__class__(
@@ -271,14 +264,22 @@ class Text(collections.Sequence, BaseText):
 
 
 class Title(Text):
-    parsers = [CompoundParser()]
+
+    @lazy_class_attribute
+    def parsers(cls):
+        from ..parse.cem import CompoundParser
+        return [CompoundParser()]
 
     def _repr_html_(self):
         return '<h1 class="cde-title">' + self.text + '</h1>'
 
 
 class Heading(Text):
-    parsers = [CompoundHeadingParser(), ChemicalLabelParser()]
+
+    @lazy_class_attribute
+    def parsers(cls):
+        from ..parse.cem import ChemicalLabelParser, CompoundHeadingParser
+        return [CompoundHeadingParser(), ChemicalLabelParser()]
 
     def _repr_html_(self):
         return '<h2 class="cde-title">' + self.text + '</h2>'
@@ -286,17 +287,44 @@ class Heading(Text):
 
 class Paragraph(Text):
 
-    parsers = [CompoundParser(), ChemicalLabelParser(), NmrParser(), IrParser(),
-               UvvisParser(),
-               MpParser(), TgParser(),
-               HOMOParser(), LUMOParser(), BandGapParser(),
-               FermiEnergyParser(), BoilingPointParser(), CorrosionInhibitionParser(),
-               FusionEnthalpyParser(), VaporizationEnthalpyParser(), SublimationEnthalpyParser(),
-               NumAvgMolecularWeightParser(), WeightAvgMolecularWeightParser(), DispersityParser(),
-               ModulusParser(), CrystallinityParser(),
-               PCEParser(), FFParser(), JscParser(),
-               VocParser(),
-               ContextParser()]
+    @lazy_class_attribute
+    def parsers(cls):
+        from ..parse.cem import ChemicalLabelParser, CompoundParser
+        from ..parse.context import ContextParser
+        from ..parse.ir import IrParser
+        from ..parse.mp import MpParser
+        from ..parse.tg import TgParser
+        from ..parse.nmr import NmrParser
+        from ..parse.uvvis import UvvisParser
+        from ..parse.homo import HOMOParser
+        from ..parse.lumo import LUMOParser
+        from ..parse.band_gap import BandGapParser
+        from ..parse.fermi_energy import FermiEnergyParser
+        from ..parse.boiling_point import BoilingPointParser
+        from ..parse.corrosion_inhibition import CorrosionInhibitionParser
+        from ..parse.enthalpy_of_fusion import FusionEnthalpyParser
+        from ..parse.enthalpy_of_vaporization import VaporizationEnthalpyParser
+        from ..parse.enthalpy_of_sublimation import SublimationEnthalpyParser
+        from ..parse.M_n import NumAvgMolecularWeightParser
+        from ..parse.M_w import WeightAvgMolecularWeightParser
+        from ..parse.dispersity import DispersityParser
+        from ..parse.modulus import ModulusParser
+        from ..parse.crystallinity import CrystallinityParser
+        from ..parse.pce import PCEParser
+        from ..parse.ff import FFParser
+        from ..parse.jsc import JscParser
+        from ..parse.voc import VocParser
+        return [CompoundParser(), ChemicalLabelParser(), NmrParser(), IrParser(),
+                UvvisParser(),
+                MpParser(), TgParser(),
+                HOMOParser(), LUMOParser(), BandGapParser(),
+                FermiEnergyParser(), BoilingPointParser(), CorrosionInhibitionParser(),
+                FusionEnthalpyParser(), VaporizationEnthalpyParser(), SublimationEnthalpyParser(),
+                NumAvgMolecularWeightParser(), WeightAvgMolecularWeightParser(), DispersityParser(),
+                ModulusParser(), CrystallinityParser(),
+                PCEParser(), FFParser(), JscParser(),
+                VocParser(),
+                ContextParser()]
 
     def _repr_html_(self):
         return '<p class="cde-paragraph">' + self.text + '</p>'
@@ -304,7 +332,11 @@ class Paragraph(Text):
 
 class Footnote(Text):
 
-    parsers = [ContextParser(), CaptionContextParser()]
+    @lazy_class_attribute
+    def parsers(cls):
+        from ..parse.context import ContextParser
+        from ..parse.table import CaptionContextParser
+        return [ContextParser(), CaptionContextParser()]
 
     def _repr_html_(self):
         return '<p class="cde-footnote">' + self.text + '</p>'
@@ -322,7 +354,12 @@ class Citation(Text):
 
 
 class Caption(Text):
-    parsers = [CompoundParser(), ChemicalLabelParser(), CaptionContextParser()]
+
+    @lazy_class_attribute
+    def parsers(cls):
+        from ..parse.cem import ChemicalLabelParser, CompoundParser
+        from ..parse.table import CaptionContextParser
+        return [CompoundParser(), ChemicalLabelParser(), CaptionContextParser()]
 
     def _repr_html_(self):
         return '<caption class="cde-caption">' + self.text + '</caption>'
@@ -337,6 +374,12 @@ class Sentence(BaseText):
     pos_tagger = ChemCrfPosTagger()  # ChemPerceptronTagger()
     ner_tagger = CemTagger()
     parsers = []
+    #: (Optional) Cache consulted for token and tag analysis before running the tokenizer and taggers.
+    analysis_cache = None
+
+    # Memoized attributes derived from the token offsets, POS tags and unprocessed NER tags
+    _derived_attrs = ('_tokens', '_unprocessed_ner_tags', '_abbreviation_definitions', '_ner_tagged_tokens',
+                      '_ner_tags', '_cems', '_tags')
 
     def __init__(self, text, start=0, end=None, word_tokenizer=None, lexicon=None, abbreviation_detector=None, pos_tagger=None, ner_tagger=None, parsers=None, **kwargs):
         super(Sentence, self).__init__(text, word_tokenizer=word_tokenizer, lexicon=lexicon, abbreviation_detector=abbreviation_detector, pos_tagger=pos_tagger, ner_tagger=ner_tagger, parsers=parsers, **kwargs)
@@ -348,27 +391,109 @@ class Sentence(BaseText):
     def __repr__(self):
         return '%s(%r, %r, %r)' % (self.__class__.__name__, self._text, self.start, self.end)
 
+    @memoized_property
+    def token_offsets(self):
+        """Return a flat array of token offsets relative to the sentence text, i.e. [start0, end0, start1, end1, ...].
+
+        This is the compact form of the tokenization, from which the token strings and Token objects are produced on
+        demand.
+        """
+        if self._use_cached_analysis():
+            return self._token_offsets
+        offsets = array('i')
+        for span in self.word_tokenizer.span_tokenize(self.text):
+            offsets.extend(span)
+        return offsets
+
     @memoized_property
     def tokens(self):
         """Return a list of token Spans for this sentence."""
-        spans = self.word_tokenizer.span_tokenize(self.text)
+        offsets = self.token_offsets
         toks = [Token(
-            text=self.text[span[0]:span[1]],
-            start=span[0] + self.start,
-            end=span[1] + self.start,
+            text=self.text[offsets[i]:offsets[i+1]],
+            start=offsets[i] + self.start,
+            end=offsets[i+1] + self.start,
             lexicon=self.lexicon
-        ) for span in spans]
+        ) for i in range(0, len(offsets), 2)]
         return toks
 
+    def _use_cached_analysis(self):
+        """Attach analysis kept by release or from the analysis cache if it contains this sentence. Return True if
+        successful."""
+        released = self.__dict__.pop('_released_analysis', None)
+        if released is not None:
+            self._attach_analysis(*released)
+            return True
+        if self.analysis_cache is None or getattr(self, '_analysis_cache_missed', False):
+            return False
+        analysis = self.analysis_cache.get(self)
+        if analysis is None:
+            self._analysis_cache_missed = True
+            return False
+        self.analysis = analysis
+        return True
+
+    @property
+    def analysis(self):
+        """The sentence-level analysis that doesn't depend on the rest of the document.
+
+        A tuple of (token spans, POS tags, unprocessed NER tags), where the spans are relative to the sentence text.
+        Setting this property attaches analysis that was computed elsewhere (e.g. in a worker process) so the tokenizer
+        and taggers aren't run again for this sentence.
+        """
+        offsets = self.token_offsets
+        spans = list(zip(offsets[::2], offsets[1::2]))
+        ner_tags = [tag for token, tag in self.unprocessed_ner_tagged_tokens]
+        return spans, self.pos_tags, ner_tags
+
+    @analysis.setter
+    def analysis(self, analysis):
+        spans, pos_tags, ner_tags = analysis
+        offsets = array('i')
+        for span in spans:
+            offsets.extend(span)
+        self._attach_analysis(offsets, pos_tags, ner_tags)
+
+    def _attach_analysis(self, offsets, pos_tags, ner_tags):
+        # Discard anything that was previously derived from the old analysis
+        for attr in self._derived_attrs:
+            self.__dict__.pop(attr, None)
+        self._token_offsets = offsets
+        self._pos_tagged_tokens = list(zip(self.raw_tokens, pos_tags))
+        self._unprocessed_ner_tagged_tokens = list(zip(self._pos_tagged_tokens, ner_tags))
+
+    def release(self, keep_analysis=False):
+        """Discard memoized tokens, tags and chemical entity mentions to free memory. They are recomputed if needed.
+
+        :param bool keep_analysis: (Optional) Keep the token offsets and tags in a compact form, so the tokenizer and
+                                   taggers don't need to be run again.
+        """
+        released = self.__dict__.get('_released_analysis')
+        if keep_analysis and '_unprocessed_ner_tagged_tokens' in self.__dict__:
+            released = (self.token_offsets, self.pos_tags, self.unprocessed_ner_tags)
+        for attr in self._derived_attrs + ('_token_offsets', '_pos_tagged_tokens', '_unprocessed_ner_tagged_tokens',
+                                           '_released_analysis'):
+            self.__dict__.pop(attr, None)
+        if keep_analysis and released is not None:
+            self._released_analysis = released
+
     @property
     def raw_tokens(self):
-        """Return a list of token strings that make up this sentence."""
-        return [token.text for token in self.tokens]
+        """Return a list of token strings that make up this sentence.
+
+        Built from the token offsets on each access rather than kept, so callers that need it repeatedly should hold on
+        to the result.
+        """
+        text = self.text
+        offsets = self.token_offsets
+        return [text[offsets[i]:offsets[i+1]] for i in range(0, len(offsets), 2)]
 
     @memoized_property
     def pos_tagged_tokens(self):
         """Return a list of part of speech tags for the tokens in this sentence."""
         # log.debug('Getting pos tags')
+        if self._use_cached_analysis():
+            return self._pos_tagged_tokens
         return self.pos_tagger.tag(self.raw_tokens)
 
     @property
@@ -383,7 +508,12 @@ class Sentence(BaseText):
         No corrections from abbreviation detection are performed.
         """
         # log.debug('Getting unprocessed_ner_tags')
-        return self.ner_tagger.tag(self.pos_tagged_tokens)
+        if self._use_cached_analysis():
+            return self._unprocessed_ner_tagged_tokens
+        self._unprocessed_ner_tagged_tokens = self.ner_tagger.tag(self.pos_tagged_tokens)
+        if self.analysis_cache is not None:
+            self.analysis_cache.put(self, self.analysis)
+        return self._unprocessed_ner_tagged_tokens
 
     @memoized_property
     def unprocessed_ner_tags(self):
@@ -399,10 +529,13 @@ class Sentence(BaseText):
         abbreviations = []
         if self.abbreviation_detector:
             # log.debug('Detecting abbreviations')
-            ners = self.unprocessed_ner_tags
-            for abbr_span, long_span in self.abbreviation_detector.detect_spans(self.raw_tokens):
-                abbr = self.raw_tokens[abbr_span[0]:abbr_span[1]]
-                long = self.raw_tokens[long_span[0]:long_span[1]]
+            raw_tokens = self.raw_tokens
+            spans = self.abbreviation_detector.detect_spans(raw_tokens)
+            # Only sentences that define an abbreviation need to be tagged
+            ners = self.unprocessed_ner_tags if spans else None
+            for abbr_span, long_span in spans:
+                abbr = raw_tokens[abbr_span[0]:abbr_span[1]]
+                long = raw_tokens[long_span[0]:long_span[1]]
                 # Check if long is entirely tagged as one named entity type
                 long_tags = ners[long_span[0]:long_span[1]]
                 unique_tags = set([tag[2:] for tag in long_tags if tag is not None])
@@ -419,20 +552,21 @@ class Sentence(BaseText):
     def ner_tags(self):
         """"""
         # log.debug('Getting ner_tags')
-        ner_tags = self.unprocessed_ner_tags
+        ner_tags = list(self.unprocessed_ner_tags)
+        raw_tokens = self.raw_tokens
         abbrev_defs = self.document.abbreviation_definitions if self.document else self.abbreviation_definitions
         # Ensure abbreviation entity matches long entity
         # TODO: This is potentially a performance bottleneck?
         for i in range(0, len(ner_tags)):
             for abbr, long, ner_tag in abbrev_defs:
-                if abbr == self.raw_tokens[i:i+len(abbr)]:
+                if abbr == raw_tokens[i:i+len(abbr)]:
                     old_ner_tags = ner_tags[i:i+len(abbr)]
                     ner_tags[i] = 'B-%s' % ner_tag if ner_tag is not None else None
                     ner_tags[i+1:i+len(abbr)] = ['I-%s' % ner_tag if ner_tag is not None else None] * (len(abbr) - 1)
                     # Remove ner tags from brackets surrounding abbreviation
-                    if i > 1 and self.raw_tokens[i-1] == '(':
+                    if i > 1 and raw_tokens[i-1] == '(':
                         ner_tags[i-1] = None
-                    if i < len(self.raw_tokens) - 1 and self.raw_tokens[i+1] == ')':
+                    if i < len(raw_tokens) - 1 and raw_tokens[i+1] == ')':
                         ner_tags[i+1] = None
                     if not old_ner_tags == ner_tags[i:i+len(abbr)]:
                         log.debug('Correcting abbreviation tag: %s (%s): %s -> %s' % (' '.join(abbr), ' '.join(long), old_ner_tags, ner_tags[i:i+len(abbr)]))
@@ -445,6 +579,7 @@ class Sentence(BaseText):
 
     @memoized_property
     def cems(self):
+        from ..parse.cem import chemical_name
         # log.debug('Getting cems')
         spans = []
         # print(self.text.encode('utf8'))
@@ -529,12 +664,16 @@ class Sentence(BaseText):
 
     @property
     def tagged_tokens(self):
+        """Return a list of (token, tag) tuples, using the combined POS and NER tags."""
         return list(zip(self.raw_tokens, self.tags))
 
     @property
     def records(self):
         """Return a list of records for this sentence."""
         compounds = ModelList()
+        # Don't tag the sentence if there is nothing to parse
+        if not self.parsers:
+            return compounds
         seen_labels = set()
         # Ensure no control characters are sent to a parser (need to be XML compatible)
         tagged_tokens = [(CONTROL_RE.sub('', token), tag) for token, tag in self.tagged_tokens]
@@ -24,3 +24,7 @@ class ReaderError(ChemDataExtractorError):
 
 class ModelNotFoundError(ChemDataExtractorError):
     """Raised when a model file could not be found."""
+
+
+class DownloadError(ChemDataExtractorError):
+    """Raised when a data package could not be downloaded or failed verification."""
@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.mmapmodel
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+A read-only model format that is memory-mapped instead of unpickled.
+
+Unpickling a model creates a private copy of it in every process that loads it. A memory-mapped model is read directly
+from the file, so the operating system shares one copy of it between all processes on a machine, and loading it takes
+no time at all.
+
+Word clusters, averaged perceptron tagger models and Punkt sentence tokenizer models can be converted::
+
+    from chemdataextractor.mmapmodel import convert_model
+
+    convert_model('models/clusters_chem1500-1.0.pickle')
+
+:func:`chemdataextractor.data.load_model` then uses the converted ``.mmap`` file in place of the pickle.
+
+Each file contains a JSON header followed by a number of tables. A table maps strings to values using an open
+addressing hash table of CRC-32 key hashes, and arrays of offsets into blobs of UTF-8 encoded keys and encoded values.
+Keys are sorted, and all integers are little-endian.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import copy
+import io
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+import six
+from six.moves import cPickle as pickle
+
+try:
+    from collections.abc import Mapping, Set
+except ImportError:
+    from collections import Mapping, Set
+
+from .utils import replace_file
+
+
+log = logging.getLogger(__name__)
+
+
+#: File extension of memory-mapped models.
+MMAP_EXT = '.mmap'
+
+#: Identifies a memory-mapped model file and the version of its format.
+MAGIC = b'CDEMMAP1'
+
+#: Separates the two strings in a Punkt collocation key.
+_SEP = '\x00'
+
+
+def _encode(s):
+    """Return a string as UTF-8 bytes."""
+    return s if isinstance(s, bytes) else s.encode('utf8')
+
+
+def _decode(b):
+    """Return a string from UTF-8 bytes."""
+    return b.decode('utf8')
+
+
+def _pad(length):
+    """Return the padding needed to align a length to 8 bytes."""
+    return -length % 8
+
+
+def _pack_table(items):
+    """Return the bytes of a table containing the (key bytes, value bytes) pairs in items.
+
+    The table starts with the number of items and hash slots, followed by the slots, key offsets, value offsets, keys and
+    values. Each slot contains the index of an item plus one, or zero if empty.
+    """
+    items = sorted(items)
+    count = len(items)
+    slots = 1
+    while slots < count * 2:
+        slots *= 2
+    slot_indexes = [0] * slots
+    for i, (key, value) in enumerate(items):
+        slot = zlib.crc32(key) & (slots - 1)
+        while slot_indexes[slot]:
+            slot = (slot + 1) & (slots - 1)
+        slot_indexes[slot] = i + 1
+    key_offsets = [0]
+    value_offsets = [0]
+    for key, value in items:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(value))
+    parts = [
+        struct.pack('<QQ', count, slots),
+        struct.pack('<%dI' % slots, *slot_indexes),
+        b'\x00' * _pad(4 * slots),
+        struct.pack('<%dQ' % (count + 1), *key_offsets),
+        struct.pack('<%dQ' % (count + 1), *value_offsets),
+        b''.join(key for key, value in items),
+        b''.join(value for key, value in items),
+    ]
+    return b''.join(parts)
+
+
+def _IntArray(buf, offset, typecode, length):
+    """Return a read-only sequence of the little-endian unsigned integers in part of a buffer.
+
+    On little-endian Python 3, this is a view of the buffer that is indexed without copying or unpacking.
+    """
+    size = struct.calcsize(typecode)
+    if six.PY3 and sys.byteorder == 'little':
+        return memoryview(buf)[offset:offset + size * length].cast(typecode)
+    return _StructArray(buf, offset, '<' + typecode, size)
+
+
+class _StructArray(object):
+    """Sequence of integers in a buffer, unpacked as they are accessed."""
+
+    def __init__(self, buf, offset, fmt, size):
+        self.buf = buf
+        self.offset = offset
+        self.fmt = fmt
+        self.size = size
+
+    def __getitem__(self, index):
+        return struct.unpack_from(self.fmt, self.buf, self.offset + self.size * index)[0]
+
+
+class MmapTable(Mapping):
+    """A read-only mapping of strings to values, read from a table in a memory-mapped model file.
+
+    Values are decoded from bytes each time they are looked up. If ``default`` is given, it is returned for missing keys
+    instead of raising KeyError, like a :class:`collections.defaultdict`.
+    """
+
+    def __init__(self, buf, offset, decode_value=_decode, encode_key=_encode, decode_key=_decode, default=KeyError):
+        """
+
+        :param buf: The buffer containing the model file.
+        :param int offset: The position of the table in the buffer.
+        :param decode_value: (Optional) Function that returns a value from its bytes.
+        :param encode_key: (Optional) Function that returns the bytes of a key.
+        :param decode_key: (Optional) Function that returns a key from its bytes.
+        :param default: (Optional) Value to return for missing keys.
+        """
+        self._buf = buf
+        self._count, self._slots = struct.unpack_from('<QQ', buf, offset)
+        slots_start = offset + 16
+        key_offsets_start = slots_start + 4 * self._slots + _pad(4 * self._slots)
+        value_offsets_start = key_offsets_start + 8 * (self._count + 1)
+        self._keys_start = value_offsets_start + 8 * (self._count + 1)
+        self._slot_indexes = _IntArray(buf, slots_start, 'I', self._slots)
+        self._key_offsets = _IntArray(buf, key_offsets_start, 'Q', self._count + 1)
+        self._value_offsets = _IntArray(buf, value_offsets_start, 'Q', self._count + 1)
+        self._values_start = self._keys_start + self._key_offsets[self._count]
+        self.decode_value = decode_value
+        self.encode_key = encode_key
+        self.decode_key = decode_key
+        self.default = default
+
+    def _key(self, index):
+        """Return the bytes of the key at an index."""
+        return self._buf[self._keys_start + self._key_offsets[index]:self._keys_start + self._key_offsets[index + 1]]
+
+    def _find(self, key):
+        """Return the index of a key, or -1 if it isn't in the table."""
+        try:
+            key = self.encode_key(key)
+        except (TypeError, AttributeError, UnicodeError):
+            return -1
+        mask = self._slots - 1
+        slot = zlib.crc32(key) & mask
+        slot_indexes = self._slot_indexes
+        while True:
+            index = slot_indexes[slot]
+            if not index:
+                return -1
+            if self._key(index - 1) == key:
+                return index - 1
+            slot = (slot + 1) & mask
+
+    def _value(self, index):
+        """Return the decoded value at an index."""
+        start = self._values_start + self._value_offsets[index]
+        end = self._values_start + self._value_offsets[index + 1]
+        return self.decode_value(self._buf[start:end])
+
+    def __getitem__(self, key):
+        index = self._find(key)
+        if index < 0:
+            if self.default is KeyError:
+                raise KeyError(key)
+            return self.default
+        return self._value(index)
+
+    def get(self, key, default=None):
+        index = self._find(key)
+        return self._value(index) if index >= 0 else default
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self.decode_key(self._key(index))
+
+    def __repr__(self):
+        return '<%s: %s items>' % (self.__class__.__name__, self._count)
+
+
+class MmapSet(Set):
+    """A read-only set of strings, read from a table in a memory-mapped model file."""
+
+    def __init__(self, table):
+        """
+
+        :param MmapTable table: The table containing the strings as keys.
+        """
+        self._table = table
+
+    def __contains__(self, item):
+        return item in self._table
+
+    def __len__(self):
+        return len(self._table)
+
+    def __iter__(self):
+        return iter(self._table)
+
+    def __repr__(self):
+        return '<%s: %s items>' % (self.__class__.__name__, len(self._table))
+
+
+def _encode_pair(pair):
+    return _encode(_SEP.join(pair))
+
+
+def _decode_pair(b):
+    return tuple(_decode(b).split(_SEP))
+
+
+def _pack_int(value):
+    return struct.pack('<i', value)
+
+
+def _unpack_int(b):
+    return struct.unpack('<i', b)[0]
+
+
+def _model_kind(model):
+    """Return the kind of a model, or None if it can't be memory-mapped."""
+    if isinstance(model, dict):
+        return 'clusters'
+    if isinstance(model, tuple) and len(model) == 4 and isinstance(model[0], dict) and isinstance(model[1], dict):
+        return 'ap'
+    if hasattr(model, '_params') and hasattr(model, 'span_tokenize'):
+        return 'punkt'
+    return None
+
+
+def _prepare_model(model):
+    """Return the kind, metadata and tables (as lists of key bytes, value bytes pairs) for a model."""
+    kind = _model_kind(model)
+    if kind == 'clusters':
+        return kind, {}, {'clusters': [(_encode(k), _encode(v)) for k, v in six.iteritems(model)]}
+    elif kind == 'ap':
+        weights, tagdict, classes, clusters = model
+        labels = sorted(classes)
+        label_indexes = {label: i for i, label in enumerate(labels)}
+        weight_items = []
+        for feature, feature_weights in six.iteritems(weights):
+            n = len(feature_weights)
+            indexes = [label_indexes[label] for label in feature_weights]
+            value = struct.pack('<%dH%dd' % (n, n), *(indexes + list(feature_weights.values())))
+            weight_items.append((_encode(feature), value))
+        tables = {
+            'weights': weight_items,
+            'tagdict': [(_encode(k), _encode(v)) for k, v in six.iteritems(tagdict)],
+        }
+        return kind, {'classes': labels, 'clusters': clusters}, tables
+    elif kind == 'punkt':
+        params = model._params
+        # Everything except the parameters is small, so is pickled into the file
+        skeleton = copy.copy(model)
+        skeleton._params = type(params)()
+        tables = {
+            'skeleton': [(b'', pickle.dumps(skeleton, protocol=2))],
+            'abbrev_types': [(_encode(k), b'') for k in params.abbrev_types],
+            'collocations': [(_encode_pair(k), b'') for k in params.collocations],
+            'sent_starters': [(_encode(k), b'') for k in params.sent_starters],
+            'ortho_context': [(_encode(k), _pack_int(v)) for k, v in six.iteritems(params.ortho_context)],
+        }
+        return kind, {}, tables
+    raise TypeError('Cannot memory-map a model of type %s' % type(model).__name__)
+
+
+def can_mmap(model):
+    """Return True if a model can be saved in the memory-mapped format."""
+    return _model_kind(model) is not None
+
+
+def save_model(model, path):
+    """Save a model in the memory-mapped format.
+
+    :param model: Word clusters dict, averaged perceptron model tuple or Punkt sentence tokenizer, as loaded from a pickle.
+    :param string path: The path of the file to write.
+    """
+    kind, meta, tables = _prepare_model(model)
+    packed = [(name, _pack_table(items)) for name, items in sorted(tables.items())]
+    relative_offsets = []
+    offset = 0
+    for name, data in packed:
+        relative_offsets.append((name, offset))
+        offset += len(data) + _pad(len(data))
+    # The header contains the table offsets, which depend on the header length, so grow it until they fit
+    start = 0
+    while True:
+        header = {'kind': kind, 'meta': meta, 'tables': {name: start + o for name, o in relative_offsets}}
+        header_bytes = json.dumps(header, sort_keys=True).encode('utf8')
+        needed = 16 + len(header_bytes)
+        needed += _pad(needed)
+        if needed <= start:
+            break
+        start = needed
+    tmp_path = '%s.tmp' % path
+    with io.open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b' ' * (start - 16 - len(header_bytes)))
+        for name, data in packed:
+            f.write(data)
+            f.write(b'\x00' * _pad(len(data)))
+    replace_file(tmp_path, path)
+
+
+def load_model(path):
+    """Load a model saved in the memory-mapped format.
+
+    The returned model has the same form as the pickled model it was converted from, except that dicts and sets are
+    replaced by read-only :class:`MmapTable` and :class:`MmapSet` instances.
+
+    :param string path: The path of the file to load.
+    """
+    with io.open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buf[:len(MAGIC)] != MAGIC:
+        buf.close()
+        raise ValueError('%s is not a memory-mapped model' % path)
+    header_length = struct.unpack_from('<Q', buf, len(MAGIC))[0]
+    header = json.loads(_decode(buf[16:16 + header_length]))
+    tables = header['tables']
+    kind = header['kind']
+    meta = header['meta']
+    if kind == 'clusters':
+        return MmapTable(buf, tables['clusters'])
+    elif kind == 'ap':
+        labels = meta['classes']
+
+        def decode_weights(b):
+            n = len(b) // 10
+            values = struct.unpack('<%dH%dd' % (n, n), b)
+            return {labels[i]: w for i, w in zip(values[:n], values[n:])}
+
+        weights = MmapTable(buf, tables['weights'], decode_value=decode_weights)
+        return weights, MmapTable(buf, tables['tagdict']), set(labels), meta['clusters']
+    elif kind == 'punkt':
+        model = pickle.loads(MmapTable(buf, tables['skeleton'], decode_value=bytes)[''])
+        params = model._params
+        params.abbrev_types = MmapSet(MmapTable(buf, tables['abbrev_types']))
+        params.collocations = MmapSet(MmapTable(buf, tables['collocations'], encode_key=_encode_pair,
+                                                decode_key=_decode_pair))
+        params.sent_starters = MmapSet(MmapTable(buf, tables['sent_starters']))
+        params.ortho_context = MmapTable(buf, tables['ortho_context'], decode_value=_unpack_int, default=0)
+        return model
+    raise ValueError('Unknown memory-mapped model kind: %s' % kind)
+
+
+def mmap_path(path):
+    """Return the path of the memory-mapped version of a pickled model."""
+    return os.path.splitext(path)[0] + MMAP_EXT
+
+
+def convert_model(path, output=None):
+    """Convert a pickled model to the memory-mapped format.
+
+    :param string path: The path of the pickled model.
+    :param string output: (Optional) The path of the file to write. Defaults to the model path with a ``.mmap``
+                          extension.
+    :returns: The path of the file written.
+    :raises ValueError: If the file isn't a pickled model.
+    :raises TypeError: If the model can't be memory-mapped.
+    """
+    output = output if output is not None else mmap_path(path)
+    with io.open(path, 'rb') as f:
+        try:
+            model = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, IndexError, KeyError, ValueError) as e:
+            raise ValueError('%s is not a pickled model: %s' % (path, e))
+    save_model(model, output)
+    log.debug('Converted %s to %s', path, output)
+    return output
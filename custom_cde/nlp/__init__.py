@@ -12,8 +12,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from .abbrev import AbbreviationDetector, ChemAbbreviationDetector
-from .tokenize import SentenceTokenizer, ChemSentenceTokenizer, WordTokenizer, ChemWordTokenizer, FineWordTokenizer
-from .pos import ApPosTagger, ChemApPosTagger, CrfPosTagger, ChemCrfPosTagger
-from .cem import CemTagger, CiDictCemTagger, CsDictCemTagger, CrfCemTagger
-from .tag import NoneTagger, ApTagger, CrfTagger, DictionaryTagger, RegexTagger
+from ..utils import lazy_import
+
+
+lazy_import(globals(), {
+    '.abbrev': ['AbbreviationDetector', 'ChemAbbreviationDetector'],
+    '.tokenize': ['SentenceTokenizer', 'ChemSentenceTokenizer', 'WordTokenizer', 'ChemWordTokenizer', 'FineWordTokenizer'],
+    '.pos': ['ApPosTagger', 'ChemApPosTagger', 'CrfPosTagger', 'ChemCrfPosTagger'],
+    '.cem': ['CemTagger', 'CiDictCemTagger', 'CsDictCemTagger', 'CrfCemTagger'],
+    '.tag': ['NoneTagger', 'ApTagger', 'CrfTagger', 'DictionaryTagger', 'RegexTagger'],
+})
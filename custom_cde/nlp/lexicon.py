@@ -12,6 +12,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import logging
+import threading
 
 import six
 
@@ -22,6 +23,9 @@ from ..utils import Singleton
 
 log = logging.getLogger(__name__)
 
+# Guards lazy loading of clusters, so a Lexicon shared between threads only loads them once
+_load_lock = threading.Lock()
+
 
 class Lexeme(object):
     """"""
@@ -141,8 +145,10 @@ class Lexicon(six.with_metaclass(Singleton)):
     def cluster(self, text):
         """"""
         if not self._loaded_clusters and self.clusters_path:
-            self.clusters = load_model(self.clusters_path)
-            self._loaded_clusters = True
+            with _load_lock:
+                if not self._loaded_clusters:
+                    self.clusters = load_model(self.clusters_path)
+                    self._loaded_clusters = True
         return self.clusters.get(text, None)
 
     def normalized(self, text):
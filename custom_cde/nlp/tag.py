@@ -12,22 +12,31 @@ from __future__ import unicode_literals
 from __future__ import division
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
+import hashlib
 import io
 import logging
+import multiprocessing
+import os
 import pickle
 import random
 import re
+import threading
 
 import dawg
 import pycrfsuite
 import six
 
+from .. import __version__
 from ..data import load_model, find_data
+from ..utils import ensure_dir, replace_file
 from .lexicon import Lexicon
 
 
 log = logging.getLogger(__name__)
 
+# Guards lazy model loading, so taggers shared between threads only load their model once
+_load_lock = threading.Lock()
+
 
 class BaseTagger(six.with_metaclass(ABCMeta)):
     """Abstract tagger class from which all taggers inherit.
@@ -142,9 +151,10 @@ class AveragedPerceptron(object):
         """Dot-product the features and current weights and return the best label."""
         scores = defaultdict(float)
         for feat in features:
-            if feat not in self.weights:
+            # A single lookup, as weights may be a memory-mapped table
+            weights = self.weights.get(feat)
+            if not weights:
                 continue
-            weights = self.weights[feat]
             for label, weight in weights.items():
                 scores[label] += weight
         # Do a secondary alphabetic sort, for stability
@@ -219,7 +229,9 @@ class ApTagger(six.with_metaclass(ABCMeta, BaseTagger)):
         """Return a list of (token, tag) tuples for a given list of tokens."""
         # Lazy load model first time we tag
         if not self.classes:
-            self.load(self.model)
+            with _load_lock:
+                if not self.classes:
+                    self.load(self.model)
         prev, prev2 = self.START
         tags = []
         for i, token in enumerate(tokens):
@@ -266,8 +278,10 @@ class ApTagger(six.with_metaclass(ABCMeta, BaseTagger)):
 
     def load(self, model):
         """Load pickled model."""
-        self.perceptron.weights, self.tagdict, self.classes, self.clusters = load_model(model)
-        self.perceptron.classes = self.classes
+        weights, tagdict, classes, self.clusters = load_model(model)
+        self.perceptron.weights, self.tagdict, self.perceptron.classes = weights, tagdict, classes
+        # Set last, as other threads check it to tell whether the model is loaded
+        self.classes = classes
 
     @abstractmethod
     def _get_features(self, i, context, prev, prev2):
@@ -291,6 +305,32 @@ class ApTagger(six.with_metaclass(ABCMeta, BaseTagger)):
                 self.tagdict[word] = tag
 
 
+_worker_state = {}
+
+
+def _init_feature_worker(tagger):
+    """Store the tagger in a worker process, so it isn't sent with every chunk of sentences."""
+    _worker_state['tagger'] = tagger
+
+
+def _feature_worker(sentences):
+    """Extract the features for a chunk of annotated sentences in a worker process."""
+    tagger = _worker_state['tagger']
+    return [tagger._sentence_features(sentence) for sentence in sentences]
+
+
+def _chunks(iterable, size):
+    """Yield lists of up to size items from an iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 class CrfTagger(BaseTagger):
     """Tagger that uses Conditional Random Fields (CRF)."""
     lexicon = Lexicon()
@@ -316,6 +356,8 @@ class CrfTagger(BaseTagger):
         self.params = params if params is not None else self.params
         self._tagger = pycrfsuite.Tagger()
         self._loaded_model = False
+        # The CRFSuite tagger holds per-sequence state, so it must not be shared between threads mid-sequence
+        self._lock = threading.Lock()
 
     def load(self, model):
         log.debug('Loading %s' % model)
@@ -324,25 +366,121 @@ class CrfTagger(BaseTagger):
 
     def tag(self, tokens):
         """Return a list of ((token, tag), label) tuples for a given list of (token, tag) tuples."""
-        # Lazy load model first time we tag
-        if not self._loaded_model:
-            self.load(self.model)
         features = [self._get_features(tokens, i) for i in range(len(tokens))]
-        labels = self._tagger.tag(features)
+        with self._lock:
+            # Lazy load model first time we tag
+            if not self._loaded_model:
+                self.load(self.model)
+            labels = self._tagger.tag(features)
         tagged_sent = list(zip(tokens, labels))
         return tagged_sent
 
-    def train(self, sentences, model):
+    def __getstate__(self):
+        # The CRFSuite tagger and lock can't be pickled, so a tagger sent to another process loads its model again
+        state = self.__dict__.copy()
+        for attr in ('_tagger', '_loaded_model', '_lock'):
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tagger = pycrfsuite.Tagger()
+        self._loaded_model = False
+        self._lock = threading.Lock()
+
+    def _sentence_features(self, sentence):
+        """Return the features for each token in an annotated sentence, and the labels."""
+        tokens, labels = zip(*sentence)
+        return [self._get_features(tokens, i) for i in range(len(tokens))], list(labels)
+
+    def extract_features(self, sentences, workers=1, chunksize=200):
+        """Yield a (features, labels) tuple for each annotated sentence, in order.
+
+        :param sentences: Annotated sentences.
+        :param int workers: (Optional) Number of processes to extract features in. None for the number of CPUs.
+        :param int chunksize: (Optional) Number of sentences sent to a worker at a time.
+        """
+        workers = workers or multiprocessing.cpu_count()
+        if workers == 1:
+            for sentence in sentences:
+                yield self._sentence_features(sentence)
+            return
+        pool = multiprocessing.Pool(workers, initializer=_init_feature_worker, initargs=(self,))
+        try:
+            for results in pool.imap(_feature_worker, _chunks(sentences, chunksize)):
+                for result in results:
+                    yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def features_key(self, sentences):
+        """Return a hash that identifies the features of annotated sentences, given the tagger configuration.
+
+        This includes the tagger class, cluster setting and lexicon, and the package version, but not the code of
+        ``_get_features``, so cached features must be cleared by hand when it changes during development.
+        """
+        cls = self.__class__
+        lexicon = self.lexicon.__class__
+        config = '%s %s.%s clusters=%s %s.%s clusters_path=%s pickle=%s\n' % (
+            __version__, cls.__module__, cls.__name__, self.clusters, lexicon.__module__, lexicon.__name__,
+            self.lexicon.clusters_path, pickle.HIGHEST_PROTOCOL
+        )
+        h = hashlib.sha1(config.encode('utf8'))
+        for sentence in sentences:
+            h.update(repr(sentence).encode('utf8'))
+            h.update(b'\n')
+        return h.hexdigest()
+
+    def training_features(self, sentences, workers=1, cache_dir=None):
+        """Yield a (features, labels) tuple for each annotated sentence, using a feature cache if given.
+
+        Features are stored in a file in the cache directory named by :meth:`features_key`, so training again on the
+        same sentences, e.g. with different ``params``, reads the features instead of extracting them again.
+
+        :param sentences: Annotated sentences.
+        :param int workers: (Optional) Number of processes to extract features in. None for the number of CPUs.
+        :param string cache_dir: (Optional) Directory to cache features in.
+        """
+        if cache_dir is None:
+            for result in self.extract_features(sentences, workers=workers):
+                yield result
+            return
+        sentences = list(sentences)
+        path = os.path.join(cache_dir, '%s.features' % self.features_key(sentences))
+        if os.path.isfile(path):
+            log.debug('Loading cached features from %s', path)
+            with io.open(path, 'rb') as f:
+                for _ in range(pickle.load(f)):
+                    yield pickle.load(f)
+            return
+        ensure_dir(cache_dir)
+        tmp_path = '%s.%s.tmp' % (path, os.getpid())
+        try:
+            with io.open(tmp_path, 'wb') as f:
+                # The highest protocol is several times faster to load than protocol 2 on Python 3
+                pickle.dump(len(sentences), f, protocol=pickle.HIGHEST_PROTOCOL)
+                for result in self.extract_features(sentences, workers=workers):
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    yield result
+            replace_file(tmp_path, path)
+            log.debug('Saved features to %s', path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def train(self, sentences, model, workers=1, cache_dir=None):
         """Train the CRF tagger using CRFSuite.
 
         :params sentences: Annotated sentences.
         :params model: Path to save pickled model.
+        :param int workers: (Optional) Number of processes to extract features in. None for the number of CPUs.
+        :param string cache_dir: (Optional) Directory to cache extracted features in, to reuse when training again.
         """
         trainer = pycrfsuite.Trainer(verbose=True)
         trainer.set_params(self.params)
-        for sentence in sentences:
-            tokens, labels = zip(*sentence)
-            features = [self._get_features(tokens, i) for i in range(len(tokens))]
+        for features, labels in self.training_features(sentences, workers=workers, cache_dir=cache_dir):
             trainer.append(features, labels)
         trainer.train(model)
         self.load(model)
@@ -401,7 +539,9 @@ class DictionaryTagger(BaseTagger):
     def tag(self, tokens):
         """Return a list of (token, tag) tuples for a given list of tokens."""
         if not self._loaded_model:
-            self.load(self.model)
+            with _load_lock:
+                if not self._loaded_model:
+                    self.load(self.model)
         tags = [None] * len(tokens)
         norm = self._normalize(tokens)
         length = len(norm)
@@ -12,23 +12,29 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from .actions import join, merge, strip_stop, fix_whitespace
-from .elements import W, I, R, T, H
-from .elements import Any, Word, Tag, IWord, Regex, Start, End, Hide, Not
-from .elements import And, Or, First, ZeroOrMore, OneOrMore, Optional, Group, SkipTo
+from ..utils import lazy_import
 
-from .cem import CompoundParser, ChemicalLabelParser, CompoundHeadingParser
-from .context import ContextParser
-from .ir import IrParser
-from .mp import MpParser
-from .tg import TgParser
-from .nmr import NmrParser
-from .table import CompoundHeadingParser, SolventHeadingParser, UvvisAbsDisallowedHeadingParser, SolventInHeadingParser
-from .table import TempInHeadingParser, SolventCellParser, CompoundCellParser, UvvisEmiHeadingParser
-from .table import UvvisAbsHeadingParser, ExtinctionHeadingParser, IrHeadingParser, IrCellParser
-from .table import QuantumYieldHeadingParser, QuantumYieldCellParser, UvvisEmiCellParser, UvvisAbsCellParser
-from .table import ExtinctionCellParser, UvvisAbsEmiQuantumYieldHeadingParser, UvvisAbsEmiQuantumYieldCellParser
-from .table import UvvisEmiQuantumYieldHeadingParser, UvvisEmiQuantumYieldCellParser, FluorescenceLifetimeHeadingParser
-from .table import FluorescenceLifetimeCellParser, MeltingPointHeadingParser, MeltingPointCellParser, GlassTransitionHeadingParser, GlassTransitionCellParser
-from .table import ElectrochemicalPotentialHeadingParser, ElectrochemicalPotentialCellParser, CaptionContextParser
-from .uvvis import UvvisParser
+
+# Grammars are built when their module is imported, so parsers are only imported when first used
+lazy_import(globals(), {
+    '.actions': ['join', 'merge', 'strip_stop', 'fix_whitespace'],
+    '.elements': ['W', 'I', 'R', 'T', 'H', 'Any', 'Word', 'Tag', 'IWord', 'Regex', 'Start', 'End', 'Hide', 'Not', 'And',
+                  'Or', 'First', 'ZeroOrMore', 'OneOrMore', 'Optional', 'Group', 'SkipTo'],
+    '.cem': ['CompoundParser', 'ChemicalLabelParser'],
+    '.context': ['ContextParser'],
+    '.ir': ['IrParser'],
+    '.mp': ['MpParser'],
+    '.tg': ['TgParser'],
+    '.nmr': ['NmrParser'],
+    '.table': ['CompoundHeadingParser', 'SolventHeadingParser', 'UvvisAbsDisallowedHeadingParser',
+               'SolventInHeadingParser', 'TempInHeadingParser', 'SolventCellParser', 'CompoundCellParser',
+               'UvvisEmiHeadingParser', 'UvvisAbsHeadingParser', 'ExtinctionHeadingParser', 'IrHeadingParser',
+               'IrCellParser', 'QuantumYieldHeadingParser', 'QuantumYieldCellParser', 'UvvisEmiCellParser',
+               'UvvisAbsCellParser', 'ExtinctionCellParser', 'UvvisAbsEmiQuantumYieldHeadingParser',
+               'UvvisAbsEmiQuantumYieldCellParser', 'UvvisEmiQuantumYieldHeadingParser',
+               'UvvisEmiQuantumYieldCellParser', 'FluorescenceLifetimeHeadingParser', 'FluorescenceLifetimeCellParser',
+               'MeltingPointHeadingParser', 'MeltingPointCellParser', 'GlassTransitionHeadingParser',
+               'GlassTransitionCellParser', 'ElectrochemicalPotentialHeadingParser',
+               'ElectrochemicalPotentialCellParser', 'CaptionContextParser'],
+    '.uvvis': ['UvvisParser'],
+})
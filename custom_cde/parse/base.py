@@ -14,6 +14,9 @@ from __future__ import unicode_literals
 from abc import abstractproperty, abstractmethod
 import logging
 
+from ..utils import memoized_property
+from .elements import get_triggers
+
 log = logging.getLogger(__name__)
 
 
@@ -28,6 +31,18 @@ class BaseParser(object):
     def interpret(self, result, start, end):
         pass
 
+    @memoized_property
+    def triggers(self):
+        """Conditions the first token of any match of this parser must satisfy, or None if they can't be determined."""
+        return get_triggers(self.root)[0]
+
+    def could_parse(self, tokens):
+        """Quickly check whether this parser could possibly match the tokens, without performing a full parse.
+
+        This may return True for tokens that don't end up matching, but never returns False for tokens that do.
+        """
+        return self.triggers is None or self.triggers.match_any(tokens)
+
     def parse(self, tokens):
         for result in self.root.scan(tokens):
             for model in self.interpret(*result):
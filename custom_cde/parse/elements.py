@@ -576,6 +576,96 @@ class Hide(ParseElementEnhance):
         return self
 
 
+class Triggers(object):
+    """Conditions on a single token, at least one of which must hold for the first token of any match.
+
+    This is used to quickly rule out a parser element for a list of tokens before attempting a full parse.
+    """
+
+    def __init__(self):
+        #: Exact token texts.
+        self.words = set()
+        #: Lowercase token texts, matched case-insensitively.
+        self.iwords = set()
+        #: Exact token tags.
+        self.tags = set()
+        #: Compiled regular expressions searched against the token text.
+        self.regexes = []
+
+    def update(self, other):
+        """Add the conditions from another Triggers instance."""
+        self.words.update(other.words)
+        self.iwords.update(other.iwords)
+        self.tags.update(other.tags)
+        self.regexes.extend(r for r in other.regexes if r not in self.regexes)
+
+    def match(self, token):
+        """Return True if a (text, tag) token satisfies any of the conditions."""
+        text, tag = token[0], token[1]
+        if text in self.words or tag in self.tags or (self.iwords and text.lower() in self.iwords):
+            return True
+        return any(regex.search(text) for regex in self.regexes)
+
+    def match_any(self, tokens):
+        """Return True if any token in a list of (text, tag) tokens satisfies any of the conditions."""
+        return any(self.match(token) for token in tokens)
+
+
+def get_triggers(element):
+    """Return a (triggers, nullable) tuple for a parser element.
+
+    ``triggers`` is a :class:`Triggers` that the first token of any non-empty match must satisfy, or None if that can't
+    be determined (e.g. the element can start with any token). ``nullable`` is True if the element can match without
+    consuming any tokens.
+    """
+    if isinstance(element, IWord):
+        triggers = Triggers()
+        triggers.iwords.add(element.match)
+        return triggers, False
+    if isinstance(element, Word):
+        triggers = Triggers()
+        triggers.words.add(element.match)
+        return triggers, False
+    if isinstance(element, Tag):
+        triggers = Triggers()
+        triggers.tags.add(element.match)
+        return triggers, False
+    if isinstance(element, Regex):
+        triggers = Triggers()
+        triggers.regexes.append(element.regex)
+        return triggers, False
+    if isinstance(element, (Start, End, FollowedBy, Not)):
+        # Lookahead and position checks never consume tokens
+        return Triggers(), True
+    if isinstance(element, And):
+        triggers = Triggers()
+        for expr in element.exprs:
+            expr_triggers, nullable = get_triggers(expr)
+            if expr_triggers is None:
+                return None, False
+            triggers.update(expr_triggers)
+            if not nullable:
+                return triggers, False
+        return triggers, True
+    if isinstance(element, (Or, First)):
+        triggers = Triggers()
+        any_nullable = False
+        for expr in element.exprs:
+            expr_triggers, nullable = get_triggers(expr)
+            if expr_triggers is None:
+                return None, False
+            triggers.update(expr_triggers)
+            any_nullable = any_nullable or nullable
+        return triggers, any_nullable
+    if isinstance(element, (Optional, ZeroOrMore)):
+        triggers, nullable = get_triggers(element.expr)
+        return triggers, True
+    if isinstance(element, (OneOrMore, Group, Hide)) and element.expr is not None:
+        return get_triggers(element.expr)
+    # Any, SkipTo and unknown elements could start with any token
+    return None, False
+
+
 # Abbreviations
 W = Word
 I = IWord
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.preload
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Load models and build parser grammars up front, instead of when the first document is processed.
+
+Usage::
+
+    from chemdataextractor.preload import warmup
+
+    warmup(freeze=True)
+    # Now fork worker processes, which share the loaded models
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import namedtuple
+import gc
+import io
+import logging
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+log = logging.getLogger(__name__)
+
+
+#: The analysis attributes of an element class that may need a model.
+COMPONENT_ATTRS = ('sentence_tokenizer', 'word_tokenizer', 'lexicon', 'pos_tagger', 'ner_tagger')
+
+
+#: The time taken and memory used to load a model or build the parsers for an element class. Memory is the increase
+#: in the resident set size of the process in bytes, or None if it can't be measured on this platform.
+LoadResult = namedtuple('LoadResult', ['name', 'seconds', 'memory'])
+
+
+def memory_usage():
+    """Return the resident set size of this process in bytes, or None if it can't be determined.
+
+    On platforms without ``/proc``, this is the peak resident set size instead.
+    """
+    try:
+        with io.open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    return None
+
+
+def default_element_classes():
+    """Return the document element classes used when extracting records from a document."""
+    from .doc.table import Cell, Table
+    from .doc.text import Caption, Citation, Footnote, Heading, Paragraph, Title
+    return [Title, Heading, Paragraph, Caption, Footnote, Citation, Table, Cell]
+
+
+def _iter_components(element_classes):
+    """Yield each tokenizer, lexicon and tagger used by the element classes, once each."""
+    seen = set()
+    stack = []
+    for cls in element_classes:
+        stack.extend(getattr(cls, attr, None) for attr in reversed(COMPONENT_ATTRS))
+        while stack:
+            component = stack.pop()
+            if component is None or id(component) in seen:
+                continue
+            seen.add(id(component))
+            yield component
+            # Combined taggers and taggers with word clusters depend on further components
+            stack.extend(reversed(getattr(component, 'taggers', [])))
+            stack.append(getattr(component, 'lexicon', None))
+
+
+def _load_component(component):
+    """Load the model for a tokenizer, lexicon or tagger. Return the model path, or None if nothing was loaded."""
+    from .nlp.lexicon import Lexicon
+    from .nlp.tag import ApTagger, CrfTagger, DictionaryTagger
+    from .nlp.tokenize import SentenceTokenizer
+    if isinstance(component, SentenceTokenizer):
+        if component._tokenizer is None:
+            component.span_tokenize('')
+            return component.model
+    elif isinstance(component, CrfTagger):
+        with component._lock:
+            if not component._loaded_model:
+                component.load(component.model)
+                return component.model
+    elif isinstance(component, DictionaryTagger):
+        if not component._loaded_model:
+            component.load(component.model)
+            return component.model
+    elif isinstance(component, ApTagger):
+        if not component.classes:
+            component.load(component.model)
+            return component.model
+    elif isinstance(component, Lexicon):
+        if component.clusters_path and not component._loaded_clusters:
+            component.cluster('')
+            return component.clusters_path
+    return None
+
+
+def _build_parsers(cls):
+    """Build the grammars of an element class's parsers. Return the number of parsers."""
+    parsers = [p for entry in cls.parsers for p in (entry if isinstance(entry, tuple) else (entry,))]
+    for parser in parsers:
+        parser.triggers
+    return len(parsers)
+
+
+def warmup(element_classes=None, parsers=True, freeze=False):
+    """Load every model used by the document element classes and build their parsers' grammars.
+
+    Models are otherwise loaded the first time they are needed, so the first document processed takes several seconds
+    longer. In a server that forks worker processes, calling this before forking means the models are loaded once and
+    shared between the workers, rather than loaded again in each one.
+
+    Models that have already been loaded are skipped, so calling this more than once is cheap.
+
+    :param list element_classes: (Optional) The element classes to prepare. Defaults to those used by readers.
+    :param bool parsers: (Optional) Whether to also build the grammars of the parsers configured on each class.
+    :param bool freeze: (Optional) Move everything loaded into the permanent generation of the garbage collector
+                        (Python 3.7+), so that garbage collection in forked workers doesn't copy it.
+    :returns: A :class:`LoadResult` for each model loaded and each element class whose parsers were built.
+    :rtype: list[LoadResult]
+    """
+    element_classes = element_classes if element_classes is not None else default_element_classes()
+    results = []
+    for component in _iter_components(element_classes):
+        memory = memory_usage()
+        start = time.time()
+        path = _load_component(component)
+        if path is not None:
+            end_memory = memory_usage()
+            result = LoadResult(path, time.time() - start, end_memory - memory if memory is not None else None)
+            log.debug('Loaded %s in %.2fs', path, result.seconds)
+            results.append(result)
+    if parsers:
+        for cls in element_classes:
+            memory = memory_usage()
+            start = time.time()
+            count = _build_parsers(cls)
+            if count:
+                end_memory = memory_usage()
+                name = '%s parsers (%s)' % (cls.__name__, count)
+                results.append(LoadResult(name, time.time() - start, end_memory - memory if memory is not None else None))
+    if freeze:
+        if hasattr(gc, 'freeze'):
+            gc.collect()
+            gc.freeze()
+        else:
+            log.warning('gc.freeze requires Python 3.7 or later')
+    return results
@@ -13,13 +13,14 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from .acs import AcsHtmlReader
+from .archive import iter_archive, read_archive
 from .cssp import CsspHtmlReader
 from .markup import HtmlReader, XmlReader
-from .pdf import PdfReader
+from .pdf import PdfReader, PdfLayoutCache
 from .plaintext import PlainTextReader
 from .rsc import RscHtmlReader
 from .nlm import NlmXmlReader
-from .uspto import UsptoXmlReader
+from .uspto import UsptoXmlReader, UsptoXmlBulkReader
 
 
 DEFAULT_READERS = [
@@ -40,6 +40,7 @@ class AcsHtmlReader(HtmlReader):
         """"""
         if fname and not (fname.endswith('.html') or fname.endswith('.htm')):
             return False
-        if b'<meta name="dc.Identifier" scheme="doi" content="10.1021/' in fstring:
+        prefix = self._detect_prefix(fstring)
+        if b'<meta name="dc.Identifier" scheme="doi" content="10.1021/' in prefix:
             return True
         return False
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.reader.archive
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Read documents directly from zip, tar and gzip archives.
+
+Members are read one at a time from the archive, without extracting it to disk. Each member's name is passed as the
+filename, so the usual reader detection applies.
+
+A gzip or bzip2 compressed file of concatenated XML documents, such as a USPTO bulk full-text file, is split into its
+documents, which are named after the file with their index inserted before the extension, e.g. ``ipg050111-3.xml``.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import bz2
+import gzip
+import io
+import itertools
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+import six
+
+from ..errors import ReaderError
+
+
+log = logging.getLogger(__name__)
+
+
+#: File extensions recognised as archives.
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.gz', '.bz2')
+
+
+def is_archive(fname):
+    """Return True if a filename has an archive file extension."""
+    return bool(fname) and fname.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _is_hidden(name):
+    """Return True for archive members that are metadata rather than documents, e.g. macOS resource forks."""
+    return any(part.startswith('.') or part == '__MACOSX' for part in name.split('/'))
+
+
+def _strip_extension(fname, extension):
+    name = os.path.basename(fname or '')
+    return name[:-len(extension)] if name.lower().endswith(extension) else name
+
+
+def _indexed_name(name, index):
+    root, ext = os.path.splitext(name)
+    return '%s-%s%s' % (root, index, ext)
+
+
+def _iter_compressed(stream, name):
+    """Yield a (name, bytes) tuple for each document in a decompressed stream.
+
+    If the stream starts with an XML declaration, it is split into documents at each XML declaration, as in a USPTO bulk
+    file, and the documents are read one at a time. A stream with a single document, or that isn't XML, is yielded
+    whole with the given name.
+    """
+    from .uspto import UsptoXmlBulkReader
+    first = stream.readline()
+    if not (first.startswith(b'<?xml') or first.startswith(b'\xef\xbb\xbf<?xml')):
+        yield name, first + stream.read()
+        return
+    documents = UsptoXmlBulkReader().split(itertools.chain([first], stream))
+    # Look ahead one document, so a file with a single document keeps its name
+    previous = next(documents, None)
+    split = False
+    for index, document in documents:
+        yield _indexed_name(name, previous[0]), previous[1]
+        previous = (index, document)
+        split = True
+    if previous is not None:
+        yield _indexed_name(name, previous[0]) if split else name, previous[1]
+
+
+def iter_archive(f, fname=None):
+    """Yield a (name, bytes) tuple for each file in a zip, tar (optionally compressed), gzip or bzip2 archive.
+
+    Members are read one at a time, so only one is held in memory. A gzip or bzip2 file that isn't a tar archive is
+    treated as a single compressed document, named after the archive without its extension, unless it contains
+    concatenated XML documents, which are yielded one at a time. Input that can't seek, such as a pipe, is first copied
+    to a temporary file.
+
+    :param file|string f: A file-like object opened in binary mode, or a path to a file.
+    :param string fname: (Optional) The archive filename.
+    """
+    if isinstance(f, six.string_types):
+        with io.open(f, 'rb') as fobj:
+            for result in iter_archive(fobj, fname=fname or f):
+                yield result
+        return
+    if not fname and hasattr(f, 'name'):
+        fname = f.name
+    # Archive formats need to be detected by trying them, which requires seeking back to the start
+    if not (hasattr(f, 'seekable') and f.seekable()):
+        with tempfile.TemporaryFile() as tmp:
+            shutil.copyfileobj(f, tmp)
+            tmp.seek(0)
+            for result in iter_archive(tmp, fname=fname):
+                yield result
+        return
+    start = f.tell()
+    head = f.read(4)
+    f.seek(start)
+
+    if zipfile.is_zipfile(f):
+        f.seek(start)
+        with zipfile.ZipFile(f) as zf:
+            for info in zf.infolist():
+                if info.filename.endswith('/') or _is_hidden(info.filename):
+                    continue
+                yield info.filename, zf.read(info)
+        return
+    f.seek(start)
+
+    try:
+        tar = tarfile.open(fileobj=f, mode='r|*')
+    except tarfile.TarError:
+        f.seek(start)
+    else:
+        with tar:
+            for member in tar:
+                if not member.isfile() or _is_hidden(member.name):
+                    continue
+                yield member.name, tar.extractfile(member).read()
+        return
+
+    if head.startswith(b'\x1f\x8b'):
+        for result in _iter_compressed(gzip.GzipFile(fileobj=f, mode='rb'), _strip_extension(fname, '.gz')):
+            yield result
+    elif head.startswith(b'BZh'):
+        for result in _iter_compressed(bz2.BZ2File(f, mode='rb'), _strip_extension(fname, '.bz2')):
+            yield result
+    else:
+        raise ReaderError('Unsupported archive format')
+
+
+def read_archive(f, fname=None, readers=None):
+    """Yield a (name, Document) tuple for each document in an archive.
+
+    Members that can't be read by any of the readers are logged and skipped.
+
+    :param file|string f: A file-like object opened in binary mode, or a path to a file.
+    :param string fname: (Optional) The archive filename.
+    :param list[chemdataextractor.reader.base.BaseReader] readers: (Optional) List of readers to use.
+    """
+    from ..doc.document import Document
+    for name, fstring in iter_archive(f, fname=fname):
+        try:
+            yield name, Document.from_string(fstring, fname=name, readers=readers)
+        except ReaderError as e:
+            log.warning('Unable to read %s: %s', name, e)
@@ -19,6 +19,10 @@ import six
 class BaseReader(six.with_metaclass(ABCMeta)):
     """All Document Readers should implement a parse method."""
 
+    #: Maximum number of bytes at the start of the input examined by detect. Identifying features such as the DOCTYPE,
+    #: root element, namespaces and publisher meta tags appear near the start, so there's no need to search further.
+    detect_bytes = 262144
+
     def detect(self, fstring, fname=None):
         """Quickly check if this reader can parse the input. Reader subclasses should override this.
 
@@ -27,6 +31,10 @@ class BaseReader(six.with_metaclass(ABCMeta)):
         """
         return True
 
+    def _detect_prefix(self, fstring):
+        """Return the part of the input that detect should examine."""
+        return fstring[:self.detect_bytes]
+
     @abstractmethod
     def parse(self, fstring):
         """Parse the input and return a Document. Raises ReaderError if the parse fails."""
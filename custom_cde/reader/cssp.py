@@ -43,6 +43,7 @@ class CsspHtmlReader(HtmlReader):
         """"""
         if fname and not (fname.endswith('.html') or fname.endswith('.htm')):
             return False
-        if b'meta name="DC.Publisher" content="ChemSpider SyntheticPages"' in fstring:
+        prefix = self._detect_prefix(fstring)
+        if b'meta name="DC.Publisher" content="ChemSpider SyntheticPages"' in prefix:
             return True
         return False
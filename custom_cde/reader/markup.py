@@ -56,6 +56,10 @@ class LxmlReader(six.with_metaclass(ABCMeta, BaseReader)):
     citation_css = 'cite'
     ignore_css = 'a.ref sup'
 
+    #: Namespace prefixes available to CSS and XPath queries. CSS selectors and XPath queries are compiled once per
+    #: reader class, with these namespaces bound.
+    namespaces = None
+
     #: Inline elements
     inline_elements = INLINE_ELEMENTS
 
@@ -180,15 +184,50 @@ class LxmlReader(six.with_metaclass(ABCMeta, BaseReader)):
         tab = Table(caption, headings=hrows, rows=rows, footnotes=footnotes, id=el.get('id', None))
         return [tab]
 
-    def _xpath(self, query, root):
-        result = root.xpath(query, smart_strings=False)
+    @classmethod
+    def _compiled_queries(cls):
+        """Return the cache of compiled queries for this reader class, keyed by query string."""
+        # Look in this class's own __dict__ so subclasses with different namespaces don't share a cache
+        queries = cls.__dict__.get('_queries')
+        if queries is None:
+            queries = {}
+            cls._queries = queries
+        return queries
+
+    @classmethod
+    def _compile_xpath(cls, query):
+        """Return a compiled XPath for an XPath query string, compiling it on first use."""
+        queries = cls._compiled_queries()
+        key = ('xpath', query)
+        compiled = queries.get(key)
+        if compiled is None:
+            compiled = etree.XPath(query, namespaces=cls.namespaces, smart_strings=False)
+            queries[key] = compiled
+        return compiled
+
+    @classmethod
+    def _compile_css(cls, query):
+        """Return a compiled XPath for a CSS selector, translating and compiling it on first use."""
+        queries = cls._compiled_queries()
+        key = ('css', query)
+        compiled = queries.get(key)
+        if compiled is None:
+            compiled = cls._compile_xpath(CssHTMLTranslator().css_to_xpath(query))
+            queries[key] = compiled
+        return compiled
+
+    def _select(self, compiled, root):
+        result = compiled(root)
         if type(result) is not list:
             result = [result]
-        log.debug('Selecting XPath: {}: {}'.format(query, result))
+        log.debug('Selecting XPath: %s: %s', compiled.path, result)
         return result
 
+    def _xpath(self, query, root):
+        return self._select(self._compile_xpath(query), root)
+
     def _css(self, query, root):
-        return self._xpath(CssHTMLTranslator().css_to_xpath(query), root)
+        return self._select(self._compile_css(query), root)
 
     def _is_inline(self, element):
         """Return True if an element is inline."""
@@ -201,11 +240,33 @@ class LxmlReader(six.with_metaclass(ABCMeta, BaseReader)):
         """Read a string into an lxml elementtree."""
         pass
 
-    def parse(self, fstring):
-        root = self._make_tree(fstring)
+    def _get_tree(self, fstring, trees=None):
+        """Return the lxml elementtree for a file string, reusing a tree from trees if one was already built the same way.
+
+        Readers that share a ``_make_tree`` implementation parse the input into identical trees, so when multiple
+        readers are tried on the same input it only needs to be parsed once.
+        """
+        if trees is None:
+            return self._make_tree(fstring)
+        key = six.get_method_function(self._make_tree)
+        if key not in trees:
+            trees[key] = self._make_tree(fstring)
+        return trees[key]
+
+    def parse(self, fstring, trees=None):
+        """Parse the input and return a Document. Raises ReaderError if the parse fails.
+
+        :param bytes fstring: The file string.
+        :param dict trees: (Optional) Trees already built from the same file string by other readers. Any tree this
+                           reader builds is added. The tree is only modified once the reader is sure it can parse it.
+        """
+        root = self._get_tree(fstring, trees)
         if root is None:
             raise ReaderError
-        root = self._css(self.root_css, root)[0]
+        roots = self._css(self.root_css, root)
+        if not roots:
+            raise ReaderError('No root element matching %s' % self.root_css)
+        root = roots[0]
         for cleaner in self.cleaners:
             cleaner(root)
         specials = {}
@@ -50,10 +50,11 @@ class NlmXmlReader(XmlReader):
         """"""
         if fname and not (fname.endswith('.xml') or fname.endswith('.nxml')):
             return False
-        if b'xmlns="http://jats.nlm.nih.gov/ns/archiving' in fstring:
+        prefix = self._detect_prefix(fstring)
+        if b'xmlns="http://jats.nlm.nih.gov/ns/archiving' in prefix:
             return True
-        if b'JATS-archivearticle1.dtd' in fstring:
+        if b'JATS-archivearticle1.dtd' in prefix:
             return True
-        if b'-//NLM//DTD JATS' in fstring:
+        if b'-//NLM//DTD JATS' in prefix:
             return True
         return False
@@ -12,6 +12,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+
+import pdfminer
 from pdfminer.converter import PDFPageAggregator
 from pdfminer.layout import LAParams, LTTextLine, LTTextBox, LTFigure
 from pdfminer.pdfdocument import PDFDocument
@@ -20,14 +28,142 @@ from pdfminer.pdfpage import PDFPage
 from pdfminer.pdfparser import PDFParser
 import six
 
+from ..data import get_data_dir
 from ..doc.document import Document
 from ..doc.text import Paragraph
+from ..utils import sqlite_connection
 from .base import BaseReader
 from ..errors import ReaderError
 
 
+log = logging.getLogger(__name__)
+
+
+class PdfLayoutCache(object):
+    """Persistent on-disk cache of PDF page layouts, stored in an SQLite database.
+
+    Usage::
+
+        PdfReader.layout_cache = PdfLayoutCache()
+
+    The text boxes found by layout analysis are stored for each page, keyed by a hash of the PDF contents, the layout
+    analysis parameters and the pdfminer version. Reading a PDF again rebuilds the Document from the cache without
+    running pdfminer. The database can be shared by multiple processes.
+    """
+
+    def __init__(self, path=None):
+        """
+
+        :param string path: (Optional) Path to the database file. Defaults to ``cache/pdf_layout.sqlite`` within the
+                            data directory.
+        """
+        self.path = path if path is not None else os.path.join(get_data_dir(), 'cache', 'pdf_layout.sqlite')
+        self._conn = None
+        self._pid = None
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.path)
+
+    @property
+    def conn(self):
+        """The database connection. Connections are not shared with forked child processes.
+
+        The connection is shared by all threads in a process, so it must only be used while holding the lock.
+        """
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite_connection(self.path, [
+                'CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, pages INTEGER NOT NULL)',
+                'CREATE TABLE IF NOT EXISTS pages (key TEXT NOT NULL, pageno INTEGER NOT NULL, '
+                'boxes TEXT NOT NULL, PRIMARY KEY (key, pageno))',
+            ])
+            self._pid = os.getpid()
+        return self._conn
+
+    def key(self, reader, fstring):
+        """Return a hash that identifies the layout of a PDF with the layout parameters of a reader."""
+        cls = reader.__class__
+        config = json.dumps(sorted(vars(reader.laparams).items()))
+        digest = hashlib.sha1(fstring).hexdigest()
+        key = '%s %s.%s %s %s' % (pdfminer.__version__, cls.__module__, cls.__name__, config, digest)
+        return hashlib.sha1(key.encode('utf8')).hexdigest()
+
+    def get_page_count(self, key):
+        """Return the number of pages in a PDF, or None if it isn't cached."""
+        with self._lock:
+            row = self.conn.execute('SELECT pages FROM documents WHERE key = ?', (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def put_page_count(self, key, pages):
+        """Store the number of pages in a PDF."""
+        with self._lock:
+            self.conn.execute('INSERT OR REPLACE INTO documents (key, pages) VALUES (?, ?)', (key, pages))
+
+    def get_pages(self, key, pagenos):
+        """Return a dict of page number to text boxes for the requested pages that are cached."""
+        pagenos = set(pagenos)
+        with self._lock:
+            rows = self.conn.execute('SELECT pageno, boxes FROM pages WHERE key = ?', (key,)).fetchall()
+        return {pageno: json.loads(boxes) for pageno, boxes in rows if pageno in pagenos}
+
+    def put_page(self, key, pageno, boxes):
+        """Store the text boxes for a page."""
+        value = json.dumps(boxes, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self.conn.execute('INSERT OR REPLACE INTO pages (key, pageno, boxes) VALUES (?, ?, ?)', (key, pageno, value))
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self.conn.execute('DELETE FROM documents')
+            self.conn.execute('DELETE FROM pages')
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+#: The reader and PDF being laid out by a worker process, set when the process starts.
+_worker_state = {}
+
+
+def _init_worker(reader, fstring):
+    """Store the reader and PDF in a worker process, so they aren't sent with every chunk of pages."""
+    _worker_state['reader'] = reader
+    _worker_state['fstring'] = fstring
+
+
+def _layout_worker(pagenos):
+    """Lay out a chunk of pages in a worker process."""
+    return list(_worker_state['reader']._layout_pages(_worker_state['fstring'], pagenos))
+
+
 class PdfReader(BaseReader):
-    """"""
+    """Reader for PDF documents, using pdfminer layout analysis.
+
+    Layout analysis is CPU-bound and independent for each page, so for long documents it can be spread over multiple
+    processes with ``workers``. Elements can be read page by page as they are laid out with :meth:`iter_pages`.
+    """
+
+    #: A :class:`PdfLayoutCache` used to store page layouts, so they aren't recomputed when a PDF is read again.
+    layout_cache = None
+
+    def __init__(self, pages=None, workers=1, chunksize=4, laparams=None):
+        """
+
+        :param pages: (Optional) Zero-based numbers of the pages to read, e.g. ``range(10)``. Defaults to all pages.
+        :param int workers: (Optional) Number of processes to use for layout analysis. Defaults to 1, which lays out
+                            pages in the current process. If None, the number of CPUs is used.
+        :param int chunksize: (Optional) Number of pages sent to a worker process at a time.
+        :param LAParams laparams: (Optional) pdfminer layout analysis parameters.
+        """
+        self.pages = frozenset(pages) if pages is not None else None
+        self.workers = workers
+        self.chunksize = chunksize
+        self.laparams = laparams if laparams is not None else LAParams()
 
     def detect(self, fstring, fname=None):
         """"""
@@ -35,38 +171,117 @@ class PdfReader(BaseReader):
             return False
         return True
 
-    def _process_layout(self, layout):
-        """Process an LTPage layout and return a list of elements."""
-        # Here we just group text into paragraphs
-        elements = []
+    def _layout_boxes(self, layout):
+        """Return the text of each text box in an LTPage layout."""
+        boxes = []
         for lt_obj in layout:
             if isinstance(lt_obj, LTTextBox) or isinstance(lt_obj, LTTextLine):
-                elements.append(Paragraph(lt_obj.get_text().strip()))
+                boxes.append(lt_obj.get_text())
             elif isinstance(lt_obj, LTFigure):
                 # Recursive...
-                elements.extend(self._process_layout(lt_obj))
-        return elements
+                boxes.extend(self._layout_boxes(lt_obj))
+        return boxes
 
-    def parse(self, fstring):
+    def _process_boxes(self, boxes):
+        """Process a list of text box strings from a page layout and return a list of elements."""
+        # Here we just group text into paragraphs
+        return [Paragraph(box.strip()) for box in boxes]
+
+    def _process_layout(self, layout):
+        """Process an LTPage layout and return a list of elements."""
+        return self._process_boxes(self._layout_boxes(layout))
+
+    def _open(self, fstring):
+        """Return a pdfminer PDFDocument for a PDF byte string."""
+        document = PDFDocument(PDFParser(six.BytesIO(fstring)))
+        if not document.is_extractable:
+            raise ReaderError('PDF text extraction not allowed')
+        return document
+
+    def _layout_pages(self, fstring, pagenos=None):
+        """Lay out pages in the current process, and yield a (page number, text boxes) tuple for each page."""
+        document = self._open(fstring)
+        rsrcmgr = PDFResourceManager()
+        device = PDFPageAggregator(rsrcmgr, laparams=self.laparams)
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        last = max(pagenos) if pagenos else None
+        for pageno, page in enumerate(PDFPage.create_pages(document)):
+            if pagenos is not None:
+                if last is None or pageno > last:
+                    break
+                if pageno not in pagenos:
+                    continue
+            interpreter.process_page(page)
+            yield pageno, self._layout_boxes(device.get_result())
+
+    def _count_pages(self, fstring):
+        """Return the number of pages in a PDF. This only walks the page tree, without interpreting any page content."""
+        return sum(1 for _ in PDFPage.create_pages(self._open(fstring)))
+
+    def _iter_layouts(self, fstring):
+        """Yield a (page number, text boxes) tuple for each selected page, in order."""
+        cache = self.layout_cache
+        if cache is None:
+            for result in self._lay_out(fstring, self.pages):
+                yield result
+            return
+        key = cache.key(self, fstring)
+        count = cache.get_page_count(key)
+        if count is None:
+            count = self._count_pages(fstring)
+            cache.put_page_count(key, count)
+        pagenos = [i for i in range(count) if self.pages is None or i in self.pages]
+        cached = cache.get_pages(key, pagenos)
+        log.debug('%s of %s pages found in layout cache', len(cached), len(pagenos))
+        missing = frozenset(pageno for pageno in pagenos if pageno not in cached)
+        # Only lay out missing pages, which are returned in order
+        results = self._lay_out(fstring, missing) if missing else None
+        for pageno in pagenos:
+            if pageno in cached:
+                yield pageno, cached[pageno]
+            else:
+                pageno, boxes = next(results)
+                cache.put_page(key, pageno, boxes)
+                yield pageno, boxes
+
+    def _lay_out(self, fstring, pages):
+        """Lay out pages, in worker processes if configured, and yield a (page number, text boxes) tuple for each."""
+        workers = self.workers or multiprocessing.cpu_count()
+        if workers == 1:
+            for result in self._layout_pages(fstring, pages):
+                yield result
+            return
+        pagenos = [i for i in range(self._count_pages(fstring)) if pages is None or i in pages]
+        chunks = [pagenos[i:i + self.chunksize] for i in range(0, len(pagenos), self.chunksize)]
+        pool = multiprocessing.Pool(min(workers, len(chunks)) or 1, initializer=_init_worker, initargs=(self, fstring))
         try:
-            f = six.BytesIO(fstring)
-            parser = PDFParser(f)
-            document = PDFDocument(parser)
-            if not document.is_extractable:
-                raise ReaderError('PDF text extraction not allowed')
-            rsrcmgr = PDFResourceManager()
-            laparams = LAParams()
-            device = PDFPageAggregator(rsrcmgr, laparams=laparams)
-            interpreter = PDFPageInterpreter(rsrcmgr, device)
-            elements = []
-            for page in PDFPage.create_pages(document):
-                interpreter.process_page(page)
-                layout = device.get_result()
-                elements.extend(self._process_layout(layout))
-            return Document(*elements)
+            for results in pool.imap(_layout_worker, chunks):
+                for result in results:
+                    yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def iter_pages(self, fstring):
+        """Yield a (page number, elements) tuple for each page of a PDF, as soon as the page has been laid out.
+
+        :param bytes fstring: The PDF file contents.
+        """
+        try:
+            for pageno, boxes in self._iter_layouts(fstring):
+                yield pageno, self._process_boxes(boxes)
+        except ReaderError:
+            raise
         except Exception as e:
             raise ReaderError(e)
 
+    def parse(self, fstring):
+        elements = []
+        for pageno, page_elements in self.iter_pages(fstring):
+            elements.extend(page_elements)
+        return Document(*elements)
+
 
 # Functions to determine captions from layout analysis
 #
@@ -60,6 +60,7 @@ class RscHtmlReader(HtmlReader):
         """"""
         if fname and not (fname.endswith('.html') or fname.endswith('.htm')):
             return False
-        if b'meta name="citation_doi" content="10.1039' in fstring:
+        prefix = self._detect_prefix(fstring)
+        if b'meta name="citation_doi" content="10.1039' in prefix:
             return True
         return False
@@ -11,13 +11,21 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
+import io
+import logging
 
+import six
+
+from ..errors import ReaderError
 from ..scrape.clean import clean
 from ..doc.table import Table, Cell
 from ..doc.text import Caption, Footnote
 from .markup import XmlReader
 
 
+log = logging.getLogger(__name__)
+
+
 # TODO: The below has only been tested with us-patent-grant-v42
 
 
@@ -52,7 +60,8 @@ class UsptoXmlReader(XmlReader):
         """"""
         if fname and not fname.lower().endswith('.xml'):
             return False
-        if b'us-patent-grant' in fstring:
+        prefix = self._detect_prefix(fstring)
+        if b'us-patent-grant' in prefix:
             return True
         # TODO: Other DTDs
         return False
@@ -153,3 +162,71 @@ class UsptoXmlReader(XmlReader):
 
     def _parse_table_footnotes(self, fns, refs, specials):
         return [self._parse_text(fn, refs=refs, specials=specials, element_cls=Footnote)[0] for fn in fns]
+
+
+class UsptoXmlBulkReader(object):
+    """Reader for USPTO bulk full-text files, which contain many concatenated XML documents.
+
+    Usage::
+
+        reader = UsptoXmlBulkReader()
+        with open('ipg050111.xml', 'rb') as f:
+            for index, doc in reader.read(f):
+                print(index, doc.titles)
+
+    Documents are split from the file incrementally and parsed one at a time as they are requested, so memory use is
+    bounded by the size of a single patent. The index of each document within the file is returned alongside it, so an
+    interrupted run can be resumed by passing ``start=last_index + 1``.
+    """
+
+    def __init__(self, reader=None):
+        """
+
+        :param reader: (Optional) The reader used to parse each document. Defaults to :class:`UsptoXmlReader`.
+        """
+        self.reader = reader if reader is not None else UsptoXmlReader()
+
+    def split(self, f, start=0, stop=None):
+        """Yield an (index, bytes) tuple for each XML document in a bulk file.
+
+        Documents before ``start`` are scanned past without being kept in memory.
+
+        :param file|string f: A file-like object opened in binary mode, or a path to a file.
+        :param int start: (Optional) Index of the first document to return.
+        :param int stop: (Optional) Index at which to stop. Defaults to the end of the file.
+        """
+        if isinstance(f, six.string_types):
+            with io.open(f, 'rb') as f:
+                for result in self.split(f, start=start, stop=stop):
+                    yield result
+            return
+        index = -1
+        lines = []
+        for line in f:
+            # Each document starts with an XML declaration
+            if line.startswith(b'<?xml') or (index == -1 and line.startswith(b'\xef\xbb\xbf<?xml')):
+                if lines:
+                    yield index, b''.join(lines)
+                    lines = []
+                index += 1
+                if stop is not None and index >= stop:
+                    return
+            if index >= start:
+                lines.append(line)
+        if lines:
+            yield index, b''.join(lines)
+
+    def read(self, f, start=0, stop=None):
+        """Yield an (index, Document) tuple for each document in a bulk file.
+
+        Documents that can't be read (e.g. an unsupported DTD) are logged and skipped.
+
+        :param file|string f: A file-like object opened in binary mode, or a path to a file.
+        :param int start: (Optional) Index of the first document to return.
+        :param int stop: (Optional) Index at which to stop. Defaults to the end of the file.
+        """
+        for index, fstring in self.split(f, start=start, stop=stop):
+            try:
+                yield index, self.reader.readstring(fstring)
+            except ReaderError as e:
+                log.warning('Unable to read document %s: %s', index, e)
@@ -28,11 +28,21 @@ INLINE_ELEMENTS = {
 }
 
 
+from ..utils import lazy_import
+# The clean function shares its name with its module, so it has to be imported before anything imports the module
 from .clean import Cleaner, clean, clean_html, clean_markup
-from .entity import Entity, EntityList, DocumentEntity
-from .fields import StringField, IntField, FloatField, BoolField, DateTimeField, EntityField, UrlField
-from .scraper import HtmlFormat, XmlFormat, GetRequester, PostRequester, UrlScraper, RssScraper, SearchScraper
-from .selector import Selector, SelectorList
-from .pub.nlm import NlmXmlDocument
-from .pub.rsc import RscHtmlDocument
-from .pub.springer import SpringerXmlDocument
+
+
+lazy_import(globals(), {
+    '.cache': ['ResponseCache', 'CacheAdapter', 'CacheMissError'],
+    '.entity': ['Entity', 'EntityList', 'DocumentEntity'],
+    '.frontier': ['CrawlFrontier', 'Crawler'],
+    '.fields': ['StringField', 'IntField', 'FloatField', 'BoolField', 'DateTimeField', 'EntityField', 'UrlField'],
+    '.scraper': ['HtmlFormat', 'XmlFormat', 'GetRequester', 'PostRequester', 'UrlScraper', 'RssScraper',
+                 'SearchScraper'],
+    '.runner': ['RateLimitAdapter', 'ScraperRunner', 'ScrapeResult'],
+    '.selector': ['Selector', 'SelectorList'],
+    '.pub.nlm': ['NlmXmlDocument'],
+    '.pub.rsc': ['RscHtmlDocument'],
+    '.pub.springer': ['SpringerXmlDocument'],
+})
@@ -27,15 +27,27 @@ class BaseScraper(six.with_metaclass(ABCMeta)):
     root = None
     #: Whether the root is an XPath expression instead of a CSS selector.
     root_xpath = False
+    #: A :class:`~chemdataextractor.scrape.cache.ResponseCache` to cache responses in, or None to not cache.
+    cache = None
 
-    def __init__(self):
-        """"""
+    def __init__(self, cache=None):
+        """
+
+        :param ResponseCache cache: (Optional) Cache responses in this cache, instead of the class default.
+        """
+        if cache is not None:
+            self.cache = cache
         # Create a HTTP session for all requests
         self.http = self.create_session()
 
     def create_session(self):
         """Override to set up default data (e.g. headers, authentication) on each request."""
         http = requests.Session()
+        if self.cache is not None:
+            from .cache import CacheAdapter
+            adapter = CacheAdapter(self.cache)
+            http.mount('http://', adapter)
+            http.mount('https://', adapter)
         return http
 
     def name(self):
@@ -51,6 +63,15 @@ class BaseScraper(six.with_metaclass(ABCMeta)):
         """Override to process each entity."""
         return entity
 
+    def expand(self, item, entities):
+        """Override to return the inputs that follow from an input, when crawling with a frontier.
+
+        :param item: The input, e.g. a URL, or a tuple of arguments to ``run``.
+        :param EntityList entities: The entities scraped from the input, or None if it was ignored.
+        :returns: A list of inputs.
+        """
+        return []
+
     @abstractmethod
     def make_request(self, url, data):
         """Make a HTTP request.
@@ -147,8 +168,25 @@ class EntityMeta(ABCMeta):
         cls = super(EntityMeta, mcs).__new__(mcs, name, bases, attrs)
         cls.fields = cls.fields.copy()
         cls.fields.update(fields)
+        cls._plan = mcs._compile_plan(cls)
         return cls
 
+    @staticmethod
+    def _compile_plan(cls):
+        """Return the steps to scrape each field of an Entity class.
+
+        Each step is the field name, the field, the names of the clean, process and finalize methods for the field, and
+        whether the field is scraped from the result of its selection alone, so it can share that result with other
+        fields that use the same expression. The methods are looked up on each scrape, so they may be added later.
+        """
+        default_scrape = six.get_unbound_function(BaseField.scrape)
+        plan = []
+        for field_name, field in six.iteritems(cls.fields):
+            methods = ['clean_%s' % field_name, 'process_%s' % field_name, 'finalize_%s' % field_name]
+            shared = six.get_unbound_function(type(field).scrape) is default_scrape
+            plan.append(tuple([field_name, field] + methods + [shared]))
+        return plan
+
 
 class BaseField(six.with_metaclass(ABCMeta)):
     """Base class for all fields."""
@@ -210,10 +248,21 @@ class BaseField(six.with_metaclass(ABCMeta)):
         log.debug('Scraped %s: %s from %s' % (self.name, value, self.selection))
         return value
 
+    @property
+    def selection_key(self):
+        """Key identifying the expression this field applies, so fields with the same expression can share the result."""
+        return (self.xpath, self.selection)
+
+    def select(self, selector):
+        """Apply the CSS or XPath expression for this field to the selector."""
+        return selector.xpath(self.selection) if self.xpath else selector.css(self.selection)
+
     def scrape(self, selector, cleaner=None, processor=None):
         """Scrape the value for this field from the selector."""
-        # Apply CSS or XPath expression to the selector
-        selected = selector.xpath(self.selection) if self.xpath else selector.css(self.selection)
+        return self.scrape_selected(self.select(selector), cleaner=cleaner, processor=processor)
+
+    def scrape_selected(self, selected, cleaner=None, processor=None):
+        """Scrape the value for this field from the result of applying its expression."""
         # Extract the value and apply regular expression if specified
         value = selected.re(self.re) if self.re else selected.extract(raw=self.raw, cleaner=cleaner)
         return self._post_scrape(value, processor=processor)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.scrape.cache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+On-disk cache of HTTP responses for scrapers.
+
+Usage::
+
+    scraper = RscLandingScraper(cache=ResponseCache('~/.cache/scrape', ttl=86400, max_size=500 * 1024 * 1024))
+
+Responses are returned from the cache until they are older than the TTL. Then they are revalidated with a conditional
+request, using the ETag or Last-Modified header they were served with, so unchanged pages aren't downloaded again.
+
+Requests with a ``Cache-Control: no-store`` header, such as those that start a new session, are always sent to the
+server, and their responses aren't cached.
+
+In offline mode, responses are always returned from the cache, however old, and requests for anything not in the cache
+fail with :class:`CacheMissError`. This allows scrapers to be developed against previously fetched pages.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from six.moves import cPickle as pickle
+
+from ..utils import ensure_dir, replace_file
+
+
+log = logging.getLogger(__name__)
+
+
+#: Responses with these status codes are cached.
+CACHEABLE_STATUSES = frozenset({200, 203, 300, 301, 302, 303, 307, 308, 404, 410})
+
+
+class CacheMissError(requests.ConnectionError):
+    """Raised in offline mode when a request isn't in the cache."""
+
+
+class ResponseCache(object):
+    """A directory of cached responses, with a file per response."""
+
+    #: Fraction of max_size that eviction reduces the cache to, so it isn't needed again for a while.
+    low_water = 0.9
+
+    def __init__(self, path, ttl=None, max_size=None, offline=False, methods=('GET', 'HEAD', 'POST')):
+        """
+
+        :param string path: The cache directory.
+        :param float ttl: (Optional) Seconds a response is used for before it is revalidated. Default is forever.
+        :param int max_size: (Optional) Maximum total size of the cache in bytes. When it is exceeded, the least
+                             recently used responses are removed until the cache is below :attr:`low_water` of it.
+                             Default is no limit.
+        :param bool offline: (Optional) Only return cached responses, and never make requests.
+        :param methods: (Optional) The HTTP methods to cache. POST is included because scrapers only use it for
+                        queries, such as searches.
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+        self.methods = frozenset(methods)
+        self._lock = threading.Lock()
+        self._size = None
+        ensure_dir(self.path)
+
+    def key(self, request):
+        """Return the cache key for a prepared request."""
+        body = request.body or b''
+        if not isinstance(body, bytes):
+            body = body.encode('utf8')
+        return hashlib.sha1(request.method.encode('utf8') + b' ' + request.url.encode('utf8') + b'\n' + body).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def get(self, key):
+        """Return the cache entry for a key, or None if there isn't one."""
+        path = self._entry_path(key)
+        try:
+            with io.open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (IOError, OSError):
+            return None
+        except Exception:
+            log.warning('Ignoring corrupt cache entry %s', path)
+            return None
+        # Record use for least recently used eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry
+
+    def set(self, key, entry):
+        """Store a cache entry, then evict old entries if the cache is too large."""
+        path = self._entry_path(key)
+        ensure_dir(os.path.dirname(path))
+        data = pickle.dumps(entry, protocol=2)
+        tmp_path = '%s.%s.tmp' % (path, threading.current_thread().ident)
+        with io.open(tmp_path, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            old_size = os.path.getsize(path) if os.path.isfile(path) else 0
+            replace_file(tmp_path, path)
+            if self._size is not None:
+                self._size += len(data) - old_size
+        if self.max_size is not None:
+            self.evict()
+
+    def _entries(self):
+        """Return a list of (last used time, size, path) for each cache entry."""
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(self.path):
+            for filename in filenames:
+                if not filename.endswith('.tmp'):
+                    path = os.path.join(dirpath, filename)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """Return the total size of the cache in bytes."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            return self._size
+
+    def evict(self):
+        """If the cache is larger than max_size, remove the least recently used entries until it is below low_water.
+
+        Finding the least recently used entries means listing the whole cache directory, so the cache is reduced below
+        max_size to leave room for new entries before this is needed again. Otherwise only the tracked size is checked.
+        """
+        if self.max_size is None or self.size() <= self.max_size:
+            return
+        with self._lock:
+            entries = sorted(self._entries())
+            self._size = sum(size for _, size, _ in entries)
+            for mtime, size, path in entries:
+                if self._size <= self.max_size * self.low_water:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                log.debug('Evicted %s from cache', path)
+                self._size -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            for _, _, path in self._entries():
+                os.remove(path)
+            self._size = 0
+
+    def is_fresh(self, entry):
+        """Return True if a cache entry can be used without revalidating it."""
+        return self.offline or self.ttl is None or time.time() - entry['time'] < self.ttl
+
+
+class CacheAdapter(HTTPAdapter):
+    """Transport adapter that returns responses from a :class:`ResponseCache`, and caches responses it receives.
+
+    Requests that aren't answered from the cache are sent with another adapter, so this can be combined with adapters
+    that add rate limits or retries.
+    """
+
+    def __init__(self, cache, adapter=None):
+        """
+
+        :param ResponseCache cache: The cache.
+        :param requests.adapters.BaseAdapter adapter: (Optional) The adapter to send requests with.
+        """
+        super(CacheAdapter, self).__init__()
+        self.cache = cache
+        self.adapter = adapter if adapter is not None else HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        if request.method not in self.cache.methods:
+            return self.adapter.send(request, **kwargs)
+        if 'no-store' in request.headers.get('Cache-Control', ''):
+            if self.cache.offline:
+                raise CacheMissError('%s %s can\'t be cached' % (request.method, request.url), request=request)
+            return self.adapter.send(request, **kwargs)
+        key = self.cache.key(request)
+        entry = self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            log.debug('Using cached response for %s', request.url)
+            return self._build_cached_response(request, entry)
+        if self.cache.offline:
+            raise CacheMissError('%s %s is not in the cache' % (request.method, request.url), request=request)
+        if entry is not None:
+            # Ask the server to only send the response if it has changed
+            headers = CaseInsensitiveDict(entry['headers'])
+            if headers.get('ETag'):
+                request.headers['If-None-Match'] = headers['ETag']
+            if headers.get('Last-Modified'):
+                request.headers['If-Modified-Since'] = headers['Last-Modified']
+        response = self.adapter.send(request, **kwargs)
+        if entry is not None and response.status_code == 304:
+            log.debug('Cached response for %s is still valid', request.url)
+            response.close()
+            headers.update(response.headers)
+            entry['headers'] = dict(headers)
+            entry['time'] = time.time()
+            self.cache.set(key, entry)
+            return self._build_cached_response(request, entry)
+        if response.status_code in CACHEABLE_STATUSES and 'no-store' not in response.headers.get('Cache-Control', ''):
+            self.cache.set(key, {
+                'url': response.url,
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': dict(response.headers),
+                'content': response.content,
+                'time': time.time(),
+            })
+        return response
+
+    def _build_cached_response(self, request, entry):
+        """Return a response from a cache entry."""
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = entry['url']
+        response._content = entry['content']
+        response._content_consumed = True
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
+
+    def close(self):
+        self.adapter.close()
+        super(CacheAdapter, self).close()
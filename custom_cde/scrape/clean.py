@@ -14,7 +14,7 @@ from __future__ import unicode_literals
 import copy
 import logging
 import re
-from lxml.etree import fromstring, tostring
+from lxml.etree import fromstring, tostring, XPath
 from lxml.html import fromstring as html_fromstring
 import six
 
@@ -24,6 +24,27 @@ from . import BLOCK_ELEMENTS
 log = logging.getLogger(__name__)
 
 
+#: Compiled XPaths, keyed by expression and namespaces.
+_compiled_xpaths = {}
+
+#: Whitespace that is collapsed: any run containing a newline, or a run of spaces and tabs other than a single space.
+_collapse_re = re.compile(r'\s*\n\s*|[ \t]{2,}|\t')
+
+
+def _collapse_match(match):
+    return '\n' if '\n' in match.group() else ' '
+
+
+def _needs_collapse(text):
+    """Quickly check whether a string contains any whitespace that would be collapsed."""
+    return '\n' in text or '  ' in text or '\t' in text
+
+
+def _collapse_whitespace(text):
+    """Collapse whitespace down to a single newline if it contains a newline, otherwise a single space."""
+    return _collapse_re.sub(_collapse_match, text)
+
+
 class Cleaner(object):
     """Clean HTML or XML by removing tags completely or replacing with their contents.
 
@@ -79,6 +100,15 @@ class Cleaner(object):
                 raise TypeError('Unknown parameter: %s=%r' % (name, value))
             setattr(self, name, value)
 
+    def _compile(self, xpath):
+        """Return a compiled XPath for an XPath expression, using the namespaces of this Cleaner."""
+        key = (xpath, tuple(sorted(self.namespaces.items())))
+        compiled = _compiled_xpaths.get(key)
+        if compiled is None:
+            compiled = XPath(xpath, namespaces=self.namespaces)
+            _compiled_xpaths[key] = compiled
+        return compiled
+
     def __call__(self, doc):
         """Clean the document."""
         if hasattr(doc, 'getroot'):
@@ -86,75 +116,74 @@ class Cleaner(object):
 
         if self.fix_whitespace:
             # Ensure newlines around block elements
-            for el in doc.iterdescendants():
-                if el.tag in BLOCK_ELEMENTS:
-                    el.tail = (el.tail or '') + '\n'
-                    previous = el.getprevious()
+            for el in doc.iterdescendants(*BLOCK_ELEMENTS):
+                el.tail = (el.tail or '') + '\n'
+                previous = el.getprevious()
+                if previous is None:
                     parent = el.getparent()
-                    if previous is None:
-                        parent.text = (parent.text or '') + '\n'
-                    else:
-                        previous.tail = (previous.tail or '') + '\n'
+                    parent.text = (parent.text or '') + '\n'
+                else:
+                    previous.tail = (previous.tail or '') + '\n'
 
         # Remove elements that match kill_xpath
         if self.kill_xpath:
-            for el in doc.xpath(self.kill_xpath, namespaces=self.namespaces):
+            for el in self._compile(self.kill_xpath)(doc):
                 #log.debug('Killing: %s' % tostring(el))
                 parent = el.getparent()
                 # We can't kill the root element!
                 if parent is None:
                     continue
-                if el.tail:
+                tail = el.tail
+                if tail:
                     previous = el.getprevious()
                     if previous is None:
-                        parent.text = (parent.text or '') + el.tail
+                        parent.text = (parent.text or '') + tail
                     else:
-                        previous.tail = (previous.tail or '') + el.tail
+                        previous.tail = (previous.tail or '') + tail
                 parent.remove(el)
 
-        # Collect all the allowed elements
-        to_keep = [el for el in doc.xpath(self.allow_xpath, namespaces=self.namespaces)] if self.allow_xpath else []
-
         # Replace elements that match strip_xpath with their contents
         if self.strip_xpath:
-            for el in doc.xpath(self.strip_xpath, namespaces=self.namespaces):
+            # Collect all the allowed elements
+            to_keep = set(self._compile(self.allow_xpath)(doc)) if self.allow_xpath else set()
+            for el in self._compile(self.strip_xpath)(doc):
                 # Skip if allowed by allow_xpath
                 if el in to_keep:
                     continue
                 parent = el.getparent()
-                previous = el.getprevious()
                 # We can't strip the root element!
                 if parent is None:
                     continue
+                previous = el.getprevious()
                 # Append the text to previous tail (or parent text if no previous), ensuring newline if block level
-                if el.text and isinstance(el.tag, six.string_types):
+                text = el.text
+                if text and isinstance(el.tag, six.string_types):
                     if previous is None:
-                        parent.text = (parent.text or '') + el.text
+                        parent.text = (parent.text or '') + text
                     else:
-                        previous.tail = (previous.tail or '') + el.text
+                        previous.tail = (previous.tail or '') + text
                 # Append the tail to last child tail, or previous tail, or parent text, ensuring newline if block level
-                if el.tail:
+                tail = el.tail
+                if tail:
                     if len(el):
                         last = el[-1]
-                        last.tail = (last.tail or '') + el.tail
+                        last.tail = (last.tail or '') + tail
                     elif previous is None:
-                        parent.text = (parent.text or '') + el.tail
+                        parent.text = (parent.text or '') + tail
                     else:
-                        previous.tail = (previous.tail or '') + el.tail
+                        previous.tail = (previous.tail or '') + tail
                 index = parent.index(el)
                 parent[index:index+1] = el[:]
 
         # Collapse whitespace down to a single space or a single newline
         if self.fix_whitespace:
             for el in doc.iter():
-                if el.text is not None:
-                    el.text = re.sub(r'\s*\n\s*', '\n', el.text)
-                    el.text = re.sub(r'[ \t]+', ' ', el.text)
-                    # el.text = re.sub(r'\s+', ' ', el.text)
-                if el.tail is not None:
-                    el.tail = re.sub(r'\s*\n\s*', '\n', el.tail)
-                    el.tail = re.sub(r'[ \t]+', ' ', el.tail)
-                    # el.tail = re.sub(r'\s+', ' ', el.tail)
+                text = el.text
+                if text is not None and _needs_collapse(text):
+                    el.text = _collapse_whitespace(text)
+                tail = el.tail
+                if tail is not None and _needs_collapse(tail):
+                    el.tail = _collapse_whitespace(tail)
 
     def clean_html(self, html):
         """Apply ``Cleaner`` to HTML string or document and return a cleaned string or document."""
@@ -44,6 +44,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
+from collections import OrderedDict
+import threading
 
 from cssselect import GenericTranslator, HTMLTranslator
 from cssselect.xpath import _unicode_safe_getattr, XPathExpr, ExpressionError
@@ -84,8 +86,34 @@ class CdeXPathExpr(XPathExpr):
         return self
 
 
+#: Maximum number of CSS selector translations to cache. The least recently used are discarded first.
+XPATH_CACHE_SIZE = 2048
+
+_xpath_cache = OrderedDict()
+_xpath_cache_lock = threading.Lock()
+
+
 class TranslatorMixin(object):
 
+    def css_to_xpath(self, css, prefix='descendant-or-self::'):
+        """Translate a CSS selector to an XPath expression.
+
+        Translations are cached, because scrapers use the same few selectors on every page and parsing them is slow.
+        """
+        key = (self.__class__, getattr(self, 'xhtml', None), css, prefix)
+        with _xpath_cache_lock:
+            xpath = _xpath_cache.pop(key, None)
+            if xpath is not None:
+                # Re-insert to mark as most recently used
+                _xpath_cache[key] = xpath
+                return xpath
+        xpath = super(TranslatorMixin, self).css_to_xpath(css, prefix)
+        with _xpath_cache_lock:
+            _xpath_cache[key] = xpath
+            while len(_xpath_cache) > XPATH_CACHE_SIZE:
+                _xpath_cache.popitem(last=False)
+        return xpath
+
     def xpath_element(self, selector):
         xpath = super(TranslatorMixin, self).xpath_element(selector)
         return CdeXPathExpr.from_xpath(xpath)
@@ -35,15 +35,24 @@ class Entity(six.with_metaclass(EntityMeta, BaseEntity)):
         :param Selector selector: The selector to scrape.
         """
         self._values = {}
-        # Iterate all defined fields
-        for field_name, field in six.iteritems(self.fields):
+        # Results of each expression, shared by fields that use the same one
+        selections = {}
+        # Iterate all defined fields, using the plan made when the class was defined
+        for field_name, field, clean_name, process_name, finalize_name, shared in self._plan:
             # Scrape field values from selector
-            cleaner = getattr(self, 'clean_%s' % field_name, None)
-            processor = getattr(self, 'process_%s' % field_name, None)
-            value = field.scrape(selector, cleaner=cleaner, processor=processor)
+            cleaner = getattr(self, clean_name, None)
+            processor = getattr(self, process_name, None)
+            if shared:
+                key = field.selection_key
+                if key not in selections:
+                    selections[key] = field.select(selector)
+                value = field.scrape_selected(selections[key], cleaner=cleaner, processor=processor)
+            else:
+                value = field.scrape(selector, cleaner=cleaner, processor=processor)
             # Finalize value using finalize_* method on scrape, if it exists
-            if hasattr(self, 'finalize_%s' % field_name):
-                value = getattr(self, 'finalize_%s' % field_name)(value)
+            finalizer = getattr(self, finalize_name, None)
+            if finalizer:
+                value = finalizer(value)
             log.debug('Assigning %s: %s' % (field_name, value))
             setattr(self, field_name, value)
 
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.scrape.frontier
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Persistent crawl frontier, for harvesting large result sets incrementally.
+
+Usage::
+
+    frontier = CrawlFrontier('rsc_search.sqlite')
+    crawler = Crawler(ScraperRunner(RscSearchScraper(), workers=4, per_host=2, delay=1), frontier)
+    for result in crawler.run(seeds=[('benzene', 1), ('toluene', 1)]):
+        print(result.input, result.error)
+    for item, entities in frontier.results():
+        ...
+
+Every input is recorded in an SQLite database along with its state, so each one is only scraped once. Following
+inputs, such as the next page of search results, are added as each input completes. The frontier is updated as each
+input completes, so a crawl that crashes or is stopped can be run again and continues from where it stopped, without
+scraping completed inputs again.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import logging
+import os
+import threading
+import time
+
+import six
+from six.moves.urllib.parse import urldefrag
+
+from ..utils import sqlite_connection
+
+
+log = logging.getLogger(__name__)
+
+
+#: Input is waiting to be scraped.
+PENDING = 'pending'
+#: Input has been claimed by a crawler, and is being scraped.
+RUNNING = 'running'
+#: Input has been scraped.
+DONE = 'done'
+#: Input failed to be scraped, too many times.
+FAILED = 'failed'
+
+
+def _encode(item):
+    """Return the JSON for an input. Tuples of arguments are stored as lists."""
+    return json.dumps(list(item) if isinstance(item, tuple) else item, ensure_ascii=False, separators=(',', ':'))
+
+
+def _decode(value):
+    """Return the input from its JSON."""
+    item = json.loads(value)
+    return tuple(item) if isinstance(item, list) else item
+
+
+def frontier_key(item):
+    """Return the key used to dedupe an input. URLs that only differ in their fragment are the same input."""
+    if isinstance(item, six.string_types):
+        item = urldefrag(item)[0]
+    return _encode(item)
+
+
+class CrawlFrontier(object):
+    """The inputs of a crawl and their states, stored in an SQLite database.
+
+    Inputs are URLs or queries, or tuples of arguments to a scraper's ``run`` method, such as ``(query, page)``. They
+    must be JSON serializable.
+    """
+
+    def __init__(self, path):
+        """
+
+        :param string path: Path to the database file.
+        """
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.path)
+
+    @property
+    def conn(self):
+        """The database connection. Connections are not shared with forked child processes."""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite_connection(self.path, [
+                'CREATE TABLE IF NOT EXISTS frontier (key TEXT PRIMARY KEY, item TEXT NOT NULL, status TEXT NOT NULL, '
+                'attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, added REAL NOT NULL, updated REAL)',
+                'CREATE INDEX IF NOT EXISTS frontier_status ON frontier (status, added)',
+            ])
+            self._pid = os.getpid()
+        return self._conn
+
+    def _add(self, items, now):
+        added = 0
+        for item in items:
+            cursor = self.conn.execute(
+                'INSERT OR IGNORE INTO frontier (key, item, status, added) VALUES (?, ?, ?, ?)',
+                (frontier_key(item), _encode(item), PENDING, now)
+            )
+            added += cursor.rowcount
+        return added
+
+    def add(self, items):
+        """Add inputs to the frontier, ignoring any that have been added before. Return the number added."""
+        with self._lock:
+            self.conn.execute('BEGIN')
+            try:
+                added = self._add(items, time.time())
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+        return added
+
+    def claim(self):
+        """Mark the oldest pending input as running, and return it. Return None if there are no pending inputs."""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT key, item FROM frontier WHERE status = ? ORDER BY added LIMIT 1', (PENDING,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                'UPDATE frontier SET status = ?, attempts = attempts + 1, updated = ? WHERE key = ?',
+                (RUNNING, time.time(), row[0])
+            )
+        return _decode(row[1])
+
+    def complete(self, item, result=None, follow=()):
+        """Mark an input as done, storing its result, and add the inputs that follow from it.
+
+        Both happen in one transaction, so a crash can't leave an input done without the inputs that follow it.
+
+        :param item: The input.
+        :param result: (Optional) JSON serializable result, e.g. the serialized entities.
+        :param follow: (Optional) Inputs to add, e.g. the next page of search results.
+        :returns: The number of new inputs added.
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.execute(
+                    'UPDATE frontier SET status = ?, result = ?, error = NULL, updated = ? WHERE key = ?',
+                    (DONE, json.dumps(result, ensure_ascii=False), now, frontier_key(item))
+                )
+                added = self._add(follow, now)
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+        return added
+
+    def fail(self, item, error, max_attempts=1):
+        """Record an error for an input. It is pending again if it has been attempted fewer than max_attempts times."""
+        with self._lock:
+            self.conn.execute(
+                'UPDATE frontier SET status = CASE WHEN attempts < ? THEN ? ELSE ? END, error = ?, updated = ? '
+                'WHERE key = ?',
+                (max_attempts, PENDING, FAILED, six.text_type(error), time.time(), frontier_key(item))
+            )
+
+    def requeue(self, failed=False):
+        """Mark running inputs as pending again, e.g. those left by a crawl that crashed. Return the number requeued.
+
+        :param bool failed: (Optional) Also requeue failed inputs, and reset their attempts.
+        """
+        with self._lock:
+            count = self.conn.execute(
+                'UPDATE frontier SET status = ? WHERE status = ?', (PENDING, RUNNING)
+            ).rowcount
+            if failed:
+                count += self.conn.execute(
+                    'UPDATE frontier SET status = ?, attempts = 0 WHERE status = ?', (PENDING, FAILED)
+                ).rowcount
+        return count
+
+    def status(self, item):
+        """Return the status of an input, or None if it isn't in the frontier."""
+        with self._lock:
+            row = self.conn.execute('SELECT status FROM frontier WHERE key = ?', (frontier_key(item),)).fetchone()
+        return row[0] if row else None
+
+    def counts(self):
+        """Return a dict of the number of inputs with each status."""
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        with self._lock:
+            counts.update(self.conn.execute('SELECT status, COUNT(*) FROM frontier GROUP BY status').fetchall())
+        return counts
+
+    def results(self):
+        """Yield (input, result) for each input that is done, in the order they were added."""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT item, result FROM frontier WHERE status = ? ORDER BY added, rowid', (DONE,)
+            ).fetchall()
+        for item, result in rows:
+            yield _decode(item), json.loads(result)
+
+    def errors(self):
+        """Yield (input, error) for each input that failed."""
+        with self._lock:
+            rows = self.conn.execute('SELECT item, error FROM frontier WHERE status = ?', (FAILED,)).fetchall()
+        for item, error in rows:
+            yield _decode(item), error
+
+    def close(self):
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM frontier').fetchone()[0]
+
+
+class Crawler(object):
+    """Run a :class:`~chemdataextractor.scrape.runner.ScraperRunner` on the inputs of a :class:`CrawlFrontier`.
+
+    As each input completes, its entities are stored in the frontier and the inputs that follow from it are added, as
+    returned by the scraper's ``expand`` method. Only one crawler should use a frontier at a time.
+    """
+
+    def __init__(self, runner, frontier, attempts=2, expand=None):
+        """
+
+        :param ScraperRunner runner: The runner to scrape inputs with.
+        :param CrawlFrontier frontier: The frontier.
+        :param int attempts: (Optional) Number of times to try each input before marking it as failed.
+        :param expand: (Optional) Function that takes an input and the EntityList scraped from it, and returns the
+                       inputs that follow from it. Defaults to the scraper's ``expand`` method.
+        """
+        self.runner = runner
+        self.frontier = frontier
+        self.attempts = attempts
+        self.expand = expand if expand is not None else runner.scraper.expand
+
+    def run(self, seeds=(), limit=None):
+        """Crawl until there are no pending inputs, and yield a ScrapeResult for each input as it completes.
+
+        Inputs left running by a crawl that stopped are scraped again.
+
+        :param seeds: (Optional) Inputs to add to the frontier before starting. Inputs already in the frontier, from
+                      an earlier crawl, are ignored.
+        :param int limit: (Optional) Maximum number of inputs to scrape in this run.
+        """
+        self.frontier.add(seeds)
+        requeued = self.frontier.requeue()
+        if requeued:
+            log.info('Resuming %s inputs that were running when the last crawl stopped', requeued)
+        cond = threading.Condition()
+        state = {'in_flight': 0, 'stopped': False}
+
+        def inputs():
+            # Inputs that follow from those in flight are added as they complete, so wait for them before finishing
+            claimed = 0
+            while limit is None or claimed < limit:
+                with cond:
+                    while True:
+                        if state['stopped']:
+                            return
+                        item = self.frontier.claim()
+                        if item is not None:
+                            state['in_flight'] += 1
+                            break
+                        if not state['in_flight']:
+                            return
+                        cond.wait()
+                claimed += 1
+                yield item
+
+        try:
+            for result in self.runner.run(inputs()):
+                if result.error is None:
+                    entities = result.entities
+                    follow = self.expand(result.input, entities) or ()
+                    self.frontier.complete(result.input, entities.serialize() if entities is not None else None,
+                                           follow)
+                else:
+                    self.frontier.fail(result.input, result.error, self.attempts)
+                with cond:
+                    state['in_flight'] -= 1
+                    cond.notify_all()
+                yield result
+        finally:
+            with cond:
+                state['stopped'] = True
+                cond.notify_all()
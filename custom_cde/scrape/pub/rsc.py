@@ -15,8 +15,9 @@ import logging
 import re
 
 from bs4 import UnicodeDammit
-from lxml.etree import fromstring
+from lxml.etree import ParserError, fromstring
 from lxml.html import HTMLParser, Element
+import requests
 import six
 
 from ...text.processors import Substitutor, Discard, Chain, LStrip, RStrip, LAdd
@@ -337,14 +338,43 @@ class RscSearchScraper(SearchScraper):
 
     entity = RscSearchDocument
     root = '.search_grey_box_middle_s4_jrnls'
+    page_size = 100
+    search_url = 'http://pubs.rsc.org/en/results'
+    results_url = 'http://pubs.rsc.org/en/search/journalresult'
+
+    def __init__(self, cache=None):
+        super(RscSearchScraper, self).__init__(cache=cache)
+        # Search session key for each query, so later pages of results don't need the search to be repeated
+        self._sessionkeys = {}
+
+    def run(self, query, page=1):
+        # A session key from an earlier search may have expired, which gives an error or no results, so search again
+        if query not in self._sessionkeys:
+            return super(RscSearchScraper, self).run(query, page)
+        try:
+            entities = super(RscSearchScraper, self).run(query, page)
+        except (requests.HTTPError, ParserError) as e:
+            log.debug('Error getting page %s of %s with an earlier session: %s', page, query, e)
+            entities = None
+        if not entities:
+            log.debug('Searching again for a new session for %s', query)
+            self._sessionkeys.pop(query, None)
+            entities = super(RscSearchScraper, self).run(query, page)
+        return entities
 
     def perform_search(self, query, page):
         log.debug('Processing query: %s' % query)
-        response = self.http.get('http://pubs.rsc.org/en/results', params={'searchtext': query, 'SortBy': 'Relevance', 'PageSize': 100})
-        selector = Selector.from_html(response)
-        sessionkey = selector.css('#SearchTerm::attr("value")').extract()[0]
-        searchdata = {'searchterm': sessionkey, 'resultcount': 100, 'category': 'journal', 'pageno': page}
-        response = self.http.post('http://pubs.rsc.org/en/search/journalresult', data=searchdata)
+        sessionkey = self._sessionkeys.get(query)
+        if sessionkey is None:
+            # Always start a new session, even with a response cache, as a cached session key may have expired
+            response = self.http.get(self.search_url, params={'searchtext': query, 'SortBy': 'Relevance', 'PageSize': self.page_size},
+                                     headers={'Cache-Control': 'no-store'})
+            selector = Selector.from_html(response)
+            sessionkey = selector.css('#SearchTerm::attr("value")').extract()[0]
+            self._sessionkeys[query] = sessionkey
+        searchdata = {'searchterm': sessionkey, 'resultcount': self.page_size, 'category': 'journal', 'pageno': page}
+        response = self.http.post(self.results_url, data=searchdata)
+        response.raise_for_status()
         return response
 
 
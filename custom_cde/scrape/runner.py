@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.scrape.runner
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Run a scraper on many URLs or queries concurrently, with per-host rate limits.
+
+Usage::
+
+    runner = ScraperRunner(RscLandingScraper(), workers=8, per_host=2, delay=0.5)
+    for result in runner.run(urls):
+        if result.error is None:
+            print(result.input, result.entities.serialize())
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import namedtuple
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from six.moves import queue
+from six.moves.urllib.parse import urlparse
+
+from .cache import CacheAdapter
+
+
+log = logging.getLogger(__name__)
+
+
+#: The outcome of running a scraper on one input. Entities is the EntityList returned by the scraper (or None if it
+#: ignored the input), and error is the exception raised if the input couldn't be scraped.
+ScrapeResult = namedtuple('ScrapeResult', ['input', 'entities', 'error'])
+
+#: HTTP status codes that are retried.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class _HostLimit(object):
+    """Limits the concurrent requests and request rate for a single host."""
+
+    def __init__(self, concurrency, delay):
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.next_start = 0
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        if self.delay:
+            # Reserve the next start time, then sleep until it without holding the lock
+            with self.lock:
+                start = max(time.time(), self.next_start)
+                self.next_start = start + self.delay
+            wait = start - time.time()
+            if wait > 0:
+                time.sleep(wait)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.semaphore.release()
+
+
+class RateLimitAdapter(HTTPAdapter):
+    """Transport adapter that limits requests to each host, and retries failed requests with exponential backoff.
+
+    Mount it on a :class:`requests.Session` to apply the limits to every request made with the session, from any
+    number of threads::
+
+        session.mount('http://', RateLimitAdapter(per_host=2, delay=1))
+        session.mount('https://', RateLimitAdapter(per_host=2, delay=1))
+
+    Connections are pooled, and ``pool_maxsize`` should be at least the number of threads using the session.
+    """
+
+    def __init__(self, per_host=2, delay=0, retries=3, backoff=0.5, timeout=30, pool_maxsize=10):
+        """
+
+        :param int per_host: (Optional) Maximum concurrent requests to each host.
+        :param float delay: (Optional) Minimum seconds between the starts of requests to each host.
+        :param int retries: (Optional) Number of times to retry connection errors, timeouts and 429 or 5xx responses.
+        :param float backoff: (Optional) Seconds to wait before the first retry, doubled for each retry after that.
+                              A Retry-After header in the response is used instead, if present.
+        :param float timeout: (Optional) Default seconds to wait for the server, if the request doesn't set one.
+        :param int pool_maxsize: (Optional) Maximum connections to keep open to each host.
+        """
+        super(RateLimitAdapter, self).__init__(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.per_host = per_host
+        self.delay = delay
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._limits = {}
+        self._limits_lock = threading.Lock()
+
+    def _limit(self, host):
+        """Return the limit for a host."""
+        with self._limits_lock:
+            if host not in self._limits:
+                self._limits[host] = _HostLimit(self.per_host, self.delay)
+            return self._limits[host]
+
+    def _retry_wait(self, attempt, response=None):
+        """Return the seconds to wait before a retry."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return int(retry_after)
+        return self.backoff * 2 ** attempt
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        limit = self._limit(urlparse(request.url).netloc)
+        attempt = 0
+        while True:
+            try:
+                with limit:
+                    response = super(RateLimitAdapter, self).send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                wait = self._retry_wait(attempt)
+                log.debug('Retrying %s in %ss after error: %s', request.url, wait, e)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                wait = self._retry_wait(attempt, response)
+                log.debug('Retrying %s in %ss after %s response', request.url, wait, response.status_code)
+                response.close()
+            time.sleep(wait)
+            attempt += 1
+
+
+_DONE = object()
+
+
+class ScraperRunner(object):
+    """Run a scraper on many inputs concurrently, yielding the results as they complete.
+
+    The scraper's HTTP session is given a :class:`RateLimitAdapter`, so every request it makes is subject to the
+    per-host limits, however the scraper makes it.
+    """
+
+    def __init__(self, scraper, workers=8, per_host=2, delay=0, retries=3, backoff=0.5, timeout=30):
+        """
+
+        :param scraper: The scraper to run, e.g. a :class:`~chemdataextractor.scrape.scraper.UrlScraper`.
+        :param int workers: (Optional) Number of inputs to scrape at once.
+        :param int per_host: (Optional) Maximum concurrent requests to each host.
+        :param float delay: (Optional) Minimum seconds between the starts of requests to each host.
+        :param int retries: (Optional) Number of times to retry failed requests.
+        :param float backoff: (Optional) Seconds to wait before the first retry, doubled for each retry after that.
+        :param float timeout: (Optional) Default seconds to wait for the server.
+        """
+        self.scraper = scraper
+        self.workers = workers
+        adapter = RateLimitAdapter(per_host=per_host, delay=delay, retries=retries, backoff=backoff, timeout=timeout,
+                                   pool_maxsize=max(workers, per_host))
+        for prefix in ('http://', 'https://'):
+            existing = scraper.http.get_adapter(prefix)
+            if isinstance(existing, CacheAdapter):
+                # Keep the cache in front, so cached responses don't count towards the limits
+                existing.adapter = adapter
+            else:
+                scraper.http.mount(prefix, adapter)
+
+    def scrape(self, item):
+        """Run the scraper on an input and return a :class:`ScrapeResult`.
+
+        :param item: The input, e.g. a URL or query, or a tuple of arguments to the scraper's ``run`` method.
+        """
+        args = item if isinstance(item, tuple) else (item,)
+        try:
+            return ScrapeResult(item, self.scraper.run(*args), None)
+        except Exception as e:
+            log.debug('Failed to scrape %s', item, exc_info=True)
+            return ScrapeResult(item, None, e)
+
+    def run(self, inputs):
+        """Run the scraper on each input, and yield a :class:`ScrapeResult` for each one as it completes.
+
+        Inputs are read as they are needed, so can be a generator of any length. Results are yielded in the order they
+        complete, which isn't necessarily the order of the inputs.
+
+        :param inputs: Iterable of inputs, e.g. URLs or queries, or tuples of arguments to the scraper's ``run`` method.
+        """
+        tasks = queue.Queue(maxsize=self.workers * 2)
+        results = queue.Queue()
+        stop = threading.Event()
+        errors = []
+
+        def feed():
+            try:
+                for item in inputs:
+                    if stop.is_set():
+                        break
+                    tasks.put(item)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                for _ in range(self.workers):
+                    tasks.put(_DONE)
+
+        def work():
+            while True:
+                item = tasks.get()
+                if item is _DONE:
+                    results.put(_DONE)
+                    return
+                if not stop.is_set():
+                    results.put(self.scrape(item))
+
+        threads = [threading.Thread(target=feed)] + [threading.Thread(target=work) for _ in range(self.workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        remaining = self.workers
+        try:
+            while remaining:
+                result = results.get()
+                if result is _DONE:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            # If the caller stops early, skip the remaining inputs
+            stop.set()
+        if errors:
+            raise errors[0]
@@ -104,6 +104,9 @@ class RssScraper(XmlFormat, UrlScraper):
 class SearchScraper(GetRequester, HtmlFormat, BaseScraper):
     """Scraper that takes a search query as input."""
 
+    #: Number of results on a full page, or None if unknown. Used to tell whether there are more pages.
+    page_size = None
+
     def process_query(self, query):
         """Override to filter or process input query prior to making request."""
         return query
@@ -113,6 +116,13 @@ class SearchScraper(GetRequester, HtmlFormat, BaseScraper):
         """Override to implement search. Take query input and return a response."""
         return
 
+    def expand(self, item, entities):
+        """Return the next page of results for a ``(query, page)`` input, if the page wasn't empty or short."""
+        query, page = item if isinstance(item, tuple) else (item, 1)
+        if not entities or (self.page_size is not None and len(entities) < self.page_size):
+            return []
+        return [(query, page + 1)]
+
     def run(self, query, page=1):
         query = self.process_query(query)
         if not query:
@@ -11,13 +11,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
-from collections import Sequence
+from collections import OrderedDict, Sequence
 from copy import deepcopy
 import logging
 import re
+import threading
 from bs4 import UnicodeDammit
 
-from lxml.etree import XMLParser, fromstring, tostring
+from lxml.etree import XMLParser, XPath, fromstring, tostring
 from lxml.html import HTMLParser
 import six
 
@@ -28,6 +29,37 @@ from .csstranslator import CssHTMLTranslator, CssXmlTranslator
 log = logging.getLogger(__name__)
 
 
+#: Maximum number of compiled XPath expressions to cache. The least recently used are discarded first.
+COMPILED_XPATH_CACHE_SIZE = 2048
+
+_compiled_xpath_cache = OrderedDict()
+_compiled_xpath_cache_lock = threading.Lock()
+
+
+def compile_xpath(query, namespaces):
+    """Return a compiled XPath expression, reusing an earlier compilation of the same query and namespaces.
+
+    :param string query: The XPath expression.
+    :param namespaces: The namespace prefixes used in the expression, as a dict or a frozenset of its items.
+    :rtype: lxml.etree.XPath
+    """
+    if isinstance(namespaces, dict):
+        namespaces = frozenset(namespaces.items())
+    key = (query, namespaces)
+    with _compiled_xpath_cache_lock:
+        compiled = _compiled_xpath_cache.pop(key, None)
+        if compiled is not None:
+            # Re-insert to mark as most recently used
+            _compiled_xpath_cache[key] = compiled
+            return compiled
+    compiled = XPath(query, namespaces=dict(namespaces), smart_strings=False)
+    with _compiled_xpath_cache_lock:
+        _compiled_xpath_cache[key] = compiled
+        while len(_compiled_xpath_cache) > COMPILED_XPATH_CACHE_SIZE:
+            _compiled_xpath_cache.popitem(last=False)
+    return compiled
+
+
 class Selector(object):
     """Tool for selecting content from HTML or XML using XPath selectors."""
 
@@ -45,9 +77,10 @@ class Selector(object):
         self.fmt = fmt
         self._root = root
         self._translator = translator() if type(translator) == type else translator
-        self.namespaces = dict(self._namespaces)
+        namespaces_dict = dict(self._namespaces)
         if namespaces is not None:
-            self.namespaces.update(namespaces)
+            namespaces_dict.update(namespaces)
+        self.namespaces = namespaces_dict
 
     def __eq__(self, other):
         if isinstance(other, Selector):
@@ -82,6 +115,22 @@ class Selector(object):
     def from_xml(cls, response, namespaces=None):
         return cls.from_response(response, parser=XMLParser, translator=CssXmlTranslator, fmt='xml', namespaces=namespaces)
 
+    @property
+    def namespaces(self):
+        """The namespace prefixes available in XPath queries, as a dict of prefix to URI.
+
+        The dict can be changed, or replaced by setting this attribute. Either way the new prefixes are used in the next
+        query.
+        """
+        # The caller may change the dict, so the key used to look up compiled queries is recomputed next time
+        self._namespaces_key = None
+        return self._namespaces_dict
+
+    @namespaces.setter
+    def namespaces(self, namespaces):
+        self._namespaces_dict = dict(namespaces)
+        self._namespaces_key = None
+
     @property
     def path(self):
         """Absolute path to the root of this selector."""
@@ -93,13 +142,25 @@ class Selector(object):
         return self._root.tag
 
     def xpath(self, query):
-        result = self._root.xpath(query, namespaces=self.namespaces, smart_strings=False)
+        if self._namespaces_key is None:
+            self._namespaces_key = frozenset(self._namespaces_dict.items())
+        result = compile_xpath(query, self._namespaces_key)(self._root)
         if type(result) is not list:
             result = [result]
         #log.debug('Selecting XPath: {}: {}'.format(query, result))
-        result = [self.__class__(root=x, fmt=self.fmt, translator=self._translator, namespaces=self.namespaces) for x in result]
+        result = [self._child(x) for x in result]
         return SelectorList(*result)
 
+    def _child(self, root):
+        """Return a selector for a result of this selector, sharing its settings."""
+        child = self.__class__.__new__(self.__class__)
+        child.fmt = self.fmt
+        child._root = root
+        child._translator = self._translator
+        child._namespaces_dict = dict(self._namespaces_dict)
+        child._namespaces_key = self._namespaces_key
+        return child
+
     def css(self, query):
         return self.xpath(self._translator.css_to_xpath(query))
 
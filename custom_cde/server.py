@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+chemdataextractor.server
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+A long-running extraction server, so documents can be processed without paying for interpreter startup, imports and
+model loading each time.
+
+Requests and responses are JSON objects, one per line. Each request contains a document, either as ``content`` (the
+text of the file, or base64 encoded bytes if ``base64`` is true) or as the ``path`` of a local file::
+
+    {"id": 1, "content": "<html>...</html>", "fname": "paper.html", "properties": ["mp"], "timeout": 30}
+
+The optional ``properties``, ``text``, ``captions`` and ``tables`` fields select the parsers used, as for
+:class:`~chemdataextractor.doc.profile.ExtractionProfile`. A response is written for each request as soon as it is
+complete, so responses can be out of order and are matched to requests by ``id``::
+
+    {"id": 1, "records": [{"names": ["benzene"], ...}]}
+    {"id": 2, "error": "Timed out after 30 seconds"}
+
+Requests are read from stdin with :func:`serve_stdin`, or posted to a local HTTP server with :func:`serve_http`.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import base64
+import functools
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+
+import six
+from six.moves import BaseHTTPServer, socketserver
+
+try:
+    from multiprocessing import SimpleQueue
+except ImportError:
+    from multiprocessing.queues import SimpleQueue
+
+
+log = logging.getLogger(__name__)
+
+
+class RequestTimeout(BaseException):
+    """Raised when a request takes longer than its timeout.
+
+    Like KeyboardInterrupt, this isn't an Exception, so code that handles errors while reading or parsing a document
+    doesn't catch it and carry on.
+    """
+
+
+def extract(request):
+    """Return the serialized records extracted from the document in a request.
+
+    :param dict request: The request.
+    :rtype: list[dict]
+    """
+    from .doc import Document, ExtractionProfile
+    profile = ExtractionProfile(
+        properties=request.get('properties'),
+        text=request.get('text', True),
+        captions=request.get('captions', True),
+        tables=request.get('tables', True)
+    )
+    if 'path' in request:
+        doc = Document.from_file(request['path'], fname=request.get('fname'))
+    elif 'content' in request:
+        content = request['content']
+        content = base64.b64decode(content) if request.get('base64') else content.encode('utf8')
+        doc = Document.from_string(content, fname=request.get('fname'))
+    else:
+        raise ValueError('Request must contain content or path')
+    return [record.serialize(primitive=True) for record in doc.extract_records(profile=profile, release=True)]
+
+
+def _raise_timeout(signum, frame):
+    raise RequestTimeout()
+
+
+def handle(request, handler=extract, timeout=None):
+    """Process a request and return the response as a line of JSON. Errors are returned as error responses.
+
+    The timeout is enforced with an alarm signal, so only applies on platforms that support it, when called in the main
+    thread of a process (as it is in worker processes).
+
+    :param dict request: The request.
+    :param handler: (Optional) Function that returns the records for a request.
+    :param float timeout: (Optional) Default timeout in seconds, if the request doesn't specify one.
+    :rtype: string
+    """
+    response = {'id': request.get('id')}
+    timeout = request.get('timeout', timeout)
+    alarm = False
+    try:
+        if timeout and hasattr(signal, 'setitimer'):
+            try:
+                previous = signal.signal(signal.SIGALRM, _raise_timeout)
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+                alarm = True
+            except ValueError:
+                log.debug('Not enforcing timeout outside main thread')
+        try:
+            response['records'] = handler(request)
+        finally:
+            if alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+    except RequestTimeout:
+        response['error'] = 'Timed out after %s seconds' % timeout
+    except Exception as e:
+        log.debug('Error processing request %s', response['id'], exc_info=True)
+        response['error'] = '%s: %s' % (type(e).__name__, e)
+    try:
+        return json.dumps(response, ensure_ascii=False)
+    except (TypeError, ValueError) as e:
+        return json.dumps({'id': response['id'], 'error': 'Could not serialize response: %s' % e}, ensure_ascii=False)
+
+
+#: Queue that worker processes put (task, pid, done) on when they start and finish each task.
+_started = None
+
+
+def _init_worker(started):
+    global _started
+    _started = started
+
+
+def _run_task(task, request, handler, timeout):
+    """Handle a request in a worker process, reporting which process is running it and when it is done."""
+    _started.put((task, os.getpid(), False))
+    line = handle(request, handler, timeout)
+    _started.put((task, os.getpid(), True))
+    return line
+
+
+class ExtractionServer(object):
+    """Process requests with a pool of worker processes.
+
+    Usage::
+
+        with ExtractionServer(workers=4, timeout=60) as server:
+            server.process(sys.stdin, lambda line: print(line))
+
+    At most ``max_pending`` requests are processed at once. When that many are pending, no more are read until one is
+    complete, so a client that sends requests faster than they can be processed is slowed down instead of requests
+    building up in memory.
+
+    If a worker process dies while processing a request, e.g. because it ran out of memory or crashed in a C
+    extension, an error response is written for that request and the pool starts a new worker in its place.
+    """
+
+    #: Seconds between checks for worker processes that have died.
+    check_interval = 0.5
+
+    def __init__(self, workers=None, max_pending=None, timeout=None, warmup=True, handler=extract):
+        """
+
+        :param int workers: (Optional) Number of worker processes. Defaults to the number of CPUs. If 0, requests are
+                            processed in the calling thread.
+        :param int max_pending: (Optional) Maximum number of requests processed at once. Defaults to twice the number
+                                of workers.
+        :param float timeout: (Optional) Default timeout for each request, in seconds.
+        :param bool warmup: (Optional) Load models and build parsers before starting the workers, so they share them.
+        :param handler: (Optional) Module-level function that returns the records for a request.
+        """
+        self.workers = workers if workers is not None else multiprocessing.cpu_count()
+        self.max_pending = max_pending if max_pending is not None else max(1, self.workers * 2)
+        self.timeout = timeout
+        self.warmup = warmup
+        self.handler = handler
+        self._pool = None
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._task_ids = itertools.count()
+        #: The request ID and respond function of each task sent to the pool that has no response yet, by task ID.
+        self._tasks = {}
+        #: The worker process running each started task, and whether it has finished, by task ID.
+        self._running = {}
+        #: Tasks whose worker finished them and then died, which are lost if no result arrives by the next check.
+        self._finished_lost = set()
+        #: Whether any task was lost, so the pool will never return its result.
+        self._lost = False
+        self._started = None
+        self._watchdog = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Load models and start the worker processes."""
+        if self.warmup:
+            from .preload import warmup
+            results = warmup(freeze=True)
+            log.info('Loaded %s models and parsers in %.2fs', len(results), sum(r.seconds for r in results))
+        if self.workers:
+            self._started = SimpleQueue()
+            self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(self._started,))
+            self._stopping.clear()
+            self._watchdog = threading.Thread(target=self._watch)
+            self._watchdog.daemon = True
+            self._watchdog.start()
+        return self
+
+    def close(self):
+        """Wait for pending requests, then stop the worker processes."""
+        if self._pool is not None:
+            self._pool.close()
+            with self._lock:
+                while self._tasks:
+                    self._idle.wait(self.check_interval)
+                lost = self._lost
+            if lost:
+                # The pool waits forever for the results of lost tasks, so stop it without waiting
+                self._pool.terminate()
+            self._pool.join()
+            self._stop()
+
+    def terminate(self):
+        """Stop the worker processes immediately."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._stop()
+
+    def _stop(self):
+        self._stopping.set()
+        self._watchdog.join()
+        self._watchdog = None
+        self._pool = None
+        self._started = None
+        self._lost = False
+
+    def _watch(self):
+        """Check for dead worker processes until the pool is stopped."""
+        while not self._stopping.wait(self.check_interval):
+            self._check_workers()
+
+    def _check_workers(self):
+        """Write an error response for each started task whose worker process is no longer alive.
+
+        The pool replaces workers that die, but never returns a result for the task they were running. A task that was
+        finished just before its worker died may still have its result on the way, so it is given until the next check.
+        """
+        while not self._started.empty():
+            task, pid, done = self._started.get()
+            with self._lock:
+                if task in self._tasks:
+                    self._running[task] = (pid, done)
+        # Pool workers are child processes, and a worker has started before it can report a task
+        alive = set(p.pid for p in multiprocessing.active_children())
+        with self._lock:
+            lost = [task for task in self._finished_lost if task in self._tasks]
+            self._finished_lost = set()
+            for task, (pid, done) in list(self._running.items()):
+                if pid not in alive:
+                    if done:
+                        self._finished_lost.add(task)
+                    else:
+                        lost.append(task)
+                    del self._running[task]
+        for task in lost:
+            self._resolve(task, error='Worker process died', lost=True)
+
+    def _resolve(self, task, line=None, error=None, lost=False):
+        """Write the response for a task, unless it has already been written."""
+        with self._lock:
+            entry = self._tasks.pop(task, None)
+            self._running.pop(task, None)
+            if lost and entry is not None:
+                self._lost = True
+            self._idle.notify_all()
+        # A task whose worker died just after returning its result may already have been responded to
+        if entry is None:
+            return
+        request_id, respond = entry
+        if error is not None:
+            if lost:
+                log.error('Worker process died while processing request %s', request_id)
+            line = json.dumps({'id': request_id, 'error': error}, ensure_ascii=False)
+        respond(line)
+
+    def _complete(self, task, line):
+        """Write the response for a task that the pool has returned."""
+        self._resolve(task, line)
+
+    def _fail(self, task, e):
+        """Write an error response for a task the pool couldn't run, e.g. because its request couldn't be pickled."""
+        log.error('Error sending request to worker: %s', e)
+        self._resolve(task, error='%s: %s' % (type(e).__name__, e))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def process(self, lines, write):
+        """Process each request in lines, and call write with each response once it is complete.
+
+        Returns once all the requests have been processed. Responses are written from a different thread, but never more
+        than one at once.
+
+        :param lines: Iterable of request lines.
+        :param write: Function called with each response line, without a trailing newline.
+        :returns: The number of requests processed.
+        :rtype: int
+        """
+        lock = threading.Lock()
+        done = threading.Condition(lock)
+        state = {'pending': 0}
+
+        def respond(line):
+            with lock:
+                try:
+                    write(line)
+                except Exception:
+                    log.exception('Error writing response')
+                state['pending'] -= 1
+                done.notify_all()
+            self._pending.release()
+
+        count = 0
+        lines = iter(lines)
+        while True:
+            # Wait for a free slot before reading the next request, so unread requests stay with the client
+            self._pending.acquire()
+            line = next(lines, None)
+            if line is None:
+                self._pending.release()
+                break
+            if isinstance(line, bytes):
+                line = line.decode('utf8')
+            if not line.strip():
+                self._pending.release()
+                continue
+            count += 1
+            with lock:
+                state['pending'] += 1
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('Request must be a JSON object')
+            except ValueError as e:
+                respond(json.dumps({'id': None, 'error': 'Invalid request: %s' % e}))
+                continue
+            if self._pool is None:
+                respond(handle(request, self.handler, self.timeout))
+            else:
+                task = next(self._task_ids)
+                with self._lock:
+                    self._tasks[task] = (request.get('id'), respond)
+                kwargs = {'callback': functools.partial(self._complete, task)}
+                if six.PY3:
+                    # Otherwise a request that can't be sent to a worker never gets a response, and holds its slot
+                    kwargs['error_callback'] = functools.partial(self._fail, task)
+                self._pool.apply_async(_run_task, (task, request, self.handler, self.timeout), **kwargs)
+        with lock:
+            while state['pending']:
+                done.wait()
+        return count
+
+
+def serve_stdin(server, stdin, stdout):
+    """Process requests from stdin until it is closed, writing responses to stdout.
+
+    :param ExtractionServer server: The started server.
+    :param stdin: Binary or text stream to read requests from.
+    :param stdout: Text stream to write responses to.
+    """
+    def write(line):
+        stdout.write(line)
+        stdout.write('\n')
+        stdout.flush()
+    return server.process(_readlines(stdin), write)
+
+
+def _readlines(f):
+    """Yield lines from a file as soon as each is available, without reading ahead like file iteration in Python 2."""
+    while True:
+        line = f.readline()
+        if not line:
+            return
+        yield line
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def serve_http(server, host='127.0.0.1', port=8080):
+    """Process requests posted to a HTTP server until interrupted.
+
+    See :func:`make_http_server` for details.
+
+    :param ExtractionServer server: The started server.
+    :param string host: (Optional) The interface to listen on. Defaults to localhost only.
+    :param int port: (Optional) The port to listen on.
+    """
+    httpd = make_http_server(server, host, port)
+    log.info('Listening on http://%s:%s', host, httpd.server_address[1])
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+
+def make_http_server(server, host='127.0.0.1', port=8080):
+    """Return a HTTP server that processes posted requests.
+
+    Each POST request body contains one or more request lines, and the response body streams the response lines as
+    they are completed. Requests from all connections share the server's worker pool and pending request limit.
+
+    :param ExtractionServer server: The started server.
+    :param string host: (Optional) The interface to listen on. Defaults to localhost only.
+    :param int port: (Optional) The port to listen on, or 0 for any free port.
+    """
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.end_headers()
+            self.wfile.write(b'ok\n')
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+
+            def write(line):
+                self.wfile.write(line.encode('utf8') + b'\n')
+                self.wfile.flush()
+            server.process(body.splitlines(), write)
+
+        def log_message(self, format, *args):
+            log.debug(format, *args)
+
+    return _ThreadingHTTPServer((host, port), Handler)
@@ -11,10 +11,12 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
+import codecs
+import hashlib
 import re
 import unicodedata
 
-from bs4 import UnicodeDammit
+import six
 
 
 #: Control characters.
@@ -218,15 +220,82 @@ ISSN_RE = re.compile(r'^\d{4}-\d{3}[\dX]$', re.U)
 CONTROL_RE = re.compile('[^\u0020-\uD7FF\u0009\u000A\u000D\uE000-\uFFFD\u10000-\u10FFFF]+')
 
 
+#: Number of bytes at the start of the input used to detect the encoding, if it isn't declared.
+ENCODING_SAMPLE_BYTES = 65536
+
+#: Byte order marks, in the order they should be checked.
+BOMS = [
+    (codecs.BOM_UTF32_BE, 'utf-32be'),
+    (codecs.BOM_UTF32_LE, 'utf-32le'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_BE, 'utf-16be'),
+    (codecs.BOM_UTF16_LE, 'utf-16le'),
+]
+
+XML_DECLARATION_RE = re.compile(br'^\s*<\?xml[^>]*?encoding\s*=\s*["\']([\w.:-]+)["\']')
+META_CHARSET_RE = re.compile(br'<\s*meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+#: The most recent get_encoding call, keyed by a digest of the input rather than the input itself so it isn't kept in
+#: memory, so repeated calls for the same input (e.g. by multiple readers) don't detect the encoding again.
+_last_encoding = None
+
+
+def _decodes(input_string, encoding):
+    """Return True if the byte string can be decoded with the encoding."""
+    try:
+        input_string.decode(encoding)
+        return True
+    except (LookupError, UnicodeDecodeError):
+        return False
+
+
+def _detect_encoding(input_string, guesses, is_html):
+    # Imported here as bs4 is slow to import and only needed for byte strings
+    from bs4 import UnicodeDammit
+    prefix = input_string[:ENCODING_SAMPLE_BYTES]
+    candidates = list(guesses)
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            candidates.append(encoding)
+            break
+    declared = XML_DECLARATION_RE.search(prefix) or META_CHARSET_RE.search(prefix)
+    if declared:
+        candidates.append(declared.group(1).decode('ascii').lower())
+    # Fall back to statistical detection, but only on a sample of the input
+    candidates.append(UnicodeDammit(prefix, is_html=is_html).original_encoding)
+    candidates.extend(['utf-8', 'windows-1252'])
+    for encoding in candidates:
+        if encoding and _decodes(input_string, encoding):
+            return encoding
+    # The sample was misleading, so analyze the whole input
+    return UnicodeDammit(input_string, override_encodings=list(guesses), is_html=is_html).original_encoding
+
+
 def get_encoding(input_string, guesses=None, is_html=False):
-    """Return the encoding of a byte string. Uses bs4 UnicodeDammit.
+    """Return the encoding of a byte string.
+
+    A byte order mark, XML declaration or ``<meta charset>`` near the start is used if present. Otherwise the encoding
+    is detected using bs4 UnicodeDammit on the first ``ENCODING_SAMPLE_BYTES`` bytes. Either way, the encoding is only
+    returned if the whole input can be decoded with it.
 
     :param string input_string: Encoded byte string.
-    :param list[string] guesses: (Optional) List of encoding guesses to prioritize.
+    :param list[string] guesses: (Optional) Encoding guess, or list of guesses, to prioritize.
     :param bool is_html: Whether the input is HTML.
     """
-    converted = UnicodeDammit(input_string, override_encodings=[guesses] if guesses else [], is_html=is_html)
-    return converted.original_encoding
+    global _last_encoding
+    if isinstance(guesses, six.string_types):
+        guesses = (guesses,)
+    guesses = tuple(guesses or ())
+    if not isinstance(input_string, six.binary_type):
+        # Already decoded
+        return None
+    key = (hashlib.sha1(input_string).digest(), guesses, is_html)
+    last = _last_encoding
+    if last is not None and last[0] == key:
+        return last[1]
+    encoding = _detect_encoding(input_string, guesses, is_html)
+    _last_encoding = (key, encoding)
+    return encoding
 
 
 def levenshtein(s1, s2, allow_substring=False):
@@ -13,8 +13,10 @@ from __future__ import print_function
 from __future__ import unicode_literals
 import errno
 import functools
+import importlib
 import logging
 import os
+import sys
 
 import six
 
@@ -34,6 +36,57 @@ def memoized_property(fget):
     return property(fget_memoized)
 
 
+class lazy_class_attribute(object):
+    """Decorator to create class attributes that are computed the first time they are accessed.
+
+    The function is called with the class it is defined on, and the result replaces it as a plain class attribute, so it
+    is shared by all instances and subclasses and can be overridden in the usual way.
+    """
+
+    def __init__(self, fget):
+        self.fget = fget
+        self.__name__ = fget.__name__
+        self.__doc__ = fget.__doc__
+
+    def __get__(self, instance, owner):
+        # Find the class the attribute was defined on, in case it is first accessed through a subclass
+        cls = next(c for c in owner.__mro__ if c.__dict__.get(self.__name__) is self)
+        value = self.fget(cls)
+        setattr(cls, self.__name__, value)
+        return value
+
+
+def lazy_import(namespace, modules):
+    """Make names from a package's submodules available in the package, importing each module on first access.
+
+    This uses a module ``__getattr__`` function, so Python versions before 3.7 import everything immediately instead.
+
+    :param dict namespace: The ``globals()`` of the package's ``__init__`` module.
+    :param dict modules: Map of module name, relative to the package, to the names to import from it.
+    """
+    package = namespace['__name__']
+    sources = {name: module for module, names in modules.items() for name in names}
+
+    def __getattr__(name):
+        if name not in sources:
+            raise AttributeError('module %r has no attribute %r' % (package, name))
+        value = getattr(importlib.import_module(sources[name], package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(sources))
+
+    if sys.version_info >= (3, 7):
+        namespace['__getattr__'] = __getattr__
+        namespace['__dir__'] = __dir__
+        # Star imports look names up in __all__, so they still import everything
+        namespace['__all__'] = sorted(set(n for n in namespace if not n.startswith('_')) | set(sources))
+    else:
+        for name in sources:
+            __getattr__(name)
+
+
 def memoize(obj):
     """Decorator to create memoized functions, methods or classes."""
     cache = obj.cache = {}
@@ -95,3 +148,35 @@ def ensure_dir(path):
     except OSError as e:
         if e.errno != errno.EEXIST:
             raise
+
+
+def replace_file(src, dst):
+    """Move src to dst, replacing dst if it exists. Atomic where the platform supports it."""
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        # Python 2 has no os.replace
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def sqlite_connection(path, schema=()):
+    """Open an SQLite database that is shared between threads and processes, creating it if needed.
+
+    The connection is in autocommit mode, with write-ahead logging so readers don't block writers. It can be used from
+    any thread, but not by two threads at once, so callers must hold a lock while using it. It must not be used in a
+    forked child process, which should open its own connection.
+
+    :param string path: Path to the database file.
+    :param schema: (Optional) SQL statements to run when opening, e.g. ``CREATE TABLE IF NOT EXISTS`` statements.
+    :rtype: sqlite3.Connection
+    """
+    import sqlite3
+    ensure_dir(os.path.dirname(os.path.abspath(path)))
+    conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    for statement in schema:
+        conn.execute(statement)
+    return conn
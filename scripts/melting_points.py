@@ -29,8 +29,7 @@ from rdkit.Chem import rdMolDescriptors
 import six
 
 from chemdataextractor import Document
-from chemdataextractor.doc import Paragraph, Table
-from chemdataextractor.parse import ChemicalLabelParser, CompoundParser, MpParser
+from chemdataextractor.doc import ExtractionProfile
 from chemdataextractor.text import HYPHENS, MINUSES
 from chemdataextractor.text.normalize import excess_normalize
 
@@ -39,8 +38,7 @@ log = logging.getLogger(__name__)
 
 def extract():
     """Extract melting points from patents."""
-    Paragraph.parsers = [CompoundParser(), ChemicalLabelParser(), MpParser()]
-    Table.parsers = []
+    profile = ExtractionProfile(properties=['mp'], tables=False, base_parsers=['CompoundParser', 'ChemicalLabelParser'])
     patents = []
     for root, dirs, files in os.walk('../examples/mp/grants'):
         for filename in files:
@@ -59,7 +57,7 @@ def extract():
             d = Document.from_file(f)
         if os.path.isfile('../examples/mp/results/%s.json' % filename):
             continue
-        records = [r.serialize() for r in d.records if len(r.melting_points) == 1]
+        records = [r.serialize() for r in d.extract_records(profile=profile) if len(r.melting_points) == 1]
         with open('../examples/mp/results/%s.json' % filename, 'w') as fout:
             fout.write(json.dumps(records, ensure_ascii=False, indent=2).encode('utf8'))
 
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+startup_benchmark
+~~~~~~~~~~~~~~~~~
+
+Measure how long it takes to import ChemDataExtractor and start the command line interface.
+
+Each statement is run in a fresh Python process, so nothing is already imported, and the median and fastest of several
+runs are reported. Usage::
+
+    python startup_benchmark.py --repeat 10
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import argparse
+import subprocess
+import sys
+
+
+#: Statements to time, with a description of each.
+STATEMENTS = [
+    ('import chemdataextractor', 'import chemdataextractor'),
+    ('import Document', 'from chemdataextractor import Document; Document'),
+    ('import cli', 'from chemdataextractor.cli import cli'),
+    ('cde config list', 'from chemdataextractor.cli import cli; cli(["config", "list"], standalone_mode=False)'),
+    ('build Paragraph parsers', 'from chemdataextractor.doc import Paragraph; Paragraph.parsers'),
+    ('build Table parsers', 'from chemdataextractor.doc import Table; Table.parsers'),
+]
+
+TIMER = '''
+import time
+start = time.time()
+%s
+end = time.time()
+import sys
+sys.stderr.write('%%r\\n' %% (end - start))
+'''
+
+
+def time_statement(statement):
+    """Return the time in seconds taken to run a statement in a new Python process."""
+    proc = subprocess.Popen([sys.executable, '-c', TIMER % statement], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(err.decode('utf8'))
+    return float(err.decode('utf8').strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure ChemDataExtractor import and startup times.')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='Number of runs for each statement.')
+    args = parser.parse_args()
+    print('%-26s %10s %10s' % ('', 'median (s)', 'min (s)'))
+    for name, statement in STATEMENTS:
+        times = sorted(time_statement(statement) for _ in range(args.repeat))
+        print('%-26s %10.3f %10.3f' % (name, times[len(times) // 2], times[0]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+stubserver
+~~~~~~~~~~
+
+A local HTTP server for tests that make requests, so they don't depend on the network.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import threading
+
+from six.moves import BaseHTTPServer, socketserver
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """HTTP server that handles each request in a daemon thread, so tests can make concurrent requests."""
+    daemon_threads = True
+
+
+class StubServer(object):
+    """A local HTTP server on a free port, running in a background thread until closed.
+
+    Subclasses implement :meth:`respond`, which is called with the request handler for each GET, HEAD and POST request.
+    """
+
+    def __init__(self):
+        server = self
+
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                server.respond(self)
+
+            def do_HEAD(self):
+                server.respond(self)
+
+            def do_POST(self):
+                server.respond(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self.root = 'http://127.0.0.1:%s/' % self.port
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def respond(self, handler):
+        """Respond to a request."""
+        raise NotImplementedError
+
+    def send(self, handler, status, body=b'', headers=None):
+        """Send a response with a Content-Length, and the body unless the request is HEAD."""
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        if body and handler.command != 'HEAD':
+            handler.wfile.write(body)
+
+    def url(self, path, host='127.0.0.1'):
+        return 'http://%s:%s/%s' % (host, self.port, path)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+test_data
+~~~~~~~~~
+
+Test downloading data packages.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from chemdataextractor.data import Package, download_packages, file_sha256, make_manifest
+from chemdataextractor.errors import DownloadError
+
+from stubserver import StubServer
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class DataServer(StubServer):
+    """A local stand-in for the data server, which serves files from a dict and supports range requests.
+
+    Paths in ``statuses`` get that status instead, and ``range_offset`` is added to the start of the ranges sent.
+    """
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+        self.statuses = {}
+        self.range_offset = 0
+        super(DataServer, self).__init__()
+
+    def respond(self, handler):
+        path = handler.path.lstrip('/')
+        self.requests.append((handler.command, path, handler.headers.get('Range')))
+        content = self.files.get(path)
+        status = self.statuses.get(path, 200 if content is not None else 404)
+        if status != 200:
+            return self.send(handler, status)
+        headers = {'ETag': self.etag(path)}
+        m = re.match(r'bytes=(\d+)-$', handler.headers.get('Range') or '')
+        if m and handler.headers.get('If-Range', headers['ETag']) == headers['ETag']:
+            start = int(m.group(1))
+            if start >= len(content):
+                return self.send(handler, 416)
+            status = 206
+            start = min(start + self.range_offset, len(content))
+            headers['Content-Range'] = 'bytes %s-%s/%s' % (start, len(content) - 1, len(content))
+            content = content[start:]
+        self.send(handler, status, content, headers)
+
+    def set_manifest(self, checksums=None):
+        manifest = {}
+        for path, content in self.files.items():
+            if path != 'manifest.json':
+                sha256 = (checksums or {}).get(path, hashlib.sha256(content).hexdigest())
+                manifest[path] = {'sha256': sha256, 'size': len(content)}
+        self.files['manifest.json'] = json.dumps(manifest).encode('utf8')
+
+    def etag(self, path):
+        return '"%s"' % hashlib.md5(self.files[path]).hexdigest()
+
+    def file_requests(self, path):
+        return [r for r in self.requests if r[1] == path]
+
+
+class TestDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.files = {
+            'models/a-1.0.pickle': b'a' * 5000,
+            'models/b-1.0.pickle': os.urandom(3 * 1024 * 1024 + 17),
+            'models/c-1.0.pickle': b'',
+        }
+        self.server = DataServer(dict(self.files))
+        self.server.set_manifest()
+        self.packages = [Package(path, root=self.server.root, data_dir=self.data_dir) for path in sorted(self.files)]
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.data_dir)
+
+    def read(self, path):
+        with io.open(os.path.join(self.data_dir, path), 'rb') as f:
+            return f.read()
+
+    def write_part(self, path, content, validator=None):
+        """Write a partial download, as if it had been interrupted."""
+        part_path = os.path.join(self.data_dir, path + '.part')
+        if not os.path.isdir(os.path.dirname(part_path)):
+            os.makedirs(os.path.dirname(part_path))
+        with io.open(part_path, 'wb') as f:
+            f.write(content)
+        if validator is not None:
+            with io.open(part_path + '.validator', 'w', encoding='utf8') as f:
+                f.write(validator)
+        return part_path
+
+    def test_download(self):
+        """Test packages are downloaded, and then skipped if their checksums match."""
+        results = download_packages(self.packages, workers=3)
+        self.assertEqual([r.downloaded for r in results], [True, True, True])
+        self.assertEqual([r.error for r in results], [None, None, None])
+        for path, content in self.files.items():
+            self.assertEqual(self.read(path), content)
+            self.assertFalse(os.path.exists(os.path.join(self.data_dir, path + '.part')))
+        results = download_packages(self.packages)
+        self.assertEqual([r.downloaded for r in results], [False, False, False])
+        self.assertEqual(len(self.server.file_requests('models/b-1.0.pickle')), 1)
+
+    def test_changed(self):
+        """Test a package is downloaded again if its checksum doesn't match, even with the same size."""
+        download_packages(self.packages)
+        self.server.files['models/a-1.0.pickle'] = b'b' * 5000
+        self.server.set_manifest()
+        results = download_packages(self.packages)
+        self.assertEqual([r.downloaded for r in results], [True, False, False])
+        self.assertEqual(self.read('models/a-1.0.pickle'), b'b' * 5000)
+
+    def test_resume(self):
+        """Test an interrupted download is resumed with a range request."""
+        path = 'models/b-1.0.pickle'
+        part_path = self.write_part(path, self.files[path][:1000000], self.server.etag(path))
+        self.assertTrue(self.packages[1].download(sha256=hashlib.sha256(self.files[path]).hexdigest()))
+        self.assertEqual(self.read(path), self.files[path])
+        self.assertEqual(self.server.file_requests(path), [('GET', path, 'bytes=1000000-')])
+        self.assertFalse(os.path.exists(part_path))
+        self.assertFalse(os.path.exists(part_path + '.validator'))
+
+    def test_resume_changed(self):
+        """Test a partial file is discarded if the remote file has changed since it was downloaded."""
+        path = 'models/a-1.0.pickle'
+        self.write_part(path, b'b' * 1000, self.server.etag(path))
+        self.server.files[path] = b'b' * 100 + b'c' * 4900
+        self.assertTrue(self.packages[0].download())
+        self.assertEqual(self.read(path), self.server.files[path])
+        self.assertEqual(self.server.file_requests(path), [('GET', path, 'bytes=1000-')])
+
+    def test_resume_no_validator(self):
+        """Test a partial file without a recorded ETag or Last-Modified date isn't resumed."""
+        path = 'models/a-1.0.pickle'
+        self.write_part(path, b'b' * 1000)
+        self.assertTrue(self.packages[0].download())
+        self.assertEqual(self.read(path), self.files[path])
+        self.assertEqual(self.server.file_requests(path), [('GET', path, None)])
+
+    def test_resume_wrong_range(self):
+        """Test a partial file is discarded if the server sends a different range to the one requested."""
+        path = 'models/a-1.0.pickle'
+        self.write_part(path, self.files[path][:1000], self.server.etag(path))
+        self.server.range_offset = 10
+        self.assertTrue(self.packages[0].download())
+        self.assertEqual(self.read(path), self.files[path])
+        self.assertEqual(self.server.file_requests(path), [('GET', path, 'bytes=1000-'), ('GET', path, None)])
+
+    def test_resume_complete(self):
+        """Test a partial file that is already complete is downloaded again."""
+        path = 'models/a-1.0.pickle'
+        self.write_part(path, self.files[path], self.server.etag(path))
+        self.assertTrue(self.packages[0].download())
+        self.assertEqual(self.read(path), self.files[path])
+        self.assertEqual(self.server.file_requests(path), [('GET', path, 'bytes=5000-'), ('GET', path, None)])
+
+    def test_checksum_mismatch(self):
+        """Test a download that doesn't match the manifest is discarded."""
+        self.server.set_manifest({'models/a-1.0.pickle': '0' * 64})
+        results = download_packages(self.packages)
+        self.assertIsInstance(results[0].error, DownloadError)
+        self.assertEqual([r.downloaded for r in results], [False, True, True])
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, 'models/a-1.0.pickle')))
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, 'models/a-1.0.pickle.part')))
+
+    def test_not_in_manifest(self):
+        """Test packages missing from the manifest are not downloaded."""
+        package = Package('models/d-1.0.pickle', root=self.server.root, data_dir=self.data_dir)
+        result = download_packages([package])[0]
+        self.assertIsInstance(result.error, DownloadError)
+        self.assertEqual(self.server.file_requests('models/d-1.0.pickle'), [])
+
+    def test_no_manifest(self):
+        """Test falling back to comparing sizes when the server has no manifest."""
+        del self.server.files['manifest.json']
+        results = download_packages(self.packages)
+        self.assertEqual([r.downloaded for r in results], [True, True, True])
+        results = download_packages(self.packages)
+        self.assertEqual([r.downloaded for r in results], [False, False, False])
+        self.assertEqual(self.server.file_requests('models/a-1.0.pickle')[-1], ('HEAD', 'models/a-1.0.pickle', None))
+
+    def test_bad_manifest(self):
+        """Test an error response or invalid JSON is treated as no manifest."""
+        self.server.statuses['manifest.json'] = 500
+        self.assertEqual([r.downloaded for r in download_packages(self.packages)], [True, True, True])
+        del self.server.statuses['manifest.json']
+        self.server.files['manifest.json'] = b'<html>Not found</html>'
+        self.assertEqual([r.error for r in download_packages(self.packages, force=True)], [None, None, None])
+
+    def test_make_manifest(self):
+        """Test making a manifest from downloaded packages."""
+        download_packages(self.packages)
+        manifest = make_manifest(self.packages)
+        self.assertEqual(manifest, json.loads(self.server.files['manifest.json'].decode('utf8')))
+        self.assertEqual(file_sha256(os.path.join(self.data_dir, 'models/c-1.0.pickle')), hashlib.sha256(b'').hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
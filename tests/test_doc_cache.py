@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+test_doc_cache
+~~~~~~~~~~~~~~
+
+Test caching of sentence analysis.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from chemdataextractor.doc.cache import AnalysisCache, MemoryAnalysisCache
+from chemdataextractor.doc.document import Document
+from chemdataextractor.doc.text import Paragraph, Sentence
+from chemdataextractor.nlp.lexicon import Lexicon
+from chemdataextractor.nlp.tag import NoneTagger, RegexTagger
+from chemdataextractor.nlp.tokenize import BaseTokenizer, WordTokenizer, regex_span_tokenize
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class CountingTagger(RegexTagger):
+    """RegexTagger that counts how many times it has been called."""
+
+    calls = 0
+
+    def tag(self, tokens):
+        self.calls += 1
+        return super(CountingTagger, self).tag(tokens)
+
+
+class CountingAnalysisCache(AnalysisCache):
+    """AnalysisCache that counts how many times held writes are written to the database."""
+
+    flushes = 0
+
+    def flush(self):
+        if any(self._pending.values()):
+            self.flushes += 1
+        super(CountingAnalysisCache, self).flush()
+
+
+class LineSentenceTokenizer(BaseTokenizer):
+    """Split sentences on newlines, so tests don't depend on a sentence tokenizer model."""
+
+    def span_tokenize(self, s):
+        return regex_span_tokenize(s, '\n')
+
+
+class CountingSentenceTokenizer(LineSentenceTokenizer):
+    """LineSentenceTokenizer that counts how many times it has been called."""
+
+    calls = 0
+
+    def span_tokenize(self, s):
+        self.calls += 1
+        return super(CountingSentenceTokenizer, self).span_tokenize(s)
+
+
+class SimpleParagraph(Paragraph):
+    """Paragraph that doesn't require any models."""
+    sentence_tokenizer = LineSentenceTokenizer()
+    word_tokenizer = WordTokenizer()
+    lexicon = Lexicon()
+    pos_tagger = RegexTagger()
+    ner_tagger = NoneTagger()
+    abbreviation_detector = False
+    parsers = []
+
+
+class TestAnalysisCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = AnalysisCache(os.path.join(self.tmpdir, 'analysis.sqlite'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _sentence(self, text, pos_tagger, start=0):
+        s = Sentence(text, start=start, word_tokenizer=WordTokenizer(), lexicon=Lexicon(), pos_tagger=pos_tagger, ner_tagger=NoneTagger())
+        s.analysis_cache = self.cache
+        return s
+
+    def test_cache_hit(self):
+        """Test the taggers are only run the first time a sentence is seen."""
+        tagger = CountingTagger()
+        s1 = self._sentence('The samples were heated to 300 K.', tagger)
+        self.assertEqual(s1.unprocessed_ner_tags, [None] * 8)
+        self.assertEqual(s1.pos_tags, ['AT', 'NNS', 'NN', 'VBD', 'NN', 'CD', 'NN', 'NN'])
+        self.assertEqual(tagger.calls, 1)
+        self.assertEqual(len(self.cache), 1)
+        s2 = self._sentence('The samples were heated to 300 K.', tagger, start=20)
+        self.assertEqual(s2.pos_tagged_tokens, s1.pos_tagged_tokens)
+        self.assertEqual(s2.unprocessed_ner_tags, [None] * 8)
+        self.assertEqual(s2.tokens[0].start, 20)
+        self.assertEqual(tagger.calls, 1)
+
+    def test_config_miss(self):
+        """Test a different tagger configuration misses the cache."""
+        self._sentence('The samples were heated.', RegexTagger()).unprocessed_ner_tags
+        s = self._sentence('The samples were heated.', NoneTagger())
+        self.assertEqual(s.pos_tags, [None] * 5)
+        s.unprocessed_ner_tags
+        self.assertEqual(len(self.cache), 2)
+
+    def test_tokenizer_options_miss(self):
+        """Test a different tokenizer option misses the cache."""
+        self._sentence('The samples were heated.', RegexTagger()).unprocessed_ner_tags
+        s = Sentence('The samples were heated.', word_tokenizer=WordTokenizer(split_last_stop=False), lexicon=Lexicon(),
+                     pos_tagger=RegexTagger(), ner_tagger=NoneTagger())
+        s.analysis_cache = self.cache
+        self.assertEqual(s.raw_tokens, ['The', 'samples', 'were', 'heated.'])
+        s.unprocessed_ner_tags
+        self.assertEqual(len(self.cache), 2)
+
+    def test_batch(self):
+        """Test writes in a batch are held until the end of the block, and can be read back before then."""
+        with self.cache.batch():
+            s1 = self._sentence('The samples were heated.', RegexTagger())
+            s1.unprocessed_ner_tags
+            with self.cache.batch():
+                self._sentence('The samples were cooled.', RegexTagger()).unprocessed_ner_tags
+            self.assertEqual(len(self.cache), 0)
+            self.assertEqual(self.cache.get(s1), s1.analysis)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_document_batch(self):
+        """Test a document's analysis is written in one transaction."""
+        self.cache.close()
+        self.cache = CountingAnalysisCache(self.cache.path)
+        Sentence.analysis_cache = self.cache
+        try:
+            Document(SimpleParagraph('The samples were heated.\nThen they cooled.'),
+                     SimpleParagraph('The mp was 80 °C.')).analyze(workers=2, threads=True)
+            self.assertEqual(len(self.cache), 3)
+            self.assertEqual(self.cache.flushes, 1)
+        finally:
+            Sentence.analysis_cache = None
+
+    def test_analyze_threads(self):
+        """Test the cache can be used by analysis in a thread pool, and then from this thread."""
+        texts = ['Sentence number %s was heated.\nThen %s samples cooled.' % (i, i) for i in range(20)]
+        Sentence.analysis_cache = self.cache
+        try:
+            d = Document(*[SimpleParagraph(text) for text in texts]).analyze(workers=4, threads=True)
+            self.assertEqual(len(self.cache), 40)
+            cached = Document(*[SimpleParagraph(text) for text in texts])
+            self.assertEqual([s.analysis for el in cached.elements for s in el.sentences],
+                             [s.analysis for el in d.elements for s in el.sentences])
+        finally:
+            Sentence.analysis_cache = None
+
+
+class TestMemoryAnalysisCache(unittest.TestCase):
+
+    def _sentence(self, text, cache, pos_tagger):
+        s = Sentence(text, word_tokenizer=WordTokenizer(), lexicon=Lexicon(), pos_tagger=pos_tagger, ner_tagger=NoneTagger())
+        s.analysis_cache = cache
+        return s
+
+    def test_interning(self):
+        """Test repeated sentences share one analysis and hits are counted."""
+        cache = MemoryAnalysisCache()
+        tagger = CountingTagger()
+        for i in range(3):
+            s = self._sentence('1H NMR (400 MHz, CDCl3)', cache, tagger)
+            self.assertEqual(s.raw_tokens, ['1H', 'NMR', '(', '400', 'MHz', ',', 'CDCl3', ')'])
+            s.unprocessed_ner_tags
+        self.assertEqual(tagger.calls, 1)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertAlmostEqual(cache.hit_rate, 2 / 3)
+
+    def test_lru_eviction(self):
+        """Test the least recently used sentence is evicted."""
+        cache = MemoryAnalysisCache(maxsize=2)
+        tagger = CountingTagger()
+        for text in ['First.', 'Second.', 'First.', 'Third.']:
+            self._sentence(text, cache, tagger).unprocessed_ner_tags
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(tagger.calls, 3)
+        self._sentence('First.', cache, tagger).unprocessed_ner_tags
+        self.assertEqual(tagger.calls, 3)
+        self._sentence('Second.', cache, tagger).unprocessed_ner_tags
+        self.assertEqual(tagger.calls, 4)
+
+    def test_paragraph_interning(self):
+        """Test repeated paragraphs share one sentence split."""
+        tokenizer = CountingSentenceTokenizer()
+        Sentence.analysis_cache = MemoryAnalysisCache()
+        try:
+            for i in range(3):
+                p = SimpleParagraph('Copyright 2017.\nAll rights reserved.', sentence_tokenizer=tokenizer)
+                self.assertEqual(p.raw_sentences, ['Copyright 2017.', 'All rights reserved.'])
+            self.assertEqual(tokenizer.calls, 1)
+            p = SimpleParagraph('Copyright 2017.', sentence_tokenizer=tokenizer)
+            self.assertEqual(p.raw_sentences, ['Copyright 2017.'])
+            self.assertEqual(tokenizer.calls, 2)
+        finally:
+            Sentence.analysis_cache = None
+
+    def test_backend(self):
+        """Test a miss in memory falls back to the backend cache."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            backend = AnalysisCache(os.path.join(tmpdir, 'analysis.sqlite'))
+            tagger = CountingTagger()
+            self._sentence('Copyright 2017.', MemoryAnalysisCache(backend=backend), tagger).unprocessed_ner_tags
+            cache = MemoryAnalysisCache(backend=backend)
+            self._sentence('Copyright 2017.', cache, tagger).unprocessed_ner_tags
+            self.assertEqual(tagger.calls, 1)
+            self.assertEqual(len(cache), 1)
+            tokenizer = CountingSentenceTokenizer()
+            p = SimpleParagraph('First.\nSecond.', sentence_tokenizer=tokenizer)
+            backend.put_spans(p, p.sentence_tokenizer.span_tokenize(p.text))
+            self.assertEqual(MemoryAnalysisCache(backend=backend).get_spans(p), [(0, 6), (7, 14)])
+            backend.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main()
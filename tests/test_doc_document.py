@@ -12,9 +12,24 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import logging
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import threading
 import unittest
 
 from chemdataextractor.doc.document import Document
+from chemdataextractor.doc.profile import ExtractionProfile
+from chemdataextractor.doc.text import Paragraph, Sentence
+from chemdataextractor.nlp.abbrev import ChemAbbreviationDetector
+from chemdataextractor.nlp.lexicon import Lexicon
+from chemdataextractor.nlp.tag import BaseTagger, NoneTagger, RegexTagger
+from chemdataextractor.nlp.tokenize import BaseTokenizer, WordTokenizer, regex_span_tokenize
+from chemdataextractor.parse.cem import CompoundParser
+from chemdataextractor.parse.context import ContextParser
+from chemdataextractor.parse.mp import MpParser
+from chemdataextractor.parse.table import MeltingPointHeadingParser, MeltingPointCellParser, GlassTransitionHeadingParser, GlassTransitionCellParser
+from chemdataextractor.parse.tg import TgParser
+from chemdataextractor.reader import XmlReader, HtmlReader
 
 logging.basicConfig(level=logging.DEBUG)
 log = logging.getLogger(__name__)
@@ -60,5 +75,265 @@ class TestDocument(unittest.TestCase):
         self.assertEqual([e.text for e in d], els)
 
 
+class CountingXmlReader(XmlReader):
+    """XmlReader that counts how many times it parses the input into a tree."""
+
+    parses = 0
+
+    def _make_tree(self, fstring):
+        CountingXmlReader.parses += 1
+        return super(CountingXmlReader, self)._make_tree(fstring)
+
+
+class ArticleXmlReader(CountingXmlReader):
+    root_css = 'article'
+
+
+class BookXmlReader(CountingXmlReader):
+    root_css = 'book'
+
+
+class TestDocumentFromString(unittest.TestCase):
+
+    def test_shared_tree(self):
+        """Test input is only parsed once when multiple readers are tried."""
+        CountingXmlReader.parses = 0
+        readers = [BookXmlReader(), CountingXmlReader(), ArticleXmlReader(), HtmlReader()]
+        d = Document.from_string(b'<article><p>First para</p></article>', readers=readers)
+        self.assertEqual(CountingXmlReader.parses, 1)
+        self.assertEqual([el.text for el in d.elements], ['First para'])
+
+    def test_detect_prefix(self):
+        """Test detection only examines the start of the input."""
+        reader = XmlReader()
+        self.assertEqual(reader._detect_prefix(b'x' * (reader.detect_bytes + 10)), b'x' * reader.detect_bytes)
+
+
+class LineSentenceTokenizer(BaseTokenizer):
+    """Split sentences on newlines, so tests don't depend on a sentence tokenizer model."""
+
+    def span_tokenize(self, s):
+        return regex_span_tokenize(s, '\n')
+
+
+class SimpleParagraph(Paragraph):
+    """Paragraph that doesn't require any models."""
+    sentence_tokenizer = LineSentenceTokenizer()
+    word_tokenizer = WordTokenizer()
+    lexicon = Lexicon()
+    pos_tagger = RegexTagger()
+    ner_tagger = NoneTagger()
+    abbreviation_detector = False
+    parsers = []
+
+
+class TestDocumentAnalyze(unittest.TestCase):
+    """Test parallel sentence-level analysis."""
+
+    def _make_doc(self):
+        return Document(
+            SimpleParagraph('The first sentence is readable.\nAnother sentence, with punctuation.'),
+            SimpleParagraph('Some 3 samples were heated.'),
+            SimpleParagraph('A paragraph with a custom tagger.', pos_tagger=NoneTagger())
+        )
+
+    def _analyses(self, doc):
+        return [s.analysis for el in doc.elements for s in el.sentences]
+
+    def test_analyze_processes(self):
+        """Test analysis in worker processes matches serial analysis."""
+        d = self._make_doc().analyze(workers=2)
+        for el in d.elements:
+            for sentence in el.sentences:
+                # Results are attached rather than computed lazily
+                self.assertIn('_pos_tagged_tokens', sentence.__dict__)
+        self.assertEqual(self._analyses(d), self._analyses(self._make_doc()))
+        self.assertEqual(d.elements[1].sentences[0].pos_tagged_tokens, [
+            ('Some', 'NN'), ('3', 'CD'), ('samples', 'NNS'), ('were', 'NN'), ('heated', 'VBD'), ('.', 'NN')
+        ])
+        self.assertEqual(d.elements[1].sentences[0].tokens[1].start, 5)
+        self.assertEqual(d.elements[2].sentences[0].pos_tags, [None] * 7)
+
+    def test_analyze_threads(self):
+        """Test analysis in a thread pool matches serial analysis."""
+        d = self._make_doc().analyze(workers=2, threads=True)
+        self.assertEqual(self._analyses(d), self._analyses(self._make_doc()))
+
+    def test_shared_pool(self):
+        """Test a pool passed in is used for each document and left open."""
+        for pool in (ThreadPool(2), multiprocessing.Pool(2)):
+            try:
+                docs = [self._make_doc().analyze(pool=pool) for _ in range(2)]
+                self.assertEqual(pool.map(abs, [-1, -2]), [1, 2])
+            finally:
+                pool.close()
+                pool.join()
+            for d in docs:
+                self.assertEqual(self._analyses(d), self._analyses(self._make_doc()))
+
+
+class TestSentenceTokens(unittest.TestCase):
+    """Test the compact token representation of a Sentence."""
+
+    def _sentence(self):
+        return Sentence('Some 3 samples.', start=10, word_tokenizer=WordTokenizer(), lexicon=Lexicon(), pos_tagger=RegexTagger(), ner_tagger=NoneTagger())
+
+    def test_token_offsets(self):
+        """Test token strings and Token objects are produced from the offsets."""
+        s = self._sentence()
+        self.assertEqual(list(s.token_offsets), [0, 4, 5, 6, 7, 14, 14, 15])
+        self.assertEqual(s.raw_tokens, ['Some', '3', 'samples', '.'])
+        self.assertEqual([(t.text, t.start, t.end) for t in s.tokens], [('Some', 10, 14), ('3', 15, 16), ('samples', 17, 24), ('.', 24, 25)])
+        self.assertEqual(s.tagged_tokens, [('Some', 'NN'), ('3', 'CD'), ('samples', 'NNS'), ('.', 'NN')])
+        self.assertEqual(s.pos_tags, ['NN', 'CD', 'NNS', 'NN'])
+        # Token strings and tag lists are built on access from the offsets and tags, not kept as extra copies
+        for attr in ('_raw_tokens', '_pos_tags', '_tagged_tokens'):
+            self.assertNotIn(attr, s.__dict__)
+
+    def test_set_analysis(self):
+        """Test attaching analysis replaces anything previously derived."""
+        s = self._sentence()
+        s.tagged_tokens
+        s.analysis = ([(0, 14), (14, 15)], ['NN', '.'], ['B-CM', None])
+        self.assertEqual(s.raw_tokens, ['Some 3 samples', '.'])
+        self.assertEqual(s.tagged_tokens, [('Some 3 samples', 'B-CM'), ('.', '.')])
+        self.assertEqual(s.analysis, ([(0, 14), (14, 15)], ['NN', '.'], ['B-CM', None]))
+
+    def test_release(self):
+        """Test releasing a sentence keeps a compact analysis that is used instead of running the taggers again."""
+        s = self._sentence()
+        pos_tags = s.pos_tags
+        s.unprocessed_ner_tags
+        s.release(keep_analysis=True)
+        self.assertNotIn('_tokens', s.__dict__)
+        s.pos_tagger = NoneTagger()
+        self.assertEqual(s.pos_tags, pos_tags)
+        s.release()
+        self.assertEqual(s.pos_tags, [None] * 4)
+
+
+class MpParagraph(SimpleParagraph):
+    parsers = [MpParser()]
+
+
+class TestDocumentReleaseRecords(unittest.TestCase):
+    """Test extracting records while discarding the analysis of each element."""
+
+    def _make_doc(self):
+        return Document(
+            MpParagraph('The mp was 120 °C.\nIt was then heated.'),
+            MpParagraph('A second sample had mp 80-82 °C.'),
+            MpParagraph('Nothing to see here.')
+        )
+
+    def test_release(self):
+        """Test records match the records property, and element analysis is released."""
+        d = self._make_doc()
+        records = [r.serialize() for r in d.extract_records(release=True)]
+        self.assertEqual(records, [r.serialize() for r in self._make_doc().records])
+        self.assertEqual(len(records), 2)
+        for el in d.elements:
+            self.assertNotIn('_sentences', el.__dict__)
+        # Released elements are recomputed on demand
+        self.assertEqual([r.serialize() for r in d.records], records)
+
+
+    def test_concurrent(self):
+        """Test extractions running at the same time on one document don't affect each other."""
+        d = Document(
+            AbbreviationMpParagraph('We used poly vinyl chloride (PVC) throughout.'),
+            AbbreviationMpParagraph('PVC (mp 80 °C) was used.')
+        )
+        expected = [r.serialize() for r in Document(*[AbbreviationMpParagraph(el.text) for el in d.elements]).records]
+        results = []
+        threads = [threading.Thread(target=lambda: results.append([r.serialize() for r in d.extract_records()]))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(expected[0]['names'], ['PVC', 'poly vinyl chloride'])
+        self.assertEqual(results, [expected] * 4)
+        # Definitions are kept once found, rather than removed when an extraction finishes
+        self.assertEqual(len(d.abbreviation_definitions), 1)
+
+
+class MpTgParagraph(SimpleParagraph):
+    parsers = [MpParser(), TgParser()]
+
+
+class PvcTagger(BaseTagger):
+    """Tag poly vinyl chloride as a chemical entity mention."""
+
+    def tag(self, tokens):
+        return [(t, {'poly': 'B-CM', 'vinyl': 'I-CM', 'chloride': 'I-CM'}.get(t[0])) for t in tokens]
+
+
+class AbbreviationMpParagraph(SimpleParagraph):
+    ner_tagger = PvcTagger()
+    abbreviation_detector = ChemAbbreviationDetector()
+    parsers = [MpParser()]
+
+
+class AbbreviationTgParagraph(AbbreviationMpParagraph):
+    parsers = [TgParser()]
+
+
+class TestExtractionProfile(unittest.TestCase):
+    """Test selecting the parsers used for a single extraction."""
+
+    def _make_doc(self):
+        return Document(
+            MpTgParagraph('The mp was 120 °C.'),
+            MpTgParagraph('The Tg was 80 °C.')
+        )
+
+    def test_properties(self):
+        """Test only the selected properties are extracted, without changing the element classes."""
+        d = self._make_doc()
+        records = d.extract_records(profile=ExtractionProfile(properties=['tg']))
+        self.assertEqual([list(r.serialize()) for r in records], [['glass_transitions']])
+        self.assertEqual(len(MpTgParagraph.parsers), 2)
+        # The document's own parsers are restored afterwards
+        self.assertEqual(len(d.elements[0].sentences[0].parsers), 2)
+        self.assertEqual(len(d.records), 2)
+
+    def test_base_parsers(self):
+        """Test the parsers kept along with the selected properties can be restricted."""
+        parsers = [CompoundParser(), ContextParser(), MpParser(), TgParser()]
+        selected = ExtractionProfile(properties=['mp'], base_parsers=['CompoundParser']).select(parsers)
+        self.assertEqual(selected, [parsers[0], parsers[2]])
+        self.assertEqual(ExtractionProfile(properties=['mp']).select(parsers), parsers[:3])
+
+    def test_skip_text(self):
+        """Test sentences aren't tagged when text is excluded."""
+        d = self._make_doc()
+        self.assertEqual(len(d.extract_records(profile=ExtractionProfile(text=False))), 0)
+        for el in d.elements:
+            for sentence in el.sentences:
+                self.assertNotIn('_pos_tagged_tokens', sentence.__dict__)
+
+    def test_skipped_abbreviations(self):
+        """Test abbreviations defined in elements the profile skips are still used in the other elements."""
+        d = Document(
+            AbbreviationMpParagraph('We used poly vinyl chloride (PVC) throughout.'),
+            AbbreviationTgParagraph('The Tg of PVC was 80 °C.')
+        )
+        d.extract_records(profile=ExtractionProfile(properties=['tg']))
+        self.assertEqual(d.elements[1].sentences[0].ner_tags[3], 'B-CM')
+
+    def test_select_table_parsers(self):
+        """Test table parsers are selected by their heading parser."""
+        mp = (MeltingPointHeadingParser(), MeltingPointCellParser())
+        tg = (GlassTransitionHeadingParser(), GlassTransitionCellParser())
+        profile = ExtractionProfile(properties=['mp'])
+        self.assertEqual(profile.select([mp, tg]), [mp])
+        self.assertEqual(profile.select([mp, tg], enabled=False), [])
+        self.assertEqual(ExtractionProfile().select([mp, tg]), [mp, tg])
+
+    def test_unknown_property(self):
+        self.assertRaises(ValueError, ExtractionProfile, properties=['mp', 'colour'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+test_mmapmodel
+~~~~~~~~~~~~~~
+
+Test memory-mapped models.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import io
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+from chemdataextractor import data
+from chemdataextractor.mmapmodel import MmapSet, MmapTable, can_mmap, convert_model, load_model, save_model
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+TRAIN_TEXT = (
+    'The mixture was stirred for 2 h. at r.t. and then filtered. The solid was washed with Et2O. '
+    'Compound 3 was obtained as a white powder (m.p. 120 °C). Dr. Smith et al. reported a similar yield. '
+    'The product was dried in vacuo. Fig. 2 shows the spectrum. '
+) * 20
+
+
+class TestMmapModel(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'model.mmap')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_clusters(self):
+        """Test converting a word clusters dict."""
+        clusters = {'benzene': '0110', 'acid': '10', 'naïve': '111', '': '0'}
+        save_model(clusters, self.path)
+        model = load_model(self.path)
+        self.assertIsInstance(model, MmapTable)
+        self.assertEqual(dict(model), clusters)
+        self.assertEqual(model['naïve'], '111')
+        self.assertEqual(model.get('toluene'), None)
+        self.assertNotIn('toluene', model)
+        self.assertNotIn(None, model)
+        self.assertRaises(KeyError, lambda: model['toluene'])
+        self.assertEqual(list(model), sorted(clusters, key=lambda k: k.encode('utf8')))
+
+    def test_empty(self):
+        """Test converting an empty dict."""
+        save_model({}, self.path)
+        model = load_model(self.path)
+        self.assertEqual(len(model), 0)
+        self.assertEqual(model.get('a'), None)
+
+    def test_ap(self):
+        """Test converting an averaged perceptron model tuple."""
+        weights = {'bias': {'NN': 1.5, 'VB': -0.25}, 'w=the': {'DT': 3.0}, 'w=x': {}}
+        tagdict = {'the': 'DT', '.': '.'}
+        classes = {'NN', 'VB', 'DT', '.'}
+        save_model((weights, tagdict, classes, True), self.path)
+        m_weights, m_tagdict, m_classes, m_clusters = load_model(self.path)
+        self.assertEqual(dict(m_weights), weights)
+        self.assertEqual(m_weights.get('bias'), {'NN': 1.5, 'VB': -0.25})
+        self.assertEqual(dict(m_tagdict), tagdict)
+        self.assertEqual(m_classes, classes)
+        self.assertEqual(m_clusters, True)
+
+    def test_punkt(self):
+        """Test converting a Punkt sentence tokenizer gives the same sentences."""
+        tokenizer = PunktSentenceTokenizer(TRAIN_TEXT)
+        text = 'Stirred for 2 h. at r.t. and filtered. Dr. Smith et al. reported it. See Fig. 2 for details.'
+        save_model(tokenizer, self.path)
+        model = load_model(self.path)
+        self.assertIsInstance(model._params.abbrev_types, MmapSet)
+        self.assertEqual(set(model._params.abbrev_types), tokenizer._params.abbrev_types)
+        self.assertEqual(set(model._params.collocations), tokenizer._params.collocations)
+        self.assertEqual(dict(model._params.ortho_context), dict(tokenizer._params.ortho_context))
+        self.assertEqual(model._params.ortho_context['notatoken'], 0)
+        self.assertEqual(list(model.span_tokenize(text)), list(tokenizer.span_tokenize(text)))
+        # The original tokenizer is unchanged
+        self.assertIsInstance(tokenizer._params.abbrev_types, set)
+
+    def test_unsupported(self):
+        """Test models that can't be memory-mapped."""
+        self.assertFalse(can_mmap(['a', 'b']))
+        self.assertRaises(TypeError, save_model, ['a', 'b'], self.path)
+
+    def test_not_mmap(self):
+        """Test loading a file that isn't a memory-mapped model."""
+        with io.open(self.path, 'wb') as f:
+            f.write(b'not a model')
+        self.assertRaises(ValueError, load_model, self.path)
+
+    def test_convert_not_pickle(self):
+        """Test converting a file that isn't a pickled model, e.g. a CRF model."""
+        with io.open(self.path, 'wb') as f:
+            f.write(b'lCRF\x00\x01\x02')
+        self.assertRaises(ValueError, convert_model, self.path)
+
+    def test_load_model_prefers_mmap(self):
+        """Test data.load_model loads the converted version of a pickled model."""
+        clusters = {'benzene': '0110'}
+        pickle_path = os.path.join(self.tmpdir, 'clusters.pickle')
+        with io.open(pickle_path, 'wb') as f:
+            pickle.dump(clusters, f)
+        self.assertEqual(convert_model(pickle_path), os.path.join(self.tmpdir, 'clusters.mmap'))
+        try:
+            model = data.load_model(pickle_path)
+            self.assertIsInstance(model, MmapTable)
+            self.assertEqual(dict(model), clusters)
+        finally:
+            data._model_cache.pop(pickle_path, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,8 +13,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 
+from chemdataextractor.nlp.pos import CrfPosTagger
 from chemdataextractor.nlp.tag import DictionaryTagger
 
 
@@ -101,5 +107,91 @@ class TestDictionaryTagger(unittest.TestCase):
         )
 
 
+    def test_load_once(self):
+        """Test a tagger shared between threads only loads its model once."""
+        dt = SlowDictionaryTagger(model='washington.dawg')
+        threads = [threading.Thread(target=dt.tag, args=(['Washington'],)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(dt.loads, 1)
+        self.assertEqual(dt.tag(['Washington']), [('Washington', 'B-CM')])
+
+
+class SlowDictionaryTagger(DictionaryTagger):
+    """DictionaryTagger that builds its dictionary slowly instead of loading a model, and counts how often it does."""
+
+    loads = 0
+
+    def load(self, model):
+        self.loads += 1
+        time.sleep(0.05)
+        self.build([['Washington']])
+
+
+class CountingCrfPosTagger(CrfPosTagger):
+    """CRF POS tagger that counts the tokens it extracts features for in this process."""
+
+    calls = 0
+
+    def _get_features(self, tokens, i):
+        CountingCrfPosTagger.calls += 1
+        return super(CountingCrfPosTagger, self)._get_features(tokens, i)
+
+
+TRAINING_SENTENCES = [
+    [('The', 'DT'), ('solution', 'NN'), ('was', 'VBD'), ('heated', 'VBN'), ('.', '.')],
+    [('A', 'DT'), ('crystal', 'NN'), ('formed', 'VBD'), ('slowly', 'RB'), ('.', '.')],
+    [('The', 'DT'), ('product', 'NN'), ('was', 'VBD'), ('filtered', 'VBN'), ('.', '.')],
+] * 20
+
+
+class TestCrfTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        CountingCrfPosTagger.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_parallel_features(self):
+        """Test extracting features in worker processes gives the same features, in order."""
+        tagger = CrfPosTagger(clusters=False)
+        serial = list(tagger.extract_features(TRAINING_SENTENCES))
+        self.assertEqual(list(tagger.extract_features(TRAINING_SENTENCES, workers=2, chunksize=7)), serial)
+        self.assertEqual(serial[0][1], ['DT', 'NN', 'VBD', 'VBN', '.'])
+        self.assertEqual(len(serial[0][0]), 5)
+
+    def test_feature_cache(self):
+        """Test training again on the same sentences reads the cached features, and trains the same model."""
+        cache_dir = os.path.join(self.path, 'features')
+        model = os.path.join(self.path, 'a.crfsuite')
+        tagger = CountingCrfPosTagger(model=model, clusters=False)
+        tagger.train(TRAINING_SENTENCES, model, cache_dir=cache_dir)
+        self.assertEqual(CountingCrfPosTagger.calls, 75 * 4)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        tokens = ['The', 'crystal', 'was', 'filtered', '.']
+        expected = tagger.tag(tokens)
+        CountingCrfPosTagger.calls = 0
+        model2 = os.path.join(self.path, 'b.crfsuite')
+        tagger2 = CountingCrfPosTagger(model=model2, clusters=False, params=dict(CrfPosTagger.params, c2=0.01))
+        tagger2.train(TRAINING_SENTENCES, model2, cache_dir=cache_dir)
+        self.assertEqual(CountingCrfPosTagger.calls, 0)
+        self.assertEqual([tag for token, tag in tagger2.tag(tokens)], [tag for token, tag in expected])
+        # Different sentences don't use the cached features
+        tagger2.train(TRAINING_SENTENCES[:30], model2, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_parallel_train(self):
+        """Test training with features extracted in worker processes."""
+        model = os.path.join(self.path, 'c.crfsuite')
+        tagger = CrfPosTagger(model=model, clusters=False)
+        tagger.train(TRAINING_SENTENCES, model, workers=2, cache_dir=os.path.join(self.path, 'features'))
+        self.assertEqual([tag for token, tag in tagger.tag(['The', 'solution', 'was', 'heated', '.'])],
+                         ['DT', 'NN', 'VBD', 'VBN', '.'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+test_parse_elements
+~~~~~~~~~~~~~~~~~~~
+
+Test parser element triggers.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+import unittest
+
+from chemdataextractor.parse.base import BaseParser
+from chemdataextractor.parse.elements import W, I, R, T, Optional, Not, Any, OneOrMore, get_triggers
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class SimpleParser(BaseParser):
+
+    def __init__(self, root):
+        self._root = root
+
+    @property
+    def root(self):
+        return self._root
+
+    def interpret(self, result, start, end):
+        yield result
+
+
+class TestTriggers(unittest.TestCase):
+
+    def test_word(self):
+        triggers, nullable = get_triggers(W('mp') | I('Melting') | T('CD') | R('^\d+$'))
+        self.assertFalse(nullable)
+        self.assertTrue(triggers.match(('mp', 'NN')))
+        self.assertFalse(triggers.match(('MP', 'NN')))
+        self.assertTrue(triggers.match(('MELTING', 'NN')))
+        self.assertTrue(triggers.match(('x', 'CD')))
+        self.assertTrue(triggers.match(('123', 'NN')))
+        self.assertFalse(triggers.match(('point', 'NN')))
+
+    def test_sequence(self):
+        """Triggers of a sequence come from each element up to and including the first that isn't optional."""
+        triggers, nullable = get_triggers(Optional(W('the')) + Not(W('a')) + W('mp') + W('point'))
+        self.assertFalse(nullable)
+        self.assertEqual(triggers.words, {'the', 'mp'})
+
+    def test_nullable(self):
+        triggers, nullable = get_triggers(Optional(W('a')) + Optional(W('b')))
+        self.assertTrue(nullable)
+        self.assertEqual(triggers.words, {'a', 'b'})
+
+    def test_any(self):
+        self.assertEqual(get_triggers(OneOrMore(Any()) + W('a'))[0], None)
+        self.assertEqual(get_triggers(W('a') + Any())[0].words, {'a'})
+
+    def test_could_parse(self):
+        parser = SimpleParser(Optional(W('the')) + I('mp') + R('^\d+$'))
+        self.assertTrue(parser.could_parse([('The', 'DT'), ('MP', 'NN'), ('5', 'CD')]))
+        self.assertFalse(parser.could_parse([('bp', 'NN'), ('5', 'CD')]))
+        self.assertEqual(list(parser.parse([('bp', 'NN'), ('5', 'CD')])), [])
+
+    def test_could_parse_any(self):
+        parser = SimpleParser(Any() + W('a'))
+        self.assertTrue(parser.could_parse([('b', 'NN')]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+test_preload
+~~~~~~~~~~~~
+
+Test loading models and building parsers up front.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from chemdataextractor.doc.text import Paragraph
+from chemdataextractor.nlp.lexicon import Lexicon
+from chemdataextractor.nlp.tag import DictionaryTagger, NoneTagger, RegexTagger
+from chemdataextractor.nlp.tokenize import BaseTokenizer, WordTokenizer, regex_span_tokenize
+from chemdataextractor.parse.mp import MpParser
+from chemdataextractor.preload import warmup
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class LineSentenceTokenizer(BaseTokenizer):
+    """Split sentences on newlines, so tests don't depend on a sentence tokenizer model."""
+
+    def span_tokenize(self, s):
+        return regex_span_tokenize(s, '\n')
+
+
+class TestWarmup(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.model = os.path.join(self.tmpdir, 'dict.dawg')
+        tagger = DictionaryTagger(lexicon=Lexicon())
+        tagger.build([['benzene'], ['acetic', 'acid']])
+        tagger.save(self.model)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _make_class(self):
+        class DictParagraph(Paragraph):
+            sentence_tokenizer = LineSentenceTokenizer()
+            word_tokenizer = WordTokenizer()
+            lexicon = Lexicon()
+            pos_tagger = RegexTagger()
+            ner_tagger = DictionaryTagger(model=self.model, lexicon=Lexicon())
+            parsers = [MpParser()]
+        return DictParagraph
+
+    def test_warmup(self):
+        """Test models are loaded and parsers built, and only reported the first time."""
+        cls = self._make_class()
+        results = warmup(element_classes=[cls])
+        self.assertEqual([r.name for r in results], [self.model, 'DictParagraph parsers (1)'])
+        self.assertTrue(cls.ner_tagger._loaded_model)
+        self.assertIn('_triggers', cls.parsers[0].__dict__)
+        for result in results:
+            self.assertGreaterEqual(result.seconds, 0)
+        self.assertEqual([r.name for r in warmup(element_classes=[cls], parsers=False)], [])
+        self.assertEqual(cls.ner_tagger.tag(['Benzene', 'was', 'used']), [('Benzene', 'B-CM'), ('was', None), ('used', None)])
+
+    def test_no_models(self):
+        """Test classes whose components need no models."""
+        class PlainParagraph(Paragraph):
+            sentence_tokenizer = LineSentenceTokenizer()
+            word_tokenizer = WordTokenizer()
+            lexicon = Lexicon()
+            pos_tagger = NoneTagger()
+            ner_tagger = NoneTagger()
+            parsers = []
+        self.assertEqual(warmup(element_classes=[PlainParagraph]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
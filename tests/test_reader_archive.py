@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+test_reader_archive
+~~~~~~~~~~~~~~~~~~~
+
+Test reading documents from archives.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import gzip
+import io
+import logging
+import tarfile
+import unittest
+import zipfile
+
+from chemdataextractor.errors import ReaderError
+from chemdataextractor.reader import iter_archive, read_archive
+from chemdataextractor.reader.archive import is_archive
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+FILES = [
+    ('corpus/first.html', b'<html><body><p>First document</p></body></html>'),
+    ('corpus/second.txt', b'Second document'),
+]
+
+
+def make_zip():
+    f = io.BytesIO()
+    with zipfile.ZipFile(f, 'w') as zf:
+        zf.writestr('corpus/', b'')
+        for name, content in FILES:
+            zf.writestr(name, content)
+        zf.writestr('__MACOSX/corpus/._first.html', b'junk')
+    f.seek(0)
+    return f
+
+
+def make_tar(mode):
+    f = io.BytesIO()
+    with tarfile.open(fileobj=f, mode=mode) as tar:
+        for name, content in FILES:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    f.seek(0)
+    return f
+
+
+class TestArchive(unittest.TestCase):
+
+    def test_is_archive(self):
+        self.assertTrue(is_archive('corpus.tar.gz'))
+        self.assertTrue(is_archive('CORPUS.ZIP'))
+        self.assertFalse(is_archive('paper.html'))
+        self.assertFalse(is_archive(None))
+
+    def test_zip(self):
+        """Test members are read from a zip archive, skipping directories and metadata."""
+        self.assertEqual(list(iter_archive(make_zip())), FILES)
+
+    def test_tar(self):
+        """Test members are read from a tar archive."""
+        self.assertEqual(list(iter_archive(make_tar('w'))), FILES)
+
+    def test_tar_gz(self):
+        """Test members are read from a gzipped tar archive."""
+        self.assertEqual(list(iter_archive(make_tar('w:gz'))), FILES)
+
+    def test_gzip(self):
+        """Test a gzipped document is read as a single member named without the extension."""
+        f = io.BytesIO()
+        with gzip.GzipFile(fileobj=f, mode='wb') as gz:
+            gz.write(FILES[0][1])
+        f.seek(0)
+        self.assertEqual(list(iter_archive(f, fname='data/first.html.gz')), [('first.html', FILES[0][1])])
+
+    def test_gzip_bulk(self):
+        """Test a gzipped file of concatenated XML documents is split into its documents."""
+        documents = [b'<?xml version="1.0"?>\n<doc>%d</doc>\n' % i for i in range(3)]
+        f = io.BytesIO()
+        with gzip.GzipFile(fileobj=f, mode='wb') as gz:
+            gz.write(b''.join(documents))
+        f.seek(0)
+        self.assertEqual(list(iter_archive(f, fname='ipg050111.xml.gz')), [
+            ('ipg050111-0.xml', documents[0]), ('ipg050111-1.xml', documents[1]), ('ipg050111-2.xml', documents[2])
+        ])
+
+    def test_gzip_single_xml(self):
+        """Test a gzipped file with a single XML document keeps its name."""
+        content = b'<?xml version="1.0"?>\n<doc>0</doc>\n'
+        f = io.BytesIO()
+        with gzip.GzipFile(fileobj=f, mode='wb') as gz:
+            gz.write(content)
+        f.seek(0)
+        self.assertEqual(list(iter_archive(f, fname='doc.xml.gz')), [('doc.xml', content)])
+
+    def test_not_seekable(self):
+        """Test archives are read from input that can't seek."""
+
+        class Pipe(io.RawIOBase):
+            def __init__(self, f):
+                self.f = f
+
+            def readable(self):
+                return True
+
+            def readinto(self, b):
+                data = self.f.read(len(b))
+                b[:len(data)] = data
+                return len(data)
+
+        self.assertEqual(list(iter_archive(io.BufferedReader(Pipe(make_tar('w:gz'))))), FILES)
+
+    def test_unsupported(self):
+        with self.assertRaises(ReaderError):
+            list(iter_archive(io.BytesIO(b'<html></html>')))
+
+    def test_read_archive(self):
+        """Test documents are read with the member name used for reader detection."""
+        docs = list(read_archive(make_zip()))
+        self.assertEqual([name for name, doc in docs], ['corpus/first.html', 'corpus/second.txt'])
+        self.assertEqual([el.text for el in docs[0][1].elements], ['First document'])
+        self.assertEqual([el.text for el in docs[1][1].elements], ['Second document'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,7 +15,7 @@ import logging
 import unittest
 
 from chemdataextractor.doc import Paragraph
-from chemdataextractor.reader import HtmlReader
+from chemdataextractor.reader import HtmlReader, XmlReader
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -67,5 +67,24 @@ class TestReaderHtml(unittest.TestCase):
             self.assertIsInstance(el, Paragraph)
 
 
+class TestReaderQueries(unittest.TestCase):
+
+    def test_compiled_once(self):
+        """Test CSS selectors are translated and compiled once per reader class."""
+        r = HtmlReader()
+        r.parse('<h1>Title</h1><p>Para</p>')
+        compiled = HtmlReader._compile_css('h1')
+        r.parse('<h1>Another title</h1>')
+        self.assertIs(HtmlReader._compile_css('h1'), compiled)
+        self.assertIsNot(XmlReader._compile_css('h1'), compiled)
+
+    def test_css(self):
+        """Test compiled CSS selectors select the same elements as before."""
+        r = HtmlReader()
+        root = r._make_tree('<div><h2 id="a">One</h2><p>x</p><h3 id="b">Two</h3></div>')
+        self.assertEqual([el.get('id') for el in r._css(r.heading_css, root)], ['a', 'b'])
+        self.assertEqual(r._xpath('count(//h2)', root), [1.0])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+test_reader_pdf
+~~~~~~~~~~~~~~~
+
+Test PDF reader.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from pdfminer.layout import LAParams
+
+from chemdataextractor.reader import PdfReader, PdfLayoutCache
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+def make_pdf(texts):
+    """Return a minimal PDF with one page for each text string."""
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [%s] /Count %s >>' % (' '.join('%s 0 R' % (4 + 2 * i) for i in range(len(texts))), len(texts)),
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    for i, text in enumerate(texts):
+        stream = 'BT /F1 12 Tf 72 720 Td (%s) Tj ET' % text
+        objects.append('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> '
+                       '/Contents %s 0 R >>' % (5 + 2 * i))
+        objects.append('<< /Length %s >>\nstream\n%s\nendstream' % (len(stream), stream))
+    pdf = '%PDF-1.4\n'
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += '%s 0 obj\n%s\nendobj\n' % (i + 1, obj)
+    xref = len(pdf)
+    pdf += 'xref\n0 %s\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += ''.join('%010d 00000 n \n' % offset for offset in offsets)
+    pdf += 'trailer\n<< /Size %s /Root 1 0 R >>\nstartxref\n%s\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return pdf.encode('ascii')
+
+
+class TestPdfReader(unittest.TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        self.pdf = make_pdf(['Page one', 'Page two', 'Page three', 'Page four', 'Page five'])
+
+    def test_pages(self):
+        """Test elements are read page by page."""
+        r = PdfReader()
+        pages = [(pageno, [el.text for el in elements]) for pageno, elements in r.iter_pages(self.pdf)]
+        self.assertEqual(pages, [(0, ['Page one']), (1, ['Page two']), (2, ['Page three']), (3, ['Page four']),
+                                 (4, ['Page five'])])
+
+    def test_page_range(self):
+        """Test only the selected pages are read."""
+        r = PdfReader(pages=[1, 3])
+        d = r.readstring(self.pdf)
+        self.assertEqual([el.text for el in d.elements], ['Page two', 'Page four'])
+
+    def test_workers(self):
+        """Test pages are laid out in worker processes and returned in order."""
+        r = PdfReader(pages=range(1, 5), workers=2, chunksize=1)
+        pages = [(pageno, [el.text for el in elements]) for pageno, elements in r.iter_pages(self.pdf)]
+        self.assertEqual(pages, [(1, ['Page two']), (2, ['Page three']), (3, ['Page four']), (4, ['Page five'])])
+
+
+class CountingPdfReader(PdfReader):
+    """PdfReader that records which pages it lays out."""
+
+    def _layout_pages(self, fstring, pagenos=None):
+        for pageno, boxes in super(CountingPdfReader, self)._layout_pages(fstring, pagenos):
+            self.laid_out.append(pageno)
+            yield pageno, boxes
+
+
+class TestPdfLayoutCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = PdfLayoutCache(os.path.join(self.tmpdir, 'layout.sqlite'))
+        self.pdf = make_pdf(['Page one', 'Page two', 'Page three'])
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def read(self, **kwargs):
+        r = CountingPdfReader(**kwargs)
+        r.layout_cache = self.cache
+        r.laid_out = []
+        return r, [el.text for el in r.readstring(self.pdf).elements]
+
+    def test_cache(self):
+        """Test a PDF is only laid out once."""
+        r, texts = self.read()
+        self.assertEqual(r.laid_out, [0, 1, 2])
+        r, cached_texts = self.read()
+        self.assertEqual(r.laid_out, [])
+        self.assertEqual(cached_texts, texts)
+        self.assertEqual(cached_texts, ['Page one', 'Page two', 'Page three'])
+
+    def test_partial(self):
+        """Test only pages missing from the cache are laid out."""
+        r, texts = self.read(pages=[1])
+        self.assertEqual(r.laid_out, [1])
+        r, texts = self.read()
+        self.assertEqual(r.laid_out, [0, 2])
+        self.assertEqual(texts, ['Page one', 'Page two', 'Page three'])
+
+    def test_laparams(self):
+        """Test different layout parameters are cached separately."""
+        self.read()
+        r, texts = self.read(laparams=LAParams(char_margin=1.0))
+        self.assertEqual(r.laid_out, [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
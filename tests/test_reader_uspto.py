@@ -16,8 +16,10 @@ import logging
 import os
 import unittest
 
+import six
+
 from chemdataextractor import Document
-from chemdataextractor.reader import UsptoXmlReader
+from chemdataextractor.reader import UsptoXmlReader, UsptoXmlBulkReader
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -53,5 +55,34 @@ class TestUsptoReader(unittest.TestCase):
         self.assertEqual(len(d.elements), 112)
 
 
+class TestUsptoBulkReader(unittest.TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        with io.open(os.path.join(os.path.dirname(__file__), 'data', 'uspto', 'US06840965B2.xml'), 'rb') as f:
+            self.content = f.read()
+        self.bulk = six.BytesIO(self.content * 3)
+
+    def test_split(self):
+        """Test concatenated documents are split."""
+        r = UsptoXmlBulkReader()
+        self.assertEqual(list(r.split(self.bulk)), [(0, self.content), (1, self.content), (2, self.content)])
+
+    def test_split_resume(self):
+        """Test splitting can skip to and stop at a document index."""
+        r = UsptoXmlBulkReader()
+        self.assertEqual(list(r.split(self.bulk, start=1, stop=2)), [(1, self.content)])
+        self.bulk.seek(0)
+        self.assertEqual([i for i, _ in r.split(self.bulk, start=2)], [2])
+
+    def test_read(self):
+        """Test each document is read."""
+        r = UsptoXmlBulkReader()
+        docs = list(r.read(self.bulk, start=1))
+        self.assertEqual([i for i, _ in docs], [1, 2])
+        self.assertEqual(len(docs[0][1].elements), 112)
+
+
 if __name__ == '__main__':
     unittest.main()
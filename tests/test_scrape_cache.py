@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+test_scrape_cache
+~~~~~~~~~~~~~~~~~
+
+Test caching scraper responses.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import defaultdict
+import hashlib
+import logging
+import shutil
+import tempfile
+import time
+import unittest
+
+from chemdataextractor.scrape.cache import CacheAdapter, CacheMissError, ResponseCache
+from chemdataextractor.scrape.entity import Entity
+from chemdataextractor.scrape.fields import StringField
+from chemdataextractor.scrape.runner import RateLimitAdapter, ScraperRunner
+from chemdataextractor.scrape.scraper import UrlScraper
+
+from stubserver import StubServer
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class PageServer(StubServer):
+    """A local HTTP server that serves pages from a dict, with an ETag for each, and supports conditional requests."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = defaultdict(list)
+        super(PageServer, self).__init__()
+
+    def respond(self, handler):
+        path = handler.path.lstrip('/')
+        body_in = handler.rfile.read(int(handler.headers.get('Content-Length'))) if handler.command == 'POST' else b''
+        self.requests[path].append((handler.command, handler.headers.get('If-None-Match'), body_in))
+        content = self.pages.get(path)
+        if content is None:
+            return self.send(handler, 500)
+        etag = '"%s"' % hashlib.md5(content).hexdigest()
+        if handler.headers.get('If-None-Match') == etag:
+            return self.send(handler, 304, headers={'ETag': etag})
+        self.send(handler, 200, content + body_in, {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag})
+
+
+class CountingResponseCache(ResponseCache):
+    """Counts how often the cache directory is listed."""
+    walks = 0
+
+    def _entries(self):
+        self.walks += 1
+        return super(CountingResponseCache, self)._entries()
+
+
+class PageEntity(Entity):
+    title = StringField('h1')
+
+
+class PageScraper(UrlScraper):
+    entity = PageEntity
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.server = PageServer({
+            'a': b'<html><body><h1>A</h1></body></html>',
+            'b': b'<html><body><h1>B</h1></body></html>',
+            'search': b'results:',
+        })
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.path)
+
+    def test_cached(self):
+        """Test a response is only requested once, and the cache is shared by scrapers using it."""
+        cache = ResponseCache(self.path)
+        scraper = PageScraper(cache=cache)
+        self.assertEqual(scraper.run(self.server.root + 'a').serialize(), [{'title': 'A'}])
+        response = scraper.http.get(self.server.root + 'a')
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['content-type'], 'text/html; charset=utf-8')
+        self.assertEqual(response.text, '<html><body><h1>A</h1></body></html>')
+        self.assertEqual(PageScraper(cache=ResponseCache(self.path)).run(self.server.root + 'a').serialize(), [{'title': 'A'}])
+        self.assertEqual(len(self.server.requests['a']), 1)
+
+    def test_uncached(self):
+        """Test scrapers without a cache make every request."""
+        scraper = PageScraper()
+        scraper.run(self.server.root + 'a')
+        scraper.run(self.server.root + 'a')
+        self.assertEqual(len(self.server.requests['a']), 2)
+
+    def test_error_not_cached(self):
+        """Test server errors aren't cached."""
+        scraper = PageScraper(cache=ResponseCache(self.path))
+        self.assertEqual(scraper.http.get(self.server.root + 'missing').status_code, 500)
+        self.assertEqual(scraper.http.get(self.server.root + 'missing').status_code, 500)
+        self.assertEqual(len(self.server.requests['missing']), 2)
+
+    def test_revalidate(self):
+        """Test expired responses are revalidated with a conditional request, and replaced if changed."""
+        scraper = PageScraper(cache=ResponseCache(self.path, ttl=0.1))
+        url = self.server.root + 'a'
+        etag = scraper.http.get(url).headers['ETag']
+        time.sleep(0.15)
+        response = scraper.http.get(url)
+        self.assertTrue(response.from_cache)
+        self.assertEqual(self.server.requests['a'][-1], ('GET', etag, b''))
+        # Revalidating refreshes the entry, so it's fresh again
+        scraper.http.get(url)
+        self.assertEqual(len(self.server.requests['a']), 2)
+        time.sleep(0.15)
+        self.server.pages['a'] = b'<html><body><h1>A2</h1></body></html>'
+        self.assertEqual(scraper.run(url).serialize(), [{'title': 'A2'}])
+        self.assertEqual(scraper.run(url).serialize(), [{'title': 'A2'}])
+        self.assertEqual(len(self.server.requests['a']), 3)
+
+    def test_post(self):
+        """Test POST requests are cached by their body."""
+        scraper = PageScraper(cache=ResponseCache(self.path))
+        url = self.server.root + 'search'
+        self.assertEqual(scraper.http.post(url, data={'q': 'benzene'}).text, 'results:q=benzene')
+        self.assertEqual(scraper.http.post(url, data={'q': 'toluene'}).text, 'results:q=toluene')
+        self.assertEqual(scraper.http.post(url, data={'q': 'benzene'}).text, 'results:q=benzene')
+        self.assertEqual(len(self.server.requests['search']), 2)
+
+    def test_offline(self):
+        """Test offline mode returns cached responses however old, and fails for anything else."""
+        PageScraper(cache=ResponseCache(self.path)).run(self.server.root + 'a')
+        scraper = PageScraper(cache=ResponseCache(self.path, ttl=0, offline=True))
+        self.assertEqual(scraper.run(self.server.root + 'a').serialize(), [{'title': 'A'}])
+        self.assertRaises(CacheMissError, scraper.run, self.server.root + 'b')
+        self.assertEqual(len(self.server.requests['a']), 1)
+        self.assertEqual(len(self.server.requests['b']), 0)
+
+    def test_no_store(self):
+        """Test requests with Cache-Control: no-store are always sent, and their responses aren't cached."""
+        cache = ResponseCache(self.path)
+        scraper = PageScraper(cache=cache)
+        for _ in range(2):
+            scraper.http.get(self.server.root + 'a', headers={'Cache-Control': 'no-store'})
+        self.assertEqual(len(self.server.requests['a']), 2)
+        self.assertEqual(cache.size(), 0)
+
+    def test_eviction(self):
+        """Test the least recently used responses are evicted when the cache is too large."""
+        cache = ResponseCache(self.path)
+        scraper = PageScraper(cache=cache)
+        scraper.http.get(self.server.root + 'a')
+        entry_size = cache.size()
+        # Room for two entries once evicted down to the low water mark, but not three
+        cache.max_size = int(entry_size * 2.5)
+        scraper.http.get(self.server.root + 'b')
+        time.sleep(0.05)
+        # Use a again, so b is the least recently used
+        scraper.http.get(self.server.root + 'a')
+        time.sleep(0.05)
+        scraper.http.post(self.server.root + 'search', data={'q': 'x'})
+        self.assertLessEqual(cache.size(), entry_size * 2 + 20)
+        scraper.http.get(self.server.root + 'a')
+        scraper.http.get(self.server.root + 'b')
+        self.assertEqual(len(self.server.requests['a']), 1)
+        self.assertEqual(len(self.server.requests['b']), 2)
+
+    def test_eviction_batched(self):
+        """Test the cache directory isn't listed again on every new entry once the cache is full."""
+        cache = CountingResponseCache(self.path)
+        cache.set('0' * 40, {'content': b'x' * 1000})
+        cache.max_size = cache.size() * 100
+        for i in range(1, 150):
+            cache.set('%040d' % i, {'content': b'x' * 1000})
+        self.assertLessEqual(cache.size(), cache.max_size)
+        self.assertLess(cache.walks, 10)
+
+    def test_clear(self):
+        """Test clearing the cache."""
+        cache = ResponseCache(self.path)
+        PageScraper(cache=cache).run(self.server.root + 'a')
+        self.assertGreater(cache.size(), 0)
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+        PageScraper(cache=cache).run(self.server.root + 'a')
+        self.assertEqual(len(self.server.requests['a']), 2)
+
+    def test_runner(self):
+        """Test the cache stays in front of the rate limits when run with a ScraperRunner."""
+        scraper = PageScraper(cache=ResponseCache(self.path))
+        ScraperRunner(scraper, workers=2)
+        adapter = scraper.http.get_adapter(self.server.root)
+        self.assertIsInstance(adapter, CacheAdapter)
+        self.assertIsInstance(adapter.adapter, RateLimitAdapter)
+        results = list(ScraperRunner(scraper, workers=2).run([self.server.root + 'a'] * 3))
+        self.assertEqual([r.entities.serialize() for r in results], [[{'title': 'A'}]] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,7 +17,7 @@ import unittest
 from lxml.etree import tostring
 from lxml import html
 
-from chemdataextractor.scrape.clean import Cleaner, clean, strip, strip_markup, strip_html
+from chemdataextractor.scrape.clean import Cleaner, clean, clean_markup, strip, strip_markup, strip_html
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -191,6 +191,16 @@ class TestCleaner(unittest.TestCase):
         cleaner(tree)
         self.assertEqual(STRIPKS4, tostring(tree).decode())
 
+    def test_collapse_whitespace(self):
+        """Test whitespace runs containing a newline become a newline, and runs of spaces and tabs become a space."""
+        self.assertEqual(clean_markup('<p>a  \t b \n\t c\td\u00a0 e</p>'), '<p>a b\nc d\u00a0 e</p>')
+
+    def test_allow(self):
+        """Test elements matched by allow_xpath are not stripped."""
+        cleaner = Cleaner(strip_xpath='.//*', allow_xpath='.//em')
+        self.assertEqual(cleaner.clean_markup('<div><p>A <em>b</em> <span>c</span></p></div>'),
+                         '<div>\nA <em>b</em> c\n</div>')
+
 
 if __name__ == '__main__':
     unittest.main()
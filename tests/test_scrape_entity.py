@@ -185,6 +185,40 @@ class TestComplexScrape(unittest.TestCase):
         ])
 
 
+class Link(Entity):
+    """An entity with fields that share an expression, with different processing."""
+    text = StringField('a')
+    raw = StringField('a', raw=True)
+    texts = StringField('a', all=True, lower=True)
+    shout = StringField('a')
+
+    def process_shout(self, value):
+        return value.upper()
+
+    def finalize_texts(self, value):
+        return list(reversed(value))
+
+
+class TestSharedSelection(unittest.TestCase):
+    """Test fields that use the same expression are scraped independently."""
+
+    def test_shared(self):
+        link = Link(Selector.from_text('<div><a href="x">One</a><a href="y">Two</a></div>'))
+        self.assertEqual(link.serialize(), {
+            'text': 'One',
+            'raw': '<a href="x">One</a>',
+            'texts': ['two', 'one'],
+            'shout': 'ONE',
+        })
+
+    def test_hook_added_later(self):
+        """Test process methods added after the class is defined are used."""
+        class LateLink(Entity):
+            text = StringField('a')
+        LateLink.process_text = lambda self, value: value.upper()
+        self.assertEqual(LateLink(Selector.from_text('<a href="x">One</a>')).text, 'ONE')
+
+
 class AuthorC(Entity):
     firstname = StringField('span.firstname::text')
     lastname = StringField('span.lastname::text')
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+test_scrape_frontier
+~~~~~~~~~~~~~~~~~~~~
+
+Test crawling with a persistent frontier.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import defaultdict
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from chemdataextractor.scrape.entity import Entity
+from chemdataextractor.scrape.fields import StringField
+from chemdataextractor.scrape.frontier import CrawlFrontier, Crawler, DONE, FAILED, PENDING, RUNNING
+from chemdataextractor.scrape.runner import ScraperRunner
+from chemdataextractor.scrape.scraper import SearchScraper
+
+from stubserver import StubServer
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class SearchServer(StubServer):
+    """A local search server with a fixed number of results for each query, three to a page.
+
+    The query ``fail`` always gives a 500 response.
+    """
+
+    def __init__(self, totals):
+        self.totals = totals
+        self.requests = defaultdict(int)
+        super(SearchServer, self).__init__()
+
+    def respond(self, handler):
+        params = parse_qs(urlparse(handler.path).query)
+        query, page = params['q'][0], int(params['page'][0])
+        self.requests[(query, page)] += 1
+        if query == 'fail':
+            return self.send(handler, 500)
+        results = range((page - 1) * 3, min(page * 3, self.totals.get(query, 0)))
+        body = ('<html><body>%s</body></html>' % ''.join('<h2>%s %s</h2>' % (query, i) for i in results))
+        self.send(handler, 200, body.encode('utf8'), {'Content-Type': 'text/html; charset=utf-8'})
+
+
+class Result(Entity):
+    title = StringField('h2')
+
+
+class StubSearchScraper(SearchScraper):
+    entity = Result
+    root = 'h2'
+    page_size = 3
+
+    def __init__(self, root):
+        super(StubSearchScraper, self).__init__()
+        self.root_url = root
+
+    def perform_search(self, query, page):
+        return self.http.get(self.root_url + 'search', params={'q': query, 'page': page})
+
+
+class TestCrawler(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.server = SearchServer({'benzene': 7, 'toluene': 6, 'xylene': 2})
+        self.frontier = CrawlFrontier(os.path.join(self.path, 'frontier.sqlite'))
+
+    def tearDown(self):
+        self.frontier.close()
+        self.server.close()
+        shutil.rmtree(self.path)
+
+    def crawler(self, **kwargs):
+        runner = ScraperRunner(StubSearchScraper(self.server.root), workers=3, retries=0)
+        return Crawler(runner, self.frontier, **kwargs)
+
+    def test_paginate(self):
+        """Test every page of results is scraped once, stopping at a short or empty page."""
+        results = list(self.crawler().run(seeds=[('benzene', 1), ('toluene', 1), ('xylene', 1)]))
+        self.assertEqual(len(results), 7)
+        self.assertEqual(sorted(self.server.requests), [
+            ('benzene', 1), ('benzene', 2), ('benzene', 3), ('toluene', 1), ('toluene', 2), ('toluene', 3),
+            ('xylene', 1),
+        ])
+        self.assertEqual(self.frontier.counts(), {PENDING: 0, RUNNING: 0, DONE: 7, FAILED: 0})
+        titles = [e['title'] for item, entities in self.frontier.results() if item[0] == 'benzene' for e in entities]
+        self.assertEqual(sorted(titles), ['benzene %s' % i for i in range(7)])
+
+    def test_completed_not_repeated(self):
+        """Test running again with the same seeds doesn't scrape completed inputs again."""
+        list(self.crawler().run(seeds=[('xylene', 1)]))
+        self.assertEqual(list(self.crawler().run(seeds=[('xylene', 1)])), [])
+        self.assertEqual(self.server.requests[('xylene', 1)], 1)
+
+    def test_incremental(self):
+        """Test a crawl with a limit can be continued by running again."""
+        crawler = self.crawler()
+        self.assertEqual(len(list(crawler.run(seeds=[('benzene', 1)], limit=2))), 2)
+        self.assertEqual(self.frontier.counts()[PENDING], 1)
+        self.assertEqual(len(list(crawler.run())), 1)
+        self.assertEqual([self.server.requests[('benzene', p)] for p in (1, 2, 3)], [1, 1, 1])
+
+    def test_resume(self):
+        """Test inputs that were running when a crawl crashed are scraped when it is resumed."""
+        self.frontier.add([('xylene', 1), ('toluene', 1)])
+        self.assertEqual(self.frontier.claim(), ('xylene', 1))
+        self.assertEqual(self.frontier.status(('xylene', 1)), RUNNING)
+        # A new frontier on the same database, as if the process had restarted
+        self.frontier.close()
+        self.frontier = CrawlFrontier(os.path.join(self.path, 'frontier.sqlite'))
+        results = list(self.crawler().run())
+        self.assertEqual(len(results), 4)
+        self.assertEqual(self.frontier.status(('xylene', 1)), DONE)
+
+    def test_failed(self):
+        """Test inputs that fail are retried, then recorded as failed, and can be requeued."""
+        results = list(self.crawler(attempts=2).run(seeds=[('fail', 1), ('xylene', 1)]))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.server.requests[('fail', 1)], 2)
+        self.assertEqual(self.frontier.status(('fail', 1)), FAILED)
+        self.assertEqual([item for item, error in self.frontier.errors()], [('fail', 1)])
+        self.assertEqual(self.frontier.requeue(failed=True), 1)
+        self.assertEqual(self.frontier.status(('fail', 1)), PENDING)
+
+    def test_stop_early(self):
+        """Test inputs that were claimed but not completed when the caller stops are scraped next time."""
+        results = self.crawler().run(seeds=[('benzene', 1), ('toluene', 1), ('xylene', 1)])
+        next(results)
+        results.close()
+        list(self.crawler().run())
+        self.assertEqual(self.frontier.counts(), {PENDING: 0, RUNNING: 0, DONE: 7, FAILED: 0})
+
+
+class TestCrawlFrontier(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.frontier = CrawlFrontier(os.path.join(self.path, 'frontier.sqlite'))
+
+    def tearDown(self):
+        self.frontier.close()
+        shutil.rmtree(self.path)
+
+    def test_dedupe(self):
+        """Test inputs are only added once, and URLs are deduped without their fragment."""
+        self.assertEqual(self.frontier.add(['http://example.com/a#top', 'http://example.com/a', 'http://example.com/b']), 2)
+        self.assertEqual(self.frontier.add([('q', 1), ('q', 1), ('q', 2)]), 2)
+        self.assertEqual(len(self.frontier), 4)
+        self.assertEqual(self.frontier.claim(), 'http://example.com/a#top')
+
+    def test_complete(self):
+        """Test completing an input stores its result and adds the inputs that follow it."""
+        self.frontier.add([('q', 1)])
+        item = self.frontier.claim()
+        self.assertIsNone(self.frontier.claim())
+        self.assertEqual(self.frontier.complete(item, [{'title': 'x'}], [('q', 2), ('q', 1)]), 1)
+        self.assertEqual(list(self.frontier.results()), [(('q', 1), [{'title': 'x'}])])
+        self.assertEqual(self.frontier.claim(), ('q', 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,9 +12,16 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import logging
+import shutil
+import tempfile
 import unittest
 
-from chemdataextractor.scrape.pub.rsc import rsc_substitute, strip_rsc_html
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from chemdataextractor.scrape.cache import ResponseCache
+from chemdataextractor.scrape.pub.rsc import RscSearchScraper, rsc_substitute, strip_rsc_html
+
+from stubserver import StubServer
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -47,3 +54,92 @@ class TestStripRscHtml(unittest.TestCase):
         html = '<span class="title_heading">Rationale for the sluggish oxidative addition of aryl halides to Au(<span class="small_caps">I</span>)<a title="Electronic supplementary information (ESI) available. CCDC 891201–891204 and 964933. For ESI and crystallographic data in CIF or other electronic format see DOI: 10.1039/c3cc48914k" href="#fn1">†</a></span>'
         stripped = '<span class="title_heading">Rationale for the sluggish oxidative addition of aryl halides to Au(I)</span>'
         self.assertEqual(strip_rsc_html.clean_html(html), stripped)
+
+
+class RscSearchServer(StubServer):
+    """A local stand-in for RSC search, with one result on each of three pages.
+
+    Each search starts a new session. Sessions in ``expired`` give a 500 response, or no results if ``expired_empty``.
+    """
+
+    def __init__(self):
+        self.sessions = 0
+        self.expired = set()
+        self.expired_empty = False
+        self.requests = []
+        super(RscSearchServer, self).__init__()
+
+    def respond(self, handler):
+        if handler.command == 'GET':
+            self.sessions += 1
+            self.requests.append(('search', parse_qs(urlparse(handler.path).query)['searchtext'][0]))
+            body = '<html><body><input id="SearchTerm" value="s%s"></body></html>' % self.sessions
+            return self.send(handler, 200, body.encode('utf8'), {'Content-Type': 'text/html; charset=utf-8'})
+        data = parse_qs(handler.rfile.read(int(handler.headers.get('Content-Length'))).decode('utf8'))
+        session, page = data['searchterm'][0], int(data['pageno'][0])
+        self.requests.append(('results', session, page))
+        if session in self.expired and not self.expired_empty:
+            return self.send(handler, 500)
+        results = '' if session in self.expired or page > 3 else (
+            '<div class="search_grey_box_middle_s4_jrnls"><div class="title_text_s4_jrnls">'
+            '<a name="c%sxx0000" href="/en/content/c%s">Result %s</a></div></div>' % (page, page, page)
+        )
+        body = '<html><body>%s</body></html>' % results
+        self.send(handler, 200, body.encode('utf8'), {'Content-Type': 'text/html; charset=utf-8'})
+
+
+class StubRscSearchScraper(RscSearchScraper):
+    page_size = 1
+
+    def __init__(self, root, cache=None):
+        super(StubRscSearchScraper, self).__init__(cache=cache)
+        self.search_url = root + 'en/results'
+        self.results_url = root + 'en/search/journalresult'
+
+
+class TestRscSearchScraper(unittest.TestCase):
+    """Test reusing the search session for later pages of results."""
+
+    def setUp(self):
+        self.server = RscSearchServer()
+        self.scraper = StubRscSearchScraper(self.server.root)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_session_reused(self):
+        """Test later pages of results use the session from the first page."""
+        self.assertEqual(self.scraper.run('benzene', 1)[0]['title'], 'Result 1')
+        self.assertEqual(self.scraper.run('benzene', 2)[0]['title'], 'Result 2')
+        self.assertEqual(self.server.requests, [('search', 'benzene'), ('results', 's1', 1), ('results', 's1', 2)])
+
+    def test_session_expired_error(self):
+        """Test an error with an earlier session searches again."""
+        self.scraper.run('benzene', 1)
+        self.server.expired.add('s1')
+        self.assertEqual(self.scraper.run('benzene', 2)[0]['title'], 'Result 2')
+        self.assertEqual(self.server.requests[-3:], [('results', 's1', 2), ('search', 'benzene'), ('results', 's2', 2)])
+        self.assertEqual(self.scraper.run('benzene', 3)[0]['title'], 'Result 3')
+        self.assertEqual(self.server.requests[-1], ('results', 's2', 3))
+
+    def test_session_expired_empty(self):
+        """Test no results with an earlier session searches again, but only once."""
+        self.scraper.run('benzene', 1)
+        self.server.expired.add('s1')
+        self.server.expired_empty = True
+        self.assertEqual(self.scraper.run('benzene', 2)[0]['title'], 'Result 2')
+        self.assertEqual(len(self.scraper.run('benzene', 4)), 0)
+        self.assertEqual(self.server.sessions, 3)
+
+    def test_session_not_cached(self):
+        """Test a new session is started for each scraper, even with a response cache."""
+        path = tempfile.mkdtemp()
+        try:
+            cache = ResponseCache(path)
+            self.assertEqual(StubRscSearchScraper(self.server.root, cache=cache).run('benzene', 1)[0]['title'], 'Result 1')
+            self.server.expired.add('s1')
+            scraper = StubRscSearchScraper(self.server.root, cache=cache)
+            self.assertEqual(scraper.run('benzene', 2)[0]['title'], 'Result 2')
+            self.assertEqual(self.server.requests[-2:], [('search', 'benzene'), ('results', 's2', 2)])
+        finally:
+            shutil.rmtree(path)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+test_scrape_runner
+~~~~~~~~~~~~~~~~~~
+
+Test running scrapers concurrently.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import defaultdict
+import logging
+import threading
+import time
+import unittest
+
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from chemdataextractor.scrape.entity import Entity
+from chemdataextractor.scrape.fields import StringField
+from chemdataextractor.scrape.runner import ScraperRunner
+from chemdataextractor.scrape.scraper import UrlScraper
+
+from stubserver import StubServer
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class PageServer(StubServer):
+    """A local HTTP server that returns a page for each path, and records how requests to it were made.
+
+    Query parameters control the response: ``sleep`` delays it and ``fail`` gives a 503 response for the first few
+    requests to a path.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = defaultdict(int)
+        self.max_active = defaultdict(int)
+        self.starts = defaultdict(list)
+        self.counts = defaultdict(int)
+        super(PageServer, self).__init__()
+
+    def respond(self, handler):
+        url = urlparse(handler.path)
+        params = parse_qs(url.query)
+        host = handler.headers.get('Host')
+        with self.lock:
+            self.active[host] += 1
+            self.max_active[host] = max(self.max_active[host], self.active[host])
+            self.starts[host].append(time.time())
+            self.counts[handler.path] += 1
+            count = self.counts[handler.path]
+        try:
+            time.sleep(float(params.get('sleep', [0])[0]))
+        finally:
+            # Before responding, as the client may send its next request as soon as it has the response
+            with self.lock:
+                self.active[host] -= 1
+        if count <= int(params.get('fail', [0])[0]):
+            return self.send(handler, 503, headers={'Retry-After': '0'})
+        body = ('<html><body><h1>Page %s</h1></body></html>' % url.path.strip('/')).encode('utf8')
+        self.send(handler, 200, body, {'Content-Type': 'text/html; charset=utf-8'})
+
+
+class PageEntity(Entity):
+    title = StringField('h1')
+
+
+class PageScraper(UrlScraper):
+    entity = PageEntity
+
+
+class TestScraperRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.server = PageServer()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_results(self):
+        """Test an EntityList is yielded for each URL, in the order they complete."""
+        urls = [self.server.url('%s?sleep=%s' % (i, 0.3 if i == 0 else 0)) for i in range(5)]
+        runner = ScraperRunner(PageScraper(), workers=5, per_host=5)
+        results = list(runner.run(urls))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[-1].input, urls[0])
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.entities.serialize(), [{'title': 'Page %s' % urls.index(result.input)}])
+
+    def test_per_host_concurrency(self):
+        """Test concurrent requests to each host are limited, but different hosts are requested concurrently."""
+        urls = []
+        for i in range(6):
+            urls.append(self.server.url('a%s?sleep=0.1' % i))
+            urls.append(self.server.url('b%s?sleep=0.1' % i, host='localhost'))
+        runner = ScraperRunner(PageScraper(), workers=8, per_host=2)
+        start = time.time()
+        results = list(runner.run(urls))
+        self.assertEqual(len(results), 12)
+        self.assertEqual(self.server.max_active['127.0.0.1:%s' % self.server.port], 2)
+        self.assertEqual(self.server.max_active['localhost:%s' % self.server.port], 2)
+        # Six requests to each host, two at a time, with both hosts at once
+        self.assertLess(time.time() - start, 0.3 * 2 + 0.25)
+
+    def test_delay(self):
+        """Test the minimum delay between requests to a host."""
+        urls = [self.server.url('%s' % i) for i in range(4)]
+        runner = ScraperRunner(PageScraper(), workers=4, per_host=4, delay=0.1)
+        list(runner.run(urls))
+        starts = sorted(self.server.starts['127.0.0.1:%s' % self.server.port])
+        for earlier, later in zip(starts, starts[1:]):
+            self.assertGreater(later - earlier, 0.08)
+
+    def test_retry(self):
+        """Test requests that get 503 responses are retried."""
+        runner = ScraperRunner(PageScraper(), workers=2, retries=2, backoff=0.01)
+        results = list(runner.run([self.server.url('x?fail=2'), self.server.url('y?fail=3')]))
+        by_url = {urlparse(r.input).path: r for r in results}
+        self.assertEqual(by_url['/x'].entities.serialize(), [{'title': 'Page x'}])
+        self.assertEqual(self.server.counts['/x?fail=2'], 3)
+        # Gives up after the retries, and the scraper fails on the last, empty, response
+        self.assertEqual(self.server.counts['/y?fail=3'], 3)
+        self.assertIsNotNone(by_url['/y'].error)
+
+    def test_connection_error(self):
+        """Test errors are yielded in results instead of stopping the run."""
+        self.server.close()
+        runner = ScraperRunner(PageScraper(), workers=2, retries=1, backoff=0.01)
+        results = list(runner.run([self.server.url('1')]))
+        self.assertEqual(len(results), 1)
+        self.assertIsNotNone(results[0].error)
+        self.server = PageServer()
+
+    def test_stop_early(self):
+        """Test inputs are only read as needed, and remaining inputs are skipped if the caller stops."""
+        read = []
+
+        def urls():
+            for i in range(1000):
+                read.append(i)
+                yield self.server.url('%s' % i)
+
+        runner = ScraperRunner(PageScraper(), workers=2)
+        results = runner.run(urls())
+        next(results)
+        results.close()
+        time.sleep(0.2)
+        self.assertLess(len(read), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,9 @@ from __future__ import unicode_literals
 import logging
 import unittest
 
-from chemdataextractor.scrape.selector import Selector
+from chemdataextractor.scrape import selector as selector_module
+from chemdataextractor.scrape.csstranslator import CssHTMLTranslator, CssXmlTranslator
+from chemdataextractor.scrape.selector import Selector, compile_xpath
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -52,6 +54,49 @@ class TestSelector(unittest.TestCase):
         self.assertEqual(selector.css('a::attr(href)').extract(), ['page'])
         self.assertEqual(selector.css('html>body>div>h1::text').extract(), ['Heading'])
 
+    def test_css_translation_cached(self):
+        """Test CSS translations are cached separately for each translator."""
+        html_xpath = CssHTMLTranslator().css_to_xpath('DIV > a::text')
+        self.assertIs(CssHTMLTranslator().css_to_xpath('DIV > a::text'), html_xpath)
+        self.assertNotEqual(CssXmlTranslator().css_to_xpath('DIV > a::text'), html_xpath)
+
+    def test_compiled_xpath_cached(self):
+        """Test compiled XPath expressions are reused for the same query and namespaces."""
+        compiled = compile_xpath('.//a', {})
+        self.assertIs(compile_xpath('.//a', {}), compiled)
+        self.assertIsNot(compile_xpath('.//a', {'x': 'http://example.com'}), compiled)
+        self.assertIs(compile_xpath('.//a', frozenset({('x', 'http://example.com')})),
+                      compile_xpath('.//a', {'x': 'http://example.com'}))
+
+    def test_compiled_xpath_lru(self):
+        """Test the least recently used compiled XPath expressions are discarded first when the cache is full."""
+        size = selector_module.COMPILED_XPATH_CACHE_SIZE
+        selector_module.COMPILED_XPATH_CACHE_SIZE = 3
+        try:
+            first = compile_xpath('.//lru1', {})
+            compile_xpath('.//lru2', {})
+            compile_xpath('.//lru3', {})
+            self.assertIs(compile_xpath('.//lru1', {}), first)
+            compile_xpath('.//lru4', {})
+            self.assertIs(compile_xpath('.//lru1', {}), first)
+            self.assertEqual(len(selector_module._compiled_xpath_cache), 3)
+            self.assertNotIn(('.//lru2', frozenset()), selector_module._compiled_xpath_cache)
+        finally:
+            selector_module.COMPILED_XPATH_CACHE_SIZE = size
+
+    def test_namespaces_changed(self):
+        """Test namespaces changed after a query are used in the next, and children don't share changes."""
+        selector = Selector.from_xml_text('<root xmlns:a="http://a.example.com" xmlns:b="http://b.example.com">'
+                                          '<a:x>A</a:x><b:x>B</b:x></root>')
+        selector.namespaces = {'n': 'http://a.example.com'}
+        self.assertEqual(selector.xpath('//n:x/text()').extract(), ['A'])
+        selector.namespaces['n'] = 'http://b.example.com'
+        self.assertEqual(selector.xpath('//n:x/text()').extract(), ['B'])
+        child = selector.xpath('/*')[0]
+        child.namespaces['n'] = 'http://a.example.com'
+        self.assertEqual(child.xpath('n:x/text()').extract(), ['A'])
+        self.assertEqual(selector.xpath('//n:x/text()').extract(), ['B'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+test_server
+~~~~~~~~~~~
+
+Test the extraction server.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import io
+import json
+import logging
+import os
+import threading
+import time
+import unittest
+
+import six
+
+from six.moves.urllib.request import urlopen
+
+from chemdataextractor.server import ExtractionServer, handle, make_http_server, serve_stdin
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+def echo(request):
+    """Return a record containing the request content, after sleeping for the requested time."""
+    time.sleep(request.get('sleep', 0))
+    if request.get('crash'):
+        os._exit(1)
+    if request.get('fail'):
+        raise ValueError('Failed')
+    return [{'names': [request['content']]}]
+
+
+class TestHandle(unittest.TestCase):
+
+    def test_records(self):
+        """Test a successful response."""
+        response = json.loads(handle({'id': 'a', 'content': 'benzene'}, echo))
+        self.assertEqual(response, {'id': 'a', 'records': [{'names': ['benzene']}]})
+
+    def test_error(self):
+        """Test exceptions are returned as errors."""
+        response = json.loads(handle({'id': 1, 'content': 'x', 'fail': True}, echo))
+        self.assertEqual(response, {'id': 1, 'error': 'ValueError: Failed'})
+
+    def test_timeout(self):
+        """Test requests are stopped when they take longer than their timeout."""
+        start = time.time()
+        response = json.loads(handle({'id': 1, 'content': 'x', 'sleep': 5}, echo, timeout=0.2))
+        self.assertEqual(response, {'id': 1, 'error': 'Timed out after 0.2 seconds'})
+        self.assertLess(time.time() - start, 2)
+        response = json.loads(handle({'id': 2, 'content': 'x', 'sleep': 5, 'timeout': 0.1}, echo, timeout=10))
+        self.assertEqual(response['error'], 'Timed out after 0.1 seconds')
+
+    def test_timeout_not_caught(self):
+        """Test a timeout isn't caught by handlers that catch errors and carry on."""
+        def careless(request):
+            try:
+                time.sleep(5)
+            except Exception:
+                pass
+            return []
+        response = json.loads(handle({'id': 1}, careless, timeout=0.1))
+        self.assertEqual(response, {'id': 1, 'error': 'Timed out after 0.1 seconds'})
+
+    def test_no_document(self):
+        """Test the default handler requires a document."""
+        response = json.loads(handle({'id': 1}))
+        self.assertEqual(response, {'id': 1, 'error': 'ValueError: Request must contain content or path'})
+
+
+class TestExtractionServer(unittest.TestCase):
+
+    def test_inline(self):
+        """Test processing requests in the calling thread."""
+        lines = ['{"id": 1, "content": "a"}', '', 'not json', '[1]', '{"id": 2, "content": "b"}']
+        responses = []
+        with ExtractionServer(workers=0, warmup=False, handler=echo) as server:
+            self.assertEqual(server.process(lines, responses.append), 4)
+        responses = [json.loads(r) for r in responses]
+        self.assertEqual(responses[0], {'id': 1, 'records': [{'names': ['a']}]})
+        self.assertEqual(responses[1]['id'], None)
+        self.assertTrue(responses[1]['error'].startswith('Invalid request'))
+        self.assertEqual(responses[2], {'id': None, 'error': 'Invalid request: Request must be a JSON object'})
+        self.assertEqual(responses[3], {'id': 2, 'records': [{'names': ['b']}]})
+
+    def test_pool(self):
+        """Test requests are processed in parallel and responses written as they are completed."""
+        lines = [json.dumps({'id': i, 'content': 'c%s' % i, 'sleep': 0.5 if i == 0 else 0}) for i in range(4)]
+        lines.append(json.dumps({'id': 'slow', 'content': 'x', 'sleep': 5, 'timeout': 0.2}))
+        stdout = io.StringIO()
+        with ExtractionServer(workers=2, max_pending=3, warmup=False, handler=echo) as server:
+            count = serve_stdin(server, io.BytesIO('\n'.join(lines).encode('utf8')), stdout)
+        self.assertEqual(count, 5)
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(len(responses), 5)
+        # The slow first request is overtaken by the others
+        self.assertNotEqual(responses[0]['id'], 0)
+        by_id = {r['id']: r for r in responses}
+        self.assertEqual(by_id[3], {'id': 3, 'records': [{'names': ['c3']}]})
+        self.assertEqual(by_id['slow'], {'id': 'slow', 'error': 'Timed out after 0.2 seconds'})
+
+    def test_worker_died(self):
+        """Test an error is returned for a request whose worker process dies, and later requests are processed."""
+        lines = [json.dumps({'id': 'crash', 'content': 'x', 'crash': True})]
+        lines.extend(json.dumps({'id': i, 'content': 'c%s' % i, 'sleep': 0.2}) for i in range(3))
+        responses = []
+        with ExtractionServer(workers=2, warmup=False, handler=echo) as server:
+            server.check_interval = 0.1
+            self.assertEqual(server.process(lines, responses.append), 4)
+        by_id = {r['id']: r for r in (json.loads(line) for line in responses)}
+        self.assertEqual(by_id['crash'], {'id': 'crash', 'error': 'Worker process died'})
+        self.assertEqual(by_id[2], {'id': 2, 'records': [{'names': ['c2']}]})
+        self.assertEqual(len(by_id), 4)
+
+    @unittest.skipIf(six.PY2, 'Python 2 pools have no error callback')
+    def test_not_picklable(self):
+        """Test an error is returned for a request that can't be sent to a worker, without holding its slot."""
+        lines = [json.dumps({'id': i, 'content': 'x'}) for i in range(3)]
+        responses = []
+        with ExtractionServer(workers=1, max_pending=1, warmup=False, handler=lambda request: []) as server:
+            self.assertEqual(server.process(lines, responses.append), 3)
+        self.assertEqual([json.loads(line)['id'] for line in responses], [0, 1, 2])
+        self.assertTrue(all('error' in json.loads(line) for line in responses))
+
+    def test_backpressure(self):
+        """Test no more requests are read while max_pending requests are being processed."""
+        read = []
+
+        def lines():
+            for i in range(4):
+                read.append((i, time.time()))
+                yield json.dumps({'id': i, 'content': 'x', 'sleep': 0.3})
+
+        with ExtractionServer(workers=2, max_pending=2, warmup=False, handler=echo) as server:
+            server.process(lines(), lambda line: None)
+        # The third request isn't read until one of the first two is complete
+        self.assertGreater(read[2][1] - read[0][1], 0.25)
+
+
+class TestHttp(unittest.TestCase):
+
+    def test_post(self):
+        """Test posting requests to the HTTP server."""
+        with ExtractionServer(workers=0, warmup=False, handler=echo) as server:
+            httpd = make_http_server(server, port=0)
+            thread = threading.Thread(target=httpd.serve_forever)
+            thread.daemon = True
+            thread.start()
+            try:
+                url = 'http://127.0.0.1:%s/' % httpd.server_address[1]
+                self.assertEqual(urlopen(url).read(), b'ok\n')
+                body = '{"id": 1, "content": "a"}\n{"id": 2, "content": "b"}\n'.encode('utf8')
+                response = urlopen(url, body)
+                self.assertEqual(response.headers['Content-Type'], 'application/x-ndjson')
+                lines = [json.loads(line) for line in response.read().decode('utf8').splitlines()]
+                self.assertEqual(lines, [{'id': 1, 'records': [{'names': ['a']}]}, {'id': 2, 'records': [{'names': ['b']}]}])
+            finally:
+                httpd.shutdown()
+                httpd.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@ from __future__ import unicode_literals
 import logging
 import unittest
 
+from chemdataextractor.text import get_encoding, ENCODING_SAMPLE_BYTES
 from chemdataextractor.text.latex import latex_to_unicode
 from chemdataextractor.text.normalize import normalize
 from chemdataextractor.text.processors import extract_emails
@@ -83,5 +84,46 @@ class TestExtraction(unittest.TestCase):
                          extract_emails('Invalid - matt@me...com, hithere@ex*ample.com'))
 
 
+class TestGetEncoding(unittest.TestCase):
+
+    def test_bom(self):
+        self.assertEqual(get_encoding('\ufeffcaf\u00e9'.encode('utf-8')), 'utf-8')
+        self.assertEqual(get_encoding('\ufeffcaf\u00e9'.encode('utf-16-le')), 'utf-16le')
+
+    def test_xml_declaration(self):
+        self.assertEqual(get_encoding(b'<?xml version="1.0" encoding="ISO-8859-1"?><a>caf\xe9</a>'), 'iso-8859-1')
+
+    def test_meta_charset(self):
+        html = '<html><head><meta charset="utf-8"></head><body>caf\u00e9</body></html>'
+        self.assertEqual(get_encoding(html.encode('utf-8')), 'utf-8')
+
+    def test_invalid_declaration(self):
+        """Test a declared encoding is ignored if the input can't be decoded with it."""
+        self.assertEqual(get_encoding(b'<?xml version="1.0" encoding="ascii"?><a>caf\xc3\xa9</a>'), 'utf-8')
+
+    def test_beyond_sample(self):
+        """Test the encoding is valid for the whole input, even if it is only evident after the sample."""
+        self.assertEqual(get_encoding(b'a' * ENCODING_SAMPLE_BYTES + 'caf\u00e9'.encode('utf-8')), 'utf-8')
+        self.assertEqual(get_encoding(b'a' * ENCODING_SAMPLE_BYTES + 'caf\u00e9'.encode('windows-1252')), 'windows-1252')
+
+    def test_unicode(self):
+        self.assertEqual(get_encoding('caf\u00e9'), None)
+
+    def test_guesses(self):
+        """Test a single guess or a list of guesses is tried first."""
+        self.assertEqual(get_encoding(b'caf\xe9', guesses='iso-8859-15'), 'iso-8859-15')
+        self.assertEqual(get_encoding(b'caf\xe9', guesses=['ascii', 'iso-8859-15']), 'iso-8859-15')
+
+    def test_memo_not_retained(self):
+        """Test the memoized result doesn't keep a reference to the input."""
+        import chemdataextractor.text
+        data = b'<?xml version="1.0" encoding="utf-8"?><a>' + b'caf\xc3\xa9' * 1000 + b'</a>'
+        encoding = get_encoding(data)
+        self.assertEqual(encoding, 'utf-8')
+        self.assertFalse(any(value is data for value in chemdataextractor.text._last_encoding[0]))
+        # An equal copy of the input is answered from the memo
+        self.assertEqual(get_encoding(bytes(bytearray(data))), encoding)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+test_utils
+~~~~~~~~~~
+
+Test utility functions.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+import subprocess
+import sys
+import unittest
+
+from chemdataextractor.utils import lazy_class_attribute
+
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class TestLazyClassAttribute(unittest.TestCase):
+
+    def test_computed_once(self):
+        """Test the value is computed on first access, and then stored on the class it was defined on."""
+        calls = []
+
+        class Base(object):
+            @lazy_class_attribute
+            def parsers(cls):
+                calls.append(cls)
+                return ['a']
+
+        class Sub(Base):
+            pass
+
+        self.assertEqual(calls, [])
+        self.assertEqual(Sub().parsers, ['a'])
+        self.assertEqual(Base.parsers, ['a'])
+        self.assertIs(Sub.parsers, Base.parsers)
+        self.assertEqual(calls, [Base])
+        self.assertIn('parsers', Base.__dict__)
+        self.assertNotIn('parsers', Sub.__dict__)
+
+    def test_override(self):
+        """Test the attribute can be overridden on a subclass or instance without computing it."""
+        class Base(object):
+            @lazy_class_attribute
+            def parsers(cls):
+                raise AssertionError('Should not be computed')
+
+        class Sub(Base):
+            parsers = []
+
+        self.assertEqual(Sub.parsers, [])
+        obj = Base.__new__(Base)
+        obj.parsers = ['b']
+        self.assertEqual(obj.parsers, ['b'])
+
+
+class TestLazyImport(unittest.TestCase):
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'Lazy imports require module __getattr__')
+    def test_startup(self):
+        """Test importing the package and its document classes doesn't build any parser grammars."""
+        code = ('import sys; from chemdataextractor import Document; from chemdataextractor.doc import Paragraph; '
+                'from chemdataextractor.cli import cli; '
+                'print(" ".join(m for m in sys.modules if m.startswith("chemdataextractor.parse.") or m in ("requests", "bs4")))')
+        out = subprocess.check_output([sys.executable, '-c', code]).decode('utf8').split()
+        self.assertEqual(out, [])
+
+    def test_attributes(self):
+        """Test names from submodules are available from the package."""
+        from chemdataextractor import parse
+        from chemdataextractor.parse.mp import MpParser
+        self.assertIs(parse.MpParser, MpParser)
+        self.assertIn('MpParser', dir(parse))
+        self.assertRaises(AttributeError, getattr, parse, 'NotAParser')
+
+
+if __name__ == '__main__':
+    unittest.main()